@@ -0,0 +1,244 @@
+"""
+Cost/latency cascade across Groq models.
+
+Answers with the small, fast model first and escalates to the large model only
+when a cheap check fails: the tool call could not be parsed, the answer is empty
+or hedging, or the question is long and multi-part enough to go straight to the
+large model. Per-tier latency and the escalation rate are recorded in
+`cascade_stats`, which is exported with the other metrics.
+"""
+
+import json
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+from src.langgraphagenticai.utils.metrics import metrics
+
+LOW_CONFIDENCE_PHRASES = (
+    "i'm not sure", "i am not sure", "i don't know", "i do not know", "i cannot answer",
+    "i can't answer", "i'm unable to", "i am unable to", "not enough information",
+)
+
+
+class CascadeStats:
+    """Per-tier latency samples and escalation counters."""
+    def __init__(self, window: int = 500):
+        self.latencies = {"small": deque(maxlen=window), "large": deque(maxlen=window)}
+        self.requests = 0
+        self.escalations = 0
+        self.direct_to_large = 0
+        self.reasons = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str, seconds: float):
+        with self._lock:
+            self.latencies[tier].append(seconds)
+
+    def record_route(self, escalated: bool, reason: Optional[str] = None, direct: bool = False):
+        with self._lock:
+            self.requests += 1
+            if direct:
+                self.direct_to_large += 1
+            if escalated:
+                self.escalations += 1
+            if reason:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            summary = {
+                "requests": self.requests,
+                "escalations": self.escalations,
+                "direct_to_large": self.direct_to_large,
+                "escalation_rate": (self.escalations / self.requests) if self.requests else 0.0,
+                "reasons": dict(self.reasons),
+            }
+            for tier, samples in self.latencies.items():
+                summary[f"{tier}_p50_seconds"] = statistics.median(samples) if samples else None
+            return summary
+
+
+# Shared by every pooled cascade in the process
+cascade_stats = CascadeStats()
+metrics.register_collector("cascade", cascade_stats.snapshot)
+
+
+def _last_user_text(messages: List) -> str:
+    for message in reversed(messages):
+        if getattr(message, "type", None) == "human":
+            return message.content if isinstance(message.content, str) else str(message.content)
+    return ""
+
+
+def needs_large_model(messages: List, max_chars: int = 600) -> Optional[str]:
+    """Returns why a question should skip the small model, or None."""
+    text = _last_user_text(messages)
+    if len(text) > max_chars:
+        return "long_question"
+    if text.count("?") >= 2 or len(re.findall(r"(?m)^\s*(?:\d+[.)]|[-*])\s+", text)) >= 2:
+        return "multi_part_question"
+    return None
+
+
+def check_answer(message) -> Optional[str]:
+    """Returns why the small model's answer is not good enough, or None."""
+    if getattr(message, "invalid_tool_calls", None):
+        return "tool_call_parse_failure"
+    if message.tool_calls:
+        return None
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if not content.strip():
+        return "empty_answer"
+    lowered = content.lower()
+    if any(phrase in lowered for phrase in LOW_CONFIDENCE_PHRASES):
+        return "low_confidence"
+    return None
+
+
+class CascadeChatModel(BaseChatModel):
+    """
+    Chat model that tries the small model first and escalates to the large one.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    small: BaseChatModel
+    large: BaseChatModel
+    stats: CascadeStats
+
+    @property
+    def _llm_type(self) -> str:
+        return "groq-cascade"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"small": self.small._identifying_params, "large": self.large._identifying_params}
+
+    @property
+    def model_name(self) -> str:
+        return f"{getattr(self.small, 'model_name', 'small')}→{getattr(self.large, 'model_name', 'large')}"
+
+    def bind_tools(self, tools, **kwargs):
+        """Both tiers are Groq models, so the small tier's tool formatting works for either."""
+        binding = self.small.bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+
+    def _timed(self, tier: str, model: BaseChatModel, messages, stop, run_manager, **kwargs) -> ChatResult:
+        started = time.perf_counter()
+        try:
+            return model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            self.stats.record(tier, time.perf_counter() - started)
+
+    def _try_small(self, messages, stop, run_manager=None, **kwargs):
+        """
+        Returns (result, escalation reason) from the small tier. It is called
+        without streaming, so a rejected answer never reaches the token stream;
+        the run manager still carries the turn's callbacks and usage metadata.
+        """
+        try:
+            result = self._timed("small", self.small, messages, stop, run_manager, **kwargs)
+        except Exception as e:
+            if "tool_use_failed" in str(e) or "Failed to call a function" in str(e):
+                return None, "tool_call_parse_failure"
+            raise
+        return result, check_answer(result.generations[0].message)
+
+    def _generate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        reason = needs_large_model(messages)
+        if reason:
+            self.stats.record_route(escalated=False, reason=reason, direct=True)
+            return self._timed("large", self.large, messages, stop, run_manager, **kwargs)
+        result, reason = self._try_small(messages, stop, run_manager, **kwargs)
+        if reason is None:
+            self.stats.record_route(escalated=False)
+            return result
+        print(f"Cascade escalating to large model: {reason}")
+        self.stats.record_route(escalated=True, reason=reason)
+        return self._timed("large", self.large, messages, stop, run_manager, **kwargs)
+
+    async def _atimed(self, tier: str, model: BaseChatModel, messages, stop, run_manager, **kwargs) -> ChatResult:
+        started = time.perf_counter()
+        try:
+            return await model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            self.stats.record(tier, time.perf_counter() - started)
+
+    async def _atry_small(self, messages, stop, run_manager=None, **kwargs):
+        try:
+            result = await self._atimed("small", self.small, messages, stop, run_manager, **kwargs)
+        except Exception as e:
+            if "tool_use_failed" in str(e) or "Failed to call a function" in str(e):
+                return None, "tool_call_parse_failure"
+            raise
+        return result, check_answer(result.generations[0].message)
+
+    async def _agenerate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        reason = needs_large_model(messages)
+        if reason:
+            self.stats.record_route(escalated=False, reason=reason, direct=True)
+            return await self._atimed("large", self.large, messages, stop, run_manager, **kwargs)
+        result, reason = await self._atry_small(messages, stop, run_manager, **kwargs)
+        if reason is None:
+            self.stats.record_route(escalated=False)
+            return result
+        print(f"Cascade escalating to large model: {reason}")
+        self.stats.record_route(escalated=True, reason=reason)
+        return await self._atimed("large", self.large, messages, stop, run_manager, **kwargs)
+
+    @staticmethod
+    def _as_chunk(result: ChatResult) -> ChatGenerationChunk:
+        """The small tier's checked answer as a single stream chunk."""
+        message = result.generations[0].message
+        return ChatGenerationChunk(message=AIMessageChunk(
+            content=message.content,
+            tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                for index, call in enumerate(message.tool_calls)
+            ],
+            usage_metadata=message.usage_metadata,
+            response_metadata=message.response_metadata,
+        ))
+
+    def _stream(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        reason = needs_large_model(messages)
+        if reason is None:
+            result, reason = self._try_small(messages, stop, run_manager, **kwargs)
+            if reason is None:
+                self.stats.record_route(escalated=False)
+                yield self._as_chunk(result)
+                return
+            self.stats.record_route(escalated=True, reason=reason)
+        else:
+            self.stats.record_route(escalated=False, reason=reason, direct=True)
+        started = time.perf_counter()
+        try:
+            yield from self.large._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            self.stats.record("large", time.perf_counter() - started)
+
+    async def _astream(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        reason = needs_large_model(messages)
+        if reason is None:
+            result, reason = await self._atry_small(messages, stop, run_manager, **kwargs)
+            if reason is None:
+                self.stats.record_route(escalated=False)
+                yield self._as_chunk(result)
+                return
+            self.stats.record_route(escalated=True, reason=reason)
+        else:
+            self.stats.record_route(escalated=False, reason=reason, direct=True)
+        started = time.perf_counter()
+        try:
+            async for chunk in self.large._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+        finally:
+            self.stats.record("large", time.perf_counter() - started)
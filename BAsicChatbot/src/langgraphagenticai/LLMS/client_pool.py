@@ -0,0 +1,189 @@
+"""
+Process-wide pool of ChatGroq clients.
+
+Streamlit reruns the script on every interaction, so building a new ChatGroq per
+message throws away the HTTP connection pool and TLS session each time. The pool
+keeps one ChatGroq per (api key hash, model), backed by shared keep-alive HTTP
+clients, and caches tool-bound runnables so `bind_tools` is only paid once.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import httpx
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_groq import ChatGroq
+
+from src.langgraphagenticai.LLMS.cascade_llm import CascadeChatModel, cascade_stats
+from src.langgraphagenticai.LLMS.rate_limiter import groq_rate_limiter
+from src.langgraphagenticai.LLMS.resilient_llm import ResilientChatModel, RetryPolicy, get_circuit_breaker
+from src.langgraphagenticai.LLMS.response_cache import get_response_cache
+from src.langgraphagenticai.LLMS.service_health import get_health_monitor
+from src.langgraphagenticai.utils.usage_ledger import get_usage_ledger
+
+
+class GroqClientPool:
+    """
+    Reuses ChatGroq models, their HTTP clients and bound-tool runnables across turns and sessions.
+    """
+    def __init__(self, max_keepalive_connections: int = 20, keepalive_expiry: float = 300.0):
+        limits = httpx.Limits(
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._limits = limits
+        self._http_client = None
+        self._http_async_client = None
+        self._models = {}
+        self._resilient = {}
+        self._cascades = {}
+        self._bound = {}
+        self._warmed = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_key: str, model: str):
+        key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        return key_hash, model
+
+    def _get_http_clients(self):
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._limits)
+            self._http_async_client = httpx.AsyncClient(limits=self._limits)
+        return self._http_client, self._http_async_client
+
+    def get_model(self, api_key: str, model: str) -> ChatGroq:
+        """Return the pooled ChatGroq for this api key and model, creating it on first use."""
+        api_key = api_key or os.environ.get("GROQ_API_KEY", "")
+        key = self._key(api_key, model)
+        with self._lock:
+            llm = self._models.get(key)
+            if llm is None:
+                http_client, http_async_client = self._get_http_clients()
+                llm = ChatGroq(
+                    api_key=api_key,
+                    model=model,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                    # Retries happen in ResilientChatModel, not inside the SDK
+                    max_retries=0,
+                )
+                self._models[key] = llm
+            return llm
+
+    def get_resilient_model(self, api_key: str, model: str, retry_policy: RetryPolicy = None) -> ResilientChatModel:
+        """
+        Return the pooled model wrapped with retries, the model's circuit breaker,
+        the process-wide rate limiter, the persistent response cache and the
+        health gate.
+        """
+        api_key = api_key or os.environ.get("GROQ_API_KEY", "")
+        inner = self.get_model(api_key, model)
+        key = self._key(api_key, model)
+        with self._lock:
+            llm = self._resilient.get(key)
+            if llm is None or (retry_policy is not None and llm.retry_policy != retry_policy):
+                if llm is not None:
+                    self._forget_bound(llm)
+                llm = ResilientChatModel(
+                    inner=inner,
+                    retry_policy=retry_policy or RetryPolicy(),
+                    breaker=get_circuit_breaker(model),
+                    request_limiter=groq_rate_limiter,
+                    response_cache=get_response_cache(),
+                    health=get_health_monitor(),
+                    usage_ledger=get_usage_ledger(),
+                )
+                self._resilient[key] = llm
+            return llm
+
+    def get_cascade_model(self, api_key: str, small_model: str, large_model: str,
+                          retry_policy: RetryPolicy = None) -> CascadeChatModel:
+        """Return the pooled small → large cascade; its stats (`cascade_stats`) are shared by all sessions."""
+        small = self.get_resilient_model(api_key, small_model, retry_policy=retry_policy)
+        large = self.get_resilient_model(api_key, large_model, retry_policy=retry_policy)
+        key = self._key(api_key or os.environ.get("GROQ_API_KEY", ""), f"{small_model}->{large_model}")
+        with self._lock:
+            cascade = self._cascades.get(key)
+            if cascade is None or cascade.small is not small or cascade.large is not large:
+                if cascade is not None:
+                    self._forget_bound(cascade)
+                cascade = CascadeChatModel(small=small, large=large, stats=cascade_stats)
+                self._cascades[key] = cascade
+            return cascade
+
+    def _forget_bound(self, llm):
+        """Drops the bound runnables of a model that was replaced in the pool (called with the lock held)."""
+        for key in [key for key, entry in self._bound.items() if entry[0] is llm]:
+            del self._bound[key]
+
+    @staticmethod
+    def _tools_signature(tools) -> str:
+        schemas = [convert_to_openai_tool(tool) for tool in tools]
+        return hashlib.sha256(json.dumps(schemas, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def bind_tools(self, llm, tools, **kwargs):
+        """Return a cached `llm.bind_tools(tools)` runnable for identical tool schemas."""
+        key = (id(llm), self._tools_signature(tools), json.dumps(kwargs, sort_keys=True, default=str))
+        with self._lock:
+            entry = self._bound.get(key)
+            # The model is stored alongside the runnable so its id cannot be reused
+            if entry is None or entry[0] is not llm:
+                entry = (llm, llm.bind_tools(tools, **kwargs))
+                self._bound[key] = entry
+            return entry[1]
+
+    def with_structured_output(self, llm, schema, **kwargs):
+        """Return a cached `llm.with_structured_output(schema)` runnable."""
+        key = ("structured", id(llm), f"{schema.__module__}.{schema.__qualname__}",
+               json.dumps(kwargs, sort_keys=True, default=str))
+        with self._lock:
+            entry = self._bound.get(key)
+            if entry is None or entry[0] is not llm:
+                entry = (llm, llm.with_structured_output(schema, **kwargs))
+                self._bound[key] = entry
+            return entry[1]
+
+    def warm_up(self, api_key: str, model: str, background: bool = True):
+        """
+        Lists the models (GET /openai/v1/models, not billed) over the pooled HTTP
+        client, so DNS, TCP and TLS setup happen before the first user turn.
+        Runs once per (api key, model) per process.
+        """
+        key = self._key(api_key or os.environ.get("GROQ_API_KEY", ""), model)
+        with self._lock:
+            if key in self._warmed:
+                return
+            self._warmed.add(key)
+
+        def _warm():
+            try:
+                llm = self.get_model(api_key, model)
+                http_client, _ = self._get_http_clients()
+                base_url = (llm.groq_api_base or "https://api.groq.com").rstrip("/")
+                response = http_client.get(f"{base_url}/openai/v1/models", timeout=10.0, headers={
+                    "Authorization": f"Bearer {llm.groq_api_key.get_secret_value()}"})
+                response.raise_for_status()
+                print(f"Warmed up Groq connection for {model}")
+            except Exception as e:
+                print(f"Groq warm-up for {model} failed: {e}")
+
+        if background:
+            threading.Thread(target=_warm, name=f"groq-warmup-{model}", daemon=True).start()
+        else:
+            _warm()
+
+    def clear(self):
+        """Drop all pooled clients."""
+        with self._lock:
+            self._models.clear()
+            self._resilient.clear()
+            self._cascades.clear()
+            self._bound.clear()
+            self._warmed.clear()
+
+
+# Shared by every Streamlit session in this process
+groq_client_pool = GroqClientPool()
@@ -1,49 +1,50 @@
 import os
-import time
 import streamlit as st
-from langchain_groq import ChatGroq
-from langsmith import traceable
+from src.langgraphagenticai.utils.tracing import traced
+from src.langgraphagenticai.LLMS.client_pool import groq_client_pool
+from src.langgraphagenticai.LLMS.resilient_llm import RetryPolicy
 
 class GroqLLM:
     def __init__(self,user_contols_input):
         self.user_controls_input=user_contols_input
 
-    @traceable(name="get_llm_model")
-    def get_llm_model(self, max_retries=3, retry_delay=5):
+    @traced(name="get_llm_model", component="llm")
+    def get_llm_model(self, max_retries=3, base_delay=0.5, max_delay=8.0):
         """
-        Get LLM model with retry logic for service unavailable errors
+        Get LLM model with invocation-level retries for rate limit and service unavailable errors.
+        The ChatGroq constructor never talks to the network, so the retries, backoff
+        and circuit breaker are applied around each model call instead.
         """
-        for attempt in range(max_retries):
-            try:
-                groq_api_key=self.user_controls_input["GROQ_API_KEY"]
-                selected_groq_model=self.user_controls_input["selected_groq_model"]
-                if groq_api_key=='' and os.environ["GROQ_API_KEY"] =='':
-                    st.error("Please Enter the Groq API KEY")
+        try:
+            groq_api_key=self.user_controls_input["GROQ_API_KEY"]
+            selected_groq_model=self.user_controls_input["selected_groq_model"]
+            if groq_api_key=='' and os.environ.get("GROQ_API_KEY", '') =='':
+                st.error("Please Enter the Groq API KEY")
 
-                llm=ChatGroq(api_key=groq_api_key,model=selected_groq_model)
+            # Pooled client: reuses the HTTP connection pool across turns and sessions
+            retry_policy=RetryPolicy(max_attempts=max_retries, base_delay=base_delay, max_delay=max_delay)
+            if self.user_controls_input.get("cascade_mode"):
+                # Small fast model first, escalate to the large one only when a cheap check fails
+                llm=groq_client_pool.get_cascade_model(
+                    groq_api_key,
+                    self.user_controls_input.get("cascade_small_model","llama3-8b-8192"),
+                    self.user_controls_input.get("cascade_large_model","llama3-70b-8192"),
+                    retry_policy=retry_policy,
+                )
                 return llm
+            llm=groq_client_pool.get_resilient_model(groq_api_key,selected_groq_model,retry_policy=retry_policy)
+            return llm
 
-            except Exception as e:
-                # Check for specific Groq API errors
-                error_msg = str(e)
-                if "503" in error_msg or "Service unavailable" in error_msg:
-                    if attempt < max_retries - 1:
-                        st.info(f"Groq service unavailable. Retrying in {retry_delay} seconds... (Attempt {attempt + 1}/{max_retries})")
-                        time.sleep(retry_delay)
-                        continue
-                    else:
-                        raise ValueError(f"Groq API Service Unavailable (503) after {max_retries} attempts: {error_msg}")
-                elif "429" in error_msg:
-                    if attempt < max_retries - 1:
-                        st.info(f"Rate limit exceeded. Retrying in {retry_delay} seconds... (Attempt {attempt + 1}/{max_retries})")
-                        time.sleep(retry_delay)
-                        continue
-                    else:
-                        raise ValueError(f"Groq API Rate Limit Exceeded (429) after {max_retries} attempts: {error_msg}")
-                elif "401" in error_msg:
-                    raise ValueError(f"Groq API Authentication Error (401): Check your API key")
-                else:
-                    raise ValueError(f"Error Occurred With Exception : {e}")
-        
-        # This should never be reached, but just in case
-        raise ValueError("Unexpected error in retry logic")
\ No newline at end of file
+        except Exception as e:
+            if "401" in str(e):
+                raise ValueError(f"Groq API Authentication Error (401): Check your API key")
+            raise ValueError(f"Error Occurred With Exception : {e}")
+
+    def warm_up(self):
+        """
+        Warm up the pooled connection for the selected model in the background
+        """
+        groq_api_key=self.user_controls_input.get("GROQ_API_KEY","")
+        selected_groq_model=self.user_controls_input.get("selected_groq_model")
+        if selected_groq_model and (groq_api_key or os.environ.get("GROQ_API_KEY")):
+            groq_client_pool.warm_up(groq_api_key,selected_groq_model)
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+Shared request and token rate limiting for Groq calls.
+
+Every Streamlit session calls Groq independently, so under load they all hit
+429s together and then retry together. `GroqRateLimiter` puts one token bucket
+per model (requests per minute and tokens per minute) in front of every call,
+queues callers in FIFO order and rejects a call early when it cannot be served
+before its deadline.
+
+By default the buckets live in process memory. Setting GROQ_RATE_LIMIT_STATE to
+a file path shares them between worker processes through an fcntl-locked file.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: file sharing is not available, fall back to in-process buckets
+    fcntl = None
+
+
+# Per-model budgets (requests per minute, tokens per minute), overridable with GROQ_RATE_LIMITS
+DEFAULT_MODEL_BUDGETS = {
+    "llama3-8b-8192": {"rpm": 30, "tpm": 30000},
+    "llama3-70b-8192": {"rpm": 30, "tpm": 6000},
+    "gemma2-9b-it": {"rpm": 30, "tpm": 15000},
+}
+FALLBACK_BUDGET = {"rpm": 30, "tpm": 6000}
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a request cannot get capacity before its queue deadline."""
+
+
+def estimate_tokens(messages, max_tokens: Optional[int] = None, completion_reserve: int = 256) -> int:
+    """Cheap token estimate (~4 characters per token) for the prompt plus the expected completion."""
+    chars = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 4 + (max_tokens or completion_reserve)
+
+
+class _MemoryBuckets:
+    """Token buckets held in this process."""
+    def __init__(self):
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, amount: float, capacity: float, refill_per_sec: float) -> float:
+        """Takes `amount` if available and returns 0, otherwise returns the seconds to wait."""
+        with self._lock:
+            return _take(self._state, key, amount, capacity, refill_per_sec)
+
+    def give(self, key: str, amount: float, capacity: float):
+        with self._lock:
+            _give(self._state, key, amount, capacity)
+
+
+class _FileBuckets:
+    """Token buckets persisted in a JSON file shared by every worker process."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _update(self, fn):
+        with self._lock, open(self.path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                state = json.loads(raw) if raw.strip() else {}
+                result = fn(state)
+                handle.seek(0)
+                handle.truncate()
+                json.dump(state, handle)
+                handle.flush()
+                return result
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def take(self, key: str, amount: float, capacity: float, refill_per_sec: float) -> float:
+        return self._update(lambda state: _take(state, key, amount, capacity, refill_per_sec))
+
+    def give(self, key: str, amount: float, capacity: float):
+        self._update(lambda state: _give(state, key, amount, capacity))
+
+
+def _refill(state: dict, key: str, capacity: float, refill_per_sec: float) -> dict:
+    now = time.time()
+    bucket = state.setdefault(key, {"tokens": capacity, "updated": now})
+    bucket["tokens"] = min(capacity, bucket["tokens"] + (now - bucket["updated"]) * refill_per_sec)
+    bucket["updated"] = now
+    return bucket
+
+
+def _take(state: dict, key: str, amount: float, capacity: float, refill_per_sec: float) -> float:
+    bucket = _refill(state, key, capacity, refill_per_sec)
+    # Requests larger than the whole bucket are allowed once it is full
+    amount = min(amount, capacity)
+    if bucket["tokens"] >= amount:
+        bucket["tokens"] -= amount
+        return 0.0
+    return (amount - bucket["tokens"]) / refill_per_sec
+
+
+def _give(state: dict, key: str, amount: float, capacity: float):
+    bucket = state.get(key)
+    if bucket is not None:
+        bucket["tokens"] = min(capacity, bucket["tokens"] + amount)
+
+
+class GroqRateLimiter:
+    """
+    Per-model request and token buckets with FIFO queueing and a queue deadline.
+    """
+    def __init__(self, budgets: Dict[str, dict] = None, state_path: str = None, default_timeout: float = 20.0):
+        self.budgets = dict(DEFAULT_MODEL_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.default_timeout = default_timeout
+        if state_path and fcntl is not None:
+            self._buckets = _FileBuckets(state_path)
+        else:
+            self._buckets = _MemoryBuckets()
+        self._tickets = {}
+        self._serving = {}
+        self._cancelled = {}
+        # Async callers waiting for their ticket: model -> {ticket: (loop, future)}
+        self._async_waiters = {}
+        self._cond = threading.Condition()
+        self.stats = {"granted": 0, "rejected": 0, "waited_seconds": 0.0}
+
+    def budget_for(self, model: str) -> dict:
+        return self.budgets.get(model, FALLBACK_BUDGET)
+
+    def _try(self, model: str, tokens: int) -> float:
+        budget = self.budget_for(model)
+        rpm, tpm = float(budget["rpm"]), float(budget["tpm"])
+        wait = self._buckets.take(f"{model}:requests", 1, rpm, rpm / 60.0)
+        if wait:
+            return wait
+        wait = self._buckets.take(f"{model}:tokens", tokens, tpm, tpm / 60.0)
+        if wait:
+            # Give the request slot back so the next attempt starts clean
+            self._buckets.give(f"{model}:requests", 1, rpm)
+        return wait
+
+    def acquire(self, model: str, tokens: int, timeout: float = None):
+        """
+        Blocks until the model's budget admits `tokens`, serving callers in arrival order.
+        Raises RateLimitTimeout as soon as the wait would run past the deadline.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            ticket = self._take_ticket(model)
+            while self._serving[model] != ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._cancel(model, ticket)
+                    self.stats["rejected"] += 1
+                    raise RateLimitTimeout(f"Groq rate limit queue deadline ({timeout:.0f}s) exceeded for {model}")
+                self._cond.wait(remaining)
+        try:
+            while True:
+                wait = self._try(model, tokens)
+                if not wait:
+                    self.stats["granted"] += 1
+                    self.stats["waited_seconds"] += time.monotonic() - started
+                    return
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    raise RateLimitTimeout(
+                        f"Groq rate limit: {model} needs {wait:.1f}s of budget but the queue deadline "
+                        f"leaves {max(remaining, 0):.1f}s"
+                    )
+                time.sleep(wait)
+        except RateLimitTimeout:
+            self.stats["rejected"] += 1
+            raise
+        finally:
+            with self._cond:
+                self._advance(model)
+
+    async def aacquire(self, model: str, tokens: int, timeout: float = None):
+        """
+        Async variant that waits without blocking the event loop. It takes a ticket
+        from the same FIFO queue as `acquire`, so sync and async callers are served
+        in one arrival order.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            ticket = self._take_ticket(model)
+            turn = None
+            if self._serving[model] != ticket:
+                turn = loop.create_future()
+                self._async_waiters.setdefault(model, {})[ticket] = (loop, turn)
+        if turn is not None:
+            try:
+                await asyncio.wait_for(turn, max(deadline - time.monotonic(), 0))
+            except BaseException as e:
+                with self._cond:
+                    self._async_waiters[model].pop(ticket, None)
+                    self._leave(model, ticket)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["rejected"] += 1
+                    raise RateLimitTimeout(f"Groq rate limit queue deadline ({timeout:.0f}s) exceeded for {model}") from None
+                raise
+        try:
+            while True:
+                wait = self._try(model, tokens)
+                if not wait:
+                    self.stats["granted"] += 1
+                    self.stats["waited_seconds"] += time.monotonic() - started
+                    return
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    raise RateLimitTimeout(
+                        f"Groq rate limit: {model} needs {wait:.1f}s of budget but the queue deadline "
+                        f"leaves {max(remaining, 0):.1f}s"
+                    )
+                await asyncio.sleep(wait)
+        except RateLimitTimeout:
+            self.stats["rejected"] += 1
+            raise
+        finally:
+            with self._cond:
+                self._advance(model)
+
+    def settle(self, model: str, estimated: int, actual: Optional[int]):
+        """Returns over-estimated tokens to the bucket once the real usage is known."""
+        if actual is None or actual >= estimated:
+            return
+        self._buckets.give(f"{model}:tokens", estimated - actual, float(self.budget_for(model)["tpm"]))
+
+    def _take_ticket(self, model: str) -> int:
+        self._serving.setdefault(model, 0)
+        return next(self._tickets.setdefault(model, itertools.count()))
+
+    def _leave(self, model: str, ticket: int):
+        # An async waiter may have been handed the head just as it gave up
+        if self._serving[model] == ticket:
+            self._advance(model)
+        else:
+            self._cancel(model, ticket)
+
+    def _cancel(self, model: str, ticket: int):
+        # A waiter that gives up leaves the queue; mark it so the head can skip over it
+        self._cancelled.setdefault(model, set()).add(ticket)
+
+    def _advance(self, model: str):
+        cancelled = self._cancelled.get(model, set())
+        next_ticket = self._serving[model] + 1
+        while next_ticket in cancelled:
+            cancelled.discard(next_ticket)
+            next_ticket += 1
+        self._serving[model] = next_ticket
+        self._cond.notify_all()
+        waiter = self._async_waiters.get(model, {}).pop(next_ticket, None)
+        if waiter is not None:
+            loop, turn = waiter
+            loop.call_soon_threadsafe(_wake, turn)
+
+
+def _wake(turn: asyncio.Future):
+    if not turn.done():
+        turn.set_result(None)
+
+
+def _load_budgets() -> Dict[str, dict]:
+    raw = os.environ.get("GROQ_RATE_LIMITS", "")
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        print("Warning: GROQ_RATE_LIMITS is not valid JSON. Using default budgets.")
+        return {}
+
+
+# Process-wide limiter in front of every Groq call
+groq_rate_limiter = GroqRateLimiter(
+    budgets=_load_budgets(),
+    state_path=os.environ.get("GROQ_RATE_LIMIT_STATE") or None,
+)
@@ -0,0 +1,539 @@
+"""
+Invocation-level resilience for Groq chat models.
+
+Rate limits and outages only surface when the model is actually called (inside
+`graph.stream`/`graph.invoke`), so retries belong around the call, not the
+ChatGroq constructor. `ResilientChatModel` wraps any chat model and adds
+classified retries with exponential backoff and full jitter, honours the
+server's retry-after hints, and fails fast through a per-model circuit breaker
+while the service is down. An optional shared rate limiter is consulted before
+every attempt, so retries also respect the per-model request and token budgets,
+and an optional response cache answers repeated prompts without calling the API.
+An optional health monitor (service_health.py) gets every call's outcome and
+stops new attempts early while the service is known to be degraded.
+Call latency, retries and reported token usage go to the process metrics, and
+an optional usage ledger (utils/usage_ledger.py) records each call's tokens
+and latency against the conversation, use case and node it was made for.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+from src.langgraphagenticai.LLMS.rate_limiter import estimate_tokens
+from src.langgraphagenticai.LLMS.response_cache import cache_bypassed, make_cache_key
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.usage_ledger import usage_context
+
+RETRYABLE = "retryable"
+RATE_LIMITED = "rate_limited"
+FATAL = "fatal"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Classifies an invocation error as rate limited, retryable or fatal
+    """
+    status = _status_code(error)
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None:
+        if status in (408, 409) or status >= 500:
+            return RETRYABLE
+        return FATAL
+
+    name = type(error).__name__
+    if name in ("APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout",
+                "ConnectTimeout", "RemoteProtocolError", "TimeoutError", "ConnectionError"):
+        return RETRYABLE
+
+    error_msg = str(error)
+    if "429" in error_msg or "Rate limit" in error_msg:
+        return RATE_LIMITED
+    if "503" in error_msg or "Service unavailable" in error_msg or "502" in error_msg:
+        return RETRYABLE
+    return FATAL
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Reads the server's retry hint (retry-after-ms / retry-after) in seconds, if any
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, capped by max_delay.
+    Compared by value, so pooled models are reused for an equal policy.
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    max_retry_after: float = 30.0
+
+    def backoff(self, attempt: int, error: Exception = None) -> Optional[float]:
+        """
+        Returns the delay before the next attempt, or None when the server asks
+        to wait longer than we are willing to.
+        """
+        retry_after = get_retry_after(error) if error is not None else None
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker.
+    Opens after `failure_threshold` consecutive service failures and lets a
+    single probe through after `reset_timeout` seconds; other callers keep
+    failing fast until the probe succeeds (closed) or fails (open again). A
+    probe that never reports back is replaced after another `reset_timeout`.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Raises CircuitOpenError while the circuit is open or another caller is probing it."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open":
+                remaining = self.reset_timeout - (now - self.opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f"Groq API Service unavailable for {self.name}: circuit open, "
+                        f"failing fast for another {remaining:.0f}s"
+                    )
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+                    raise CircuitOpenError(
+                        f"Groq API Service unavailable for {self.name}: circuit half-open, "
+                        "waiting for the probe call"
+                    )
+                self.probe_started = now
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """The call ended without saying anything about the service (e.g. a 4xx); frees the probe slot."""
+        with self._lock:
+            self.probe_started = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"name": self.name, "state": self.state, "failures": self.failures}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker for a model."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+class ResilientChatModel(BaseChatModel):
+    """
+    Chat model wrapper that retries classified failures of the wrapped model.
+    Exposes the usual invoke/stream/bind_tools interface, so graph nodes use it
+    exactly like the ChatGroq it wraps.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    retry_policy: RetryPolicy
+    breaker: CircuitBreaker
+    # Not `rate_limiter`: BaseChatModel already has a field of that name with another interface
+    request_limiter: Optional[Any] = None
+    response_cache: Optional[Any] = None
+    health: Optional[Any] = None
+    usage_ledger: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"resilient-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.inner._identifying_params
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.inner, "model_name", self.breaker.name)
+
+    def bind_tools(self, tools, **kwargs):
+        """Formats tools the way the wrapped model does and binds them to this wrapper."""
+        binding = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+
+    def _acquire(self, messages: List, kwargs: Dict[str, Any]) -> int:
+        """Waits for rate limiter capacity and returns the number of tokens reserved."""
+        if self.request_limiter is None:
+            return 0
+        tokens = estimate_tokens(messages, kwargs.get("max_tokens"))
+        self.request_limiter.acquire(self.model_name, tokens)
+        return tokens
+
+    async def _aacquire(self, messages: List, kwargs: Dict[str, Any]) -> int:
+        if self.request_limiter is None:
+            return 0
+        tokens = estimate_tokens(messages, kwargs.get("max_tokens"))
+        await self.request_limiter.aacquire(self.model_name, tokens)
+        return tokens
+
+    @staticmethod
+    def _total_tokens(message) -> Optional[int]:
+        return (getattr(message, "usage_metadata", None) or {}).get("total_tokens")
+
+    def _settle(self, reserved: int, total_tokens: Optional[int]):
+        """Returns unused reserved tokens to the rate limiter once real usage is known."""
+        if self.request_limiter is None:
+            return
+        self.request_limiter.settle(self.model_name, reserved, total_tokens)
+
+    def _record_usage(self, message, run_manager=None, latency: float = 0.0):
+        """Counts the prompt and completion tokens the API reported for a call."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        metrics.inc("llm_tokens", usage.get("input_tokens", 0), model=self.model_name, type="prompt")
+        metrics.inc("llm_tokens", usage.get("output_tokens", 0), model=self.model_name, type="completion")
+        self._ledger_record(run_manager, latency, usage)
+
+    def _ledger_record(self, run_manager, latency: float, usage: Dict[str, Any] = None, cached: bool = False):
+        """Writes the call to the usage ledger; cache hits are recorded without tokens."""
+        if self.usage_ledger is None:
+            return
+        usage = usage or {}
+        self.usage_ledger.record(
+            "llm", model=self.model_name, prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0), latency=latency, cached=cached,
+            context=usage_context(run_manager),
+        )
+
+    def _cache_key(self, messages: List, kwargs: Dict[str, Any]) -> Optional[str]:
+        # The bypass is a contextvar, so it reaches streamed turns and the to_thread lookups too
+        if self.response_cache is None or cache_bypassed():
+            return None
+        bound = {"tools": kwargs.get("tools"), "tool_choice": kwargs.get("tool_choice")}
+        return make_cache_key(self.model_name, getattr(self.inner, "temperature", None), bound, messages)
+
+    def _cache_store(self, key: Optional[str], message):
+        if key is not None:
+            self.response_cache.store(key, self.model_name, message)
+
+    # The async paths run the SQLite calls in a worker thread, off the event loop
+    async def _acache_lookup(self, key: Optional[str]):
+        if key is None:
+            return None
+        return await asyncio.to_thread(self.response_cache.lookup, key)
+
+    async def _acache_store(self, key: Optional[str], message):
+        if key is not None:
+            await asyncio.to_thread(self.response_cache.store, key, self.model_name, message)
+
+    @staticmethod
+    def _cached_chunk(message) -> ChatGenerationChunk:
+        tool_call_chunks = [
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+            for index, call in enumerate(message.tool_calls)
+        ]
+        return ChatGenerationChunk(message=AIMessageChunk(
+            content=message.content,
+            tool_call_chunks=tool_call_chunks,
+            response_metadata=message.response_metadata,
+        ))
+
+    def _check_health(self):
+        if self.health is not None:
+            self.health.check()
+
+    def _record_health(self, ok: bool):
+        if self.health is not None:
+            self.health.record_result(ok)
+
+    def _next_delay(self, attempt: int, error: Exception, can_retry: bool = True) -> Optional[float]:
+        """Returns the delay before retrying, or None when the error should propagate."""
+        kind = classify_error(error)
+        if kind == RETRYABLE:
+            self.breaker.record_failure()
+            self._record_health(False)
+        else:
+            # 429s and 4xx errors (bad key, bad request, tool_use_failed) mean the service
+            # answered; they are the caller's problem and must not open the circuit for everyone
+            self.breaker.release()
+        if not can_retry or kind == FATAL or attempt + 1 >= self.retry_policy.max_attempts:
+            return None
+        delay = self.retry_policy.backoff(attempt, error)
+        if delay is not None:
+            metrics.inc("llm_retries", model=self.model_name, kind=kind)
+            print(f"Groq call failed ({kind}: {error}). Retrying in {delay:.2f}s "
+                  f"(attempt {attempt + 1}/{self.retry_policy.max_attempts})")
+        return delay
+
+    def _generate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._cache_key(messages, kwargs)
+        cached = self.response_cache.lookup(key) if key else None
+        if cached is not None:
+            self._ledger_record(run_manager, 0.0, cached=True)
+            return ChatResult(generations=[ChatGeneration(message=cached)])
+        started = time.perf_counter()
+        with metrics.time("llm", self.model_name):
+            result = self._generate_with_retries(messages, stop, run_manager, **kwargs)
+        self._record_usage(result.generations[0].message, run_manager, time.perf_counter() - started)
+        self._cache_store(key, result.generations[0].message)
+        return result
+
+    async def _agenerate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._cache_key(messages, kwargs)
+        cached = await self._acache_lookup(key)
+        if cached is not None:
+            self._ledger_record(run_manager, 0.0, cached=True)
+            return ChatResult(generations=[ChatGeneration(message=cached)])
+        started = time.perf_counter()
+        with metrics.time("llm", self.model_name):
+            result = await self._agenerate_with_retries(messages, stop, run_manager, **kwargs)
+        self._record_usage(result.generations[0].message, run_manager, time.perf_counter() - started)
+        await self._acache_store(key, result.generations[0].message)
+        return result
+
+    def _stream(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        key = self._cache_key(messages, kwargs)
+        cached = self.response_cache.lookup(key) if key else None
+        if cached is not None:
+            self._ledger_record(run_manager, 0.0, cached=True)
+            yield self._cached_chunk(cached)
+            return
+        final = None
+        started = time.perf_counter()
+        for chunk in self._stream_with_retries(messages, stop, run_manager, **kwargs):
+            final = chunk if final is None else final + chunk
+            yield chunk
+        latency = time.perf_counter() - started
+        metrics.observe("llm", self.model_name, latency)
+        if final is not None:
+            self._record_usage(final.message, run_manager, latency)
+            self._cache_store(key, final.message)
+
+    async def _astream(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        key = self._cache_key(messages, kwargs)
+        cached = await self._acache_lookup(key)
+        if cached is not None:
+            self._ledger_record(run_manager, 0.0, cached=True)
+            yield self._cached_chunk(cached)
+            return
+        final = None
+        started = time.perf_counter()
+        async for chunk in self._astream_with_retries(messages, stop, run_manager, **kwargs):
+            final = chunk if final is None else final + chunk
+            yield chunk
+        latency = time.perf_counter() - started
+        metrics.observe("llm", self.model_name, latency)
+        if final is not None:
+            self._record_usage(final.message, run_manager, latency)
+            await self._acache_store(key, final.message)
+
+    def _generate_with_retries(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        attempt = 0
+        while True:
+            self._check_health()
+            self.breaker.allow()
+            # Any exit the breaker does not hear about (a limiter timeout, cancellation, a
+            # dropped stream) must still free the probe slot allow() may have claimed
+            reported = False
+            reserved = 0
+            try:
+                reserved = self._acquire(messages, kwargs)
+                result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                reported = True
+                self.breaker.record_success()
+                self._record_health(True)
+                if result.generations:
+                    self._settle(reserved, self._total_tokens(result.generations[0].message))
+                return result
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                reported = True
+                # A failed attempt (5xx, timeout, 429) was not billed; give its reservation back
+                self._settle(reserved, 0)
+                delay = self._next_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                if not reported:
+                    self.breaker.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def _agenerate_with_retries(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        attempt = 0
+        while True:
+            self._check_health()
+            self.breaker.allow()
+            reported = False
+            reserved = 0
+            try:
+                reserved = await self._aacquire(messages, kwargs)
+                result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                reported = True
+                self.breaker.record_success()
+                self._record_health(True)
+                if result.generations:
+                    self._settle(reserved, self._total_tokens(result.generations[0].message))
+                return result
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                reported = True
+                # A failed attempt (5xx, timeout, 429) was not billed; give its reservation back
+                self._settle(reserved, 0)
+                delay = self._next_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                if not reported:
+                    self.breaker.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _stream_with_retries(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        # Only retry before the first chunk; a half-streamed answer cannot be replayed
+        attempt = 0
+        while True:
+            self._check_health()
+            self.breaker.allow()
+            reported = False
+            reserved = 0
+            started = False
+            # Groq reports usage on the final chunk; summing also covers per-chunk reports
+            total_tokens = None
+            try:
+                reserved = self._acquire(messages, kwargs)
+                for chunk in self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    started = True
+                    chunk_tokens = self._total_tokens(chunk.message)
+                    if chunk_tokens is not None:
+                        total_tokens = (total_tokens or 0) + chunk_tokens
+                    yield chunk
+                reported = True
+                self.breaker.record_success()
+                self._record_health(True)
+                self._settle(reserved, total_tokens)
+                return
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                reported = True
+                # Nothing streamed means nothing billed; a broken stream keeps what it reported, if anything
+                self._settle(reserved, total_tokens if started else 0)
+                delay = self._next_delay(attempt, e, can_retry=not started)
+                if delay is None:
+                    raise
+            finally:
+                if not reported:
+                    self.breaker.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def _astream_with_retries(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        attempt = 0
+        while True:
+            self._check_health()
+            self.breaker.allow()
+            reported = False
+            reserved = 0
+            started = False
+            total_tokens = None
+            try:
+                reserved = await self._aacquire(messages, kwargs)
+                async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    started = True
+                    chunk_tokens = self._total_tokens(chunk.message)
+                    if chunk_tokens is not None:
+                        total_tokens = (total_tokens or 0) + chunk_tokens
+                    yield chunk
+                reported = True
+                self.breaker.record_success()
+                self._record_health(True)
+                self._settle(reserved, total_tokens)
+                return
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                reported = True
+                # Nothing streamed means nothing billed; a broken stream keeps what it reported, if anything
+                self._settle(reserved, total_tokens if started else 0)
+                delay = self._next_delay(attempt, e, can_retry=not started)
+                if delay is None:
+                    raise
+            finally:
+                if not reported:
+                    self.breaker.release()
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,183 @@
+"""
+Persistent LLM response cache.
+
+Identical prompts (the usual first-turn questions, the canned queries in the test
+scripts) otherwise trigger a fresh Groq completion every time. `ResponseCache`
+stores completions in SQLite keyed by model, temperature, the bound tool schema
+and the normalized message list, with a TTL, size-bounded LRU eviction and
+hit-rate counters. GROQ_RESPONSE_CACHE=false turns it off; wrap a block in
+`bypass_response_cache()` to skip it for the calls made inside.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+
+from src.langgraphagenticai.utils.forksafe import reset_after_fork
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.paths import get_cache_dir
+
+_bypass = contextvars.ContextVar("bypass_response_cache", default=False)
+
+
+@contextlib.contextmanager
+def bypass_response_cache():
+    """Skips the response cache (lookups and writes) for calls made inside the block."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+def _normalize_message(message) -> Dict[str, Any]:
+    content = message.content
+    if isinstance(content, str):
+        content = " ".join(content.split())
+    normalized = {"type": message.type, "content": content}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        normalized["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in tool_calls]
+    if message.type == "tool":
+        normalized["name"] = message.name
+    return normalized
+
+
+def make_cache_key(model: str, temperature, tools, messages: List) -> str:
+    """Hash of (model, temperature, bound tool schema hash, normalized messages)."""
+    tools_hash = hashlib.sha256(json.dumps(tools or [], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "tools": tools_hash,
+        "messages": [_normalize_message(message) for message in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of AI messages with TTL and LRU eviction.
+    """
+    def __init__(self, path: str = None, ttl_seconds: float = 24 * 3600, max_entries: int = 5000):
+        self.path = path or os.path.join(get_cache_dir(), "llm_responses.sqlite")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, message TEXT, created REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._conn.commit()
+        reset_after_fork(self)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """This process's connection, opened on first use (and again in a forked worker)."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        return self._connection
+
+    def _after_fork(self):
+        # The parent's connection is abandoned, not closed: closing it here could disturb the parent
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def lookup(self, key: str) -> Optional[AIMessage]:
+        """Returns a fresh copy of the cached message, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT message, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                metrics.inc("cache_lookups", cache="response", name="llm", result="miss")
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            metrics.inc("cache_lookups", cache="response", name="llm", result="hit")
+        message = messages_from_dict([json.loads(row[0])])[0]
+        # Fresh ids so a replayed answer never overwrites an earlier message in the thread
+        tool_calls = [{**call, "id": f"call_{uuid.uuid4().hex[:24]}"} for call in message.tool_calls]
+        return AIMessage(
+            content=message.content,
+            tool_calls=tool_calls,
+            response_metadata={**message.response_metadata, "cache_hit": True},
+        )
+
+    def store(self, key: str, model: str, message: AIMessage):
+        if message.invalid_tool_calls or (not message.content and not message.tool_calls):
+            return
+        now = time.time()
+        data = json.dumps(message_to_dict(message), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, message, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, model, data, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": entries,
+        }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the process-wide response cache, or None when GROQ_RESPONSE_CACHE=false
+    """
+    global _response_cache
+    if os.environ.get("GROQ_RESPONSE_CACHE", "true").lower() != "true":
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                ttl_seconds=float(os.environ.get("GROQ_RESPONSE_CACHE_TTL", 24 * 3600)),
+                max_entries=int(os.environ.get("GROQ_RESPONSE_CACHE_MAX_ENTRIES", 5000)),
+            )
+        return _response_cache
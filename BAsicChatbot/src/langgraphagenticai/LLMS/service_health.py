@@ -0,0 +1,176 @@
+"""
+Background Groq health monitoring and health-aware request gating.
+
+`GroqHealthMonitor` polls the Groq status page from a daemon thread and keeps
+the latest result in memory, so the UI reads it instantly instead of making a
+request per click. It also keeps a sliding window of call outcomes reported by
+`ResilientChatModel`: successes and retryable failures (5xx, timeouts,
+connection errors) only, since a 4xx says nothing about the service and one
+user's bad key must not lock everyone out. While the status page reports a major outage, or most
+recent calls failed, `check()` raises ServiceDegradedError and new requests fail
+fast instead of waiting out timeouts and retries; cached responses are still
+served, since the response cache is consulted before the gate.
+
+GROQ_STATUS_URL points the poller at another endpoint (e.g. a local stub in
+tests), GROQ_STATUS_POLL_SECONDS sets the interval and GROQ_HEALTH_GATE=false
+turns the gate off.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from src.langgraphagenticai.LLMS.resilient_llm import CircuitOpenError
+from src.langgraphagenticai.utils.metrics import metrics
+
+DEFAULT_STATUS_URL = "https://groqstatus.com/api/v2/status.json"
+
+# Status page indicators (Statuspage.io) that block new requests
+BLOCKING_INDICATORS = {"major", "critical"}
+
+
+class ServiceDegradedError(CircuitOpenError):
+    """Raised without calling the API while the service is known to be degraded."""
+
+
+class GroqHealthMonitor:
+    """
+    Cached status page poller plus a recent error-rate window, both feeding `check()`.
+    """
+    def __init__(self, status_url: str = DEFAULT_STATUS_URL, poll_interval: float = 60.0, ttl: float = 180.0,
+                 error_window: float = 60.0, error_rate_threshold: float = 0.5, min_samples: int = 5,
+                 gate_enabled: bool = True, request_timeout: float = 5.0):
+        self.status_url = status_url
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+        self.error_window = error_window
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.gate_enabled = gate_enabled
+        self.request_timeout = request_timeout
+        self._status = None
+        self._outcomes = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread_pid = None
+
+    # Status page polling
+
+    def start(self):
+        """Starts the poller thread (again in a forked child, where the parent's thread does not exist)."""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name="groq-health-poller", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.poll()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def poll(self) -> Dict[str, Any]:
+        """Fetches the status page once and caches the result."""
+        try:
+            with metrics.time("http", "groq_status"):
+                response = httpx.get(self.status_url, timeout=self.request_timeout)
+            response.raise_for_status()
+            status = response.json().get("status", {})
+            indicator = status.get("indicator", "unknown")
+            result = {
+                "indicator": indicator,
+                "description": status.get("description", "Unknown status"),
+                "is_operational": indicator == "none",
+            }
+        except Exception as e:
+            result = {
+                "indicator": "unknown",
+                "description": f"Could not determine service status ({type(e).__name__})",
+                "is_operational": False,
+            }
+        result["checked_at"] = time.time()
+        with self._lock:
+            self._status = result
+        return result
+
+    def refresh(self):
+        """Asks the poller to check now instead of at the next interval."""
+        self.start()
+        self._wake.set()
+
+    def status(self) -> Dict[str, Any]:
+        """The latest cached status, without any network call; "unknown" until the first poll or when stale."""
+        self.start()
+        with self._lock:
+            status = self._status
+        if status is None or time.time() - status["checked_at"] > self.ttl:
+            return {"indicator": "unknown", "description": "Status not checked yet" if status is None
+                    else "Status is stale", "is_operational": False,
+                    "checked_at": status["checked_at"] if status else None}
+        return dict(status)
+
+    # Outcomes reported by the LLM layer
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.error_window:
+            self._outcomes.popleft()
+
+    def record_result(self, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            self._outcomes.append((now, ok))
+            self._trim(now)
+
+    def error_rate(self) -> Tuple[float, int]:
+        """(failure share, number of calls) over the error window."""
+        with self._lock:
+            self._trim(time.monotonic())
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+        return (failures / total if total else 0.0), total
+
+    # Gating
+
+    def degraded(self) -> Optional[str]:
+        """The reason new requests should fail fast, or None when the service looks healthy."""
+        status = self.status()
+        if status["indicator"] in BLOCKING_INDICATORS:
+            return f"status page reports {status['description']}"
+        rate, samples = self.error_rate()
+        if samples >= self.min_samples and rate >= self.error_rate_threshold:
+            return f"{rate:.0%} of the last {samples} calls failed"
+        return None
+
+    def check(self):
+        """Raises ServiceDegradedError while the service is degraded (and the gate is on)."""
+        if not self.gate_enabled:
+            return
+        reason = self.degraded()
+        if reason:
+            raise ServiceDegradedError(f"Groq API Service unavailable: {reason}; failing fast")
+
+    def snapshot(self) -> Dict[str, Any]:
+        rate, samples = self.error_rate()
+        return {**self.status(), "error_rate": rate, "recent_calls": samples, "degraded": self.degraded()}
+
+
+_health_monitor = None
+_health_monitor_lock = threading.Lock()
+
+
+def get_health_monitor() -> GroqHealthMonitor:
+    """Returns the process-wide health monitor."""
+    global _health_monitor
+    with _health_monitor_lock:
+        if _health_monitor is None:
+            _health_monitor = GroqHealthMonitor(
+                status_url=os.environ.get("GROQ_STATUS_URL", DEFAULT_STATUS_URL),
+                poll_interval=float(os.environ.get("GROQ_STATUS_POLL_SECONDS", 60)),
+                gate_enabled=os.environ.get("GROQ_HEALTH_GATE", "true").lower() == "true",
+            )
+        return _health_monitor
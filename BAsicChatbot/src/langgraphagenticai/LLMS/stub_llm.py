@@ -0,0 +1,93 @@
+"""
+Offline stand-in for the Groq chat model.
+
+Answers instantly (or after a configurable latency) without an API key, streams
+its answer word by word, and never calls tools. Reports estimated token usage
+the way Groq does, on the message or on the last streamed chunk. Used to load-test the serving
+path locally without spending Groq quota.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.langgraphagenticai.utils.usage_ledger import estimate_text_tokens
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Echoes the last user message with the turn number of the conversation.
+    `latency_seconds` is spent before the first token, `token_delay_seconds`
+    between tokens; the async paths sleep without blocking the event loop.
+    """
+    latency_seconds: float = 0.0
+    token_delay_seconds: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency_seconds": self.latency_seconds}
+
+    @property
+    def model_name(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        # The stub never calls tools, so the tool schema is irrelevant
+        return self
+
+    @staticmethod
+    def _reply(messages: List) -> str:
+        human_turns = [message for message in messages if message.type == "human"]
+        last = human_turns[-1].content if human_turns else ""
+        return f"Echo (turn {len(human_turns)}): {last}"
+
+    def _tokens(self, messages: List) -> List[str]:
+        words = self._reply(messages).split(" ")
+        return [word if index == 0 else " " + word for index, word in enumerate(words)]
+
+    @staticmethod
+    def _usage(messages: List, tokens: List[str]) -> Dict[str, int]:
+        prompt = estimate_text_tokens([str(message.content) for message in messages])
+        return {"input_tokens": prompt, "output_tokens": len(tokens), "total_tokens": prompt + len(tokens)}
+
+    def _result(self, messages: List) -> ChatResult:
+        message = AIMessage(content=self._reply(messages), usage_metadata=self._usage(messages, self._tokens(messages)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages: List):
+        tokens = self._tokens(messages)
+        for index, token in enumerate(tokens):
+            usage = self._usage(messages, tokens) if index == len(tokens) - 1 else None
+            yield token, ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+
+    def _generate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_seconds)
+        return self._result(messages)
+
+    def _stream(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        time.sleep(self.latency_seconds)
+        for token, chunk in self._chunks(messages):
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            time.sleep(self.token_delay_seconds)
+
+    async def _astream(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_seconds)
+        for token, chunk in self._chunks(messages):
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(self.token_delay_seconds)
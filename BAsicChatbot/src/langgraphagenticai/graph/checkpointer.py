@@ -0,0 +1,112 @@
+"""
+Checkpointers for the headless HTTP server.
+
+The server keeps each conversation's memory in a LangGraph checkpointer, keyed
+by `thread_id`. CHAT_SERVER_CHECKPOINTER chooses it:
+
+- "memory" (default): `BoundedMemorySaver`, an in-process saver that evicts
+  threads idle for CHAT_SERVER_THREAD_TTL seconds and caps the number of kept
+  threads at CHAT_SERVER_MAX_THREADS, so memory stays bounded however many
+  conversations the server sees. Memory lives in one process and is lost on
+  restart, so it cannot back pre-forked workers.
+- "sqlite:<path>": LangGraph's AsyncSqliteSaver on a local database file (needs
+  the langgraph-checkpoint-sqlite package). Every process opens its own
+  connection to the same file, so conversations survive restarts and any
+  pre-forked worker can serve any turn of a thread.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+MEMORY = "memory"
+SQLITE_PREFIX = "sqlite:"
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver that forgets idle threads: least recently used threads past
+    `max_threads`, and any thread untouched for `idle_ttl` seconds.
+    """
+    def __init__(self, max_threads: int = 10000, idle_ttl: float = 3600.0, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.idle_ttl = idle_ttl
+        self.evicted = 0
+        self._last_used = OrderedDict()
+        self._usage_lock = threading.Lock()
+
+    def _touch(self, config):
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if thread_id is None:
+            return
+        now = time.monotonic()
+        with self._usage_lock:
+            self._last_used[thread_id] = now
+            self._last_used.move_to_end(thread_id)
+            expired = []
+            while self._last_used:
+                oldest, used_at = next(iter(self._last_used.items()))
+                if oldest == thread_id or (len(self._last_used) <= self.max_threads
+                                           and now - used_at <= self.idle_ttl):
+                    break
+                del self._last_used[oldest]
+                expired.append(oldest)
+            self.evicted += len(expired)
+        for stale in expired:
+            self.delete_thread(stale)
+
+    def thread_count(self) -> int:
+        with self._usage_lock:
+            return len(self._last_used)
+
+    def get_tuple(self, config):
+        self._touch(config)
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._touch(config)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._usage_lock:
+            self._last_used.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+
+def checkpointer_spec() -> str:
+    return os.environ.get("CHAT_SERVER_CHECKPOINTER", MEMORY)
+
+
+def is_shared(spec: str) -> bool:
+    """Whether every process sees the same checkpoints (required by pre-forked workers)."""
+    return spec.startswith(SQLITE_PREFIX)
+
+
+def memory_checkpointer() -> BoundedMemorySaver:
+    return BoundedMemorySaver(
+        max_threads=int(os.environ.get("CHAT_SERVER_MAX_THREADS", 10000)),
+        idle_ttl=float(os.environ.get("CHAT_SERVER_THREAD_TTL", 3600)),
+    )
+
+
+async def open_checkpointer(spec: str):
+    """
+    Opens the shared checkpointer named by `spec` in the calling process, on its
+    running event loop. Returns (checkpointer, close coroutine function).
+    """
+    if not is_shared(spec):
+        raise ValueError(f"Unknown CHAT_SERVER_CHECKPOINTER '{spec}'; use '{MEMORY}' or '{SQLITE_PREFIX}<path>'")
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise RuntimeError("CHAT_SERVER_CHECKPOINTER=sqlite:... needs the langgraph-checkpoint-sqlite package") from e
+    connection = await aiosqlite.connect(spec[len(SQLITE_PREFIX):], timeout=30)
+    await connection.execute("PRAGMA journal_mode=WAL")
+    saver = AsyncSqliteSaver(connection)
+    await saver.setup()
+    return saver, connection.close
@@ -0,0 +1,159 @@
+"""
+Map-reduce retrieval across several knowledge sources.
+
+`FanOutRetrieval` builds a subgraph that splits a multi-part question into
+sub-queries, sends every (sub-query, source) pair to its own `search` branch
+with LangGraph's `Send` so the branches run in the same step, and reduces the
+hits into one deduplicated, ranked context. Each branch has its own deadline,
+so the wall time is that of the slowest source, capped by the deadline, and
+not the sum of all of them.
+"""
+
+import asyncio
+import hashlib
+import re
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+
+from src.langgraphagenticai.nodes.parallel_tool_node import _tool_executor
+from src.langgraphagenticai.state.state import ResearchOutput, ResearchState
+from src.langgraphagenticai.tools.retrieval_sources import SOURCE_WEIGHTS, pick_sources
+from src.langgraphagenticai.utils.metrics import metered_node, metrics
+from src.langgraphagenticai.utils.tracing import traced
+
+
+# A list marker: "1." / "1)" / "-" / "*" followed by whitespace
+_LIST_MARKER = r"(?:\d+[.)]|[-*])\s+"
+
+
+def split_question(question: str, max_parts: int = 4) -> List[str]:
+    """
+    Splits a multi-part question on question marks, list items, semicolons and
+    "and also"; a single question is returned as is.
+    """
+    parts = re.split(rf"(?<=\?)\s+|\n+\s*(?:{_LIST_MARKER})?|;\s+|\s+and also\s+", question.strip())
+    # The first item keeps its marker through the split (no newline precedes it)
+    parts = [re.sub(rf"^{_LIST_MARKER}", "", part.strip()) for part in parts if part]
+    parts = [re.sub(r"^(?:and also|and|also)\s+", "", part.strip(" -*"), flags=re.IGNORECASE)
+             for part in parts if part]
+    parts = [part for part in parts if len(part.split()) >= 2]
+    return parts[:max_parts] or [question.strip()]
+
+
+class FanOutRetrieval:
+    """
+    Fan-out / reduce retrieval subgraph over named sources.
+    """
+    def __init__(self, sources: Dict, source_timeout: float = 10.0, max_hits: int = 8,
+                 max_context_chars: int = 6000):
+        self.sources = sources
+        self.source_timeout = source_timeout
+        self.max_hits = max_hits
+        self.max_context_chars = max_context_chars
+
+    def split(self, state: ResearchState) -> dict:
+        """Map step input: the question and its sub-queries; clears the previous turn's hits."""
+        question = ""
+        for message in reversed(state["messages"]):
+            if isinstance(message, HumanMessage):
+                question = message.content if isinstance(message.content, str) else str(message.content)
+                break
+        return {"question": question, "sub_queries": split_question(question), "results": None}
+
+    def dispatch(self, state: ResearchState):
+        """Sends each sub-query to every relevant source, all in one step."""
+        sends = [
+            Send("search", {"sub_query": sub_query, "source": source, "order": order})
+            for order, sub_query in enumerate(state.get("sub_queries", []))
+            for source in pick_sources(sub_query, self.sources)
+        ]
+        return sends or "reduce"
+
+    def _hits(self, branch: dict, hits) -> dict:
+        return {"results": [
+            {**hit, "sub_query": branch["sub_query"], "order": branch["order"], "rank": rank}
+            for rank, hit in enumerate(hits) if hit.get("content")
+        ]}
+
+    def _timed_source(self, source: str, sub_query: str):
+        with metrics.time("retrieval", source):
+            return self.sources[source](sub_query)
+
+    @traced(name="fanout_search", component="retrieval")
+    def search(self, branch: dict) -> dict:
+        """One (sub-query, source) branch; a source that errors or times out contributes nothing."""
+        future = _tool_executor.submit(self._timed_source, branch["source"], branch["sub_query"])
+        try:
+            return self._hits(branch, future.result(timeout=self.source_timeout))
+        except FutureTimeoutError:
+            print(f"Source {branch['source']} timed out for: {branch['sub_query']}")
+        except Exception as e:
+            print(f"Source {branch['source']} failed for '{branch['sub_query']}': {e}")
+        return {"results": []}
+
+    @traced(name="fanout_search_async", component="retrieval")
+    async def asearch(self, branch: dict) -> dict:
+        try:
+            hits = await asyncio.wait_for(
+                asyncio.to_thread(self._timed_source, branch["source"], branch["sub_query"]), timeout=self.source_timeout)
+            return self._hits(branch, hits)
+        except asyncio.TimeoutError:
+            print(f"Source {branch['source']} timed out for: {branch['sub_query']}")
+        except Exception as e:
+            print(f"Source {branch['source']} failed for '{branch['sub_query']}': {e}")
+        return {"results": []}
+
+    @staticmethod
+    def _fingerprint(hit) -> str:
+        text = " ".join(hit["content"].lower().split())[:300]
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def rank(self, results: List[dict]) -> List[dict]:
+        """
+        Deduplicates hits (same leading text, whatever the source) and orders them so
+        every sub-query's best hits come before anyone's second-best.
+        """
+        unique, seen = [], set()
+        ordered = sorted(results, key=lambda hit: (hit["rank"], -SOURCE_WEIGHTS.get(hit["source"], 0.5), hit["order"]))
+        for hit in ordered:
+            key = self._fingerprint(hit)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(hit)
+        return unique[:self.max_hits]
+
+    def reduce(self, state: ResearchState) -> dict:
+        """
+        Reduce step: one deduplicated, ranked context within the character budget
+        (separators included). The last hit is cut to fit; one with no room left
+        for any of its text is dropped rather than kept as a bare header.
+        """
+        sections, used = [], 0
+        for index, hit in enumerate(self.rank(state.get("results", [])), start=1):
+            origin = f"{hit['source']}: {hit['url']}" if hit.get("url") else hit["source"]
+            header = f"[{index}] ({origin}) "
+            separator = len("\n\n") if sections else 0
+            room = self.max_context_chars - used - separator - len(header)
+            if room <= 0:
+                break
+            sections.append(header + hit["content"][:room])
+            used += separator + len(sections[-1])
+        return {"context": "\n\n".join(sections)}
+
+    def build(self):
+        """Returns the compiled subgraph (input: messages; output: question, sub-queries and context)."""
+        builder = StateGraph(ResearchState, output_schema=ResearchOutput)
+        builder.add_node("split", metered_node("split", self.split))
+        builder.add_node("search", metered_node("search", RunnableLambda(self.search, afunc=self.asearch, name="search")))
+        builder.add_node("reduce", metered_node("reduce", self.reduce))
+        builder.add_edge(START, "split")
+        builder.add_conditional_edges("split", self.dispatch, ["search", "reduce"])
+        builder.add_edge("search", "reduce")
+        builder.add_edge("reduce", END)
+        return builder.compile()
@@ -1,19 +1,30 @@
+import os
 from langgraph.graph import StateGraph
-from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.state.state import State, RagState, ResearchState
 from langgraph.graph import START,END
 from src.langgraphagenticai.nodes.basic_chatbot_node import BasicChatbotNode
-from src.langgraphagenticai.tools.search_tool import get_tools,create_tool_node
-from langgraph.prebuilt import tools_condition,ToolNode
-from src.langgraphagenticai.nodes.chatbot_with_Tool_node import ChatbotWithToolNode
-from langsmith import traceable
+from src.langgraphagenticai.nodes.turn_budget import TurnBudget, timed_node
+from src.langgraphagenticai.utils.startup_report import startup_report
+from src.langgraphagenticai.utils.metrics import metered_node
+from langchain_core.runnables import RunnableLambda
+from src.langgraphagenticai.utils.tracing import traced
+
+# Tools, retrievers and their dependencies (OpenAI embeddings, Chroma, web loaders,
+# Tavily) are imported inside the build method of the use case that needs them,
+# so a Basic Chatbot session never loads them.
 
 
 class GraphBuilder:
-    def __init__(self,model):
+    def __init__(self,model,use_intent_router=True,speculative_prefetch=None,turn_budget=None):
         self.llm=model
+        self.turn_budget=turn_budget or TurnBudget()
+        self.use_intent_router=use_intent_router
+        if speculative_prefetch is None:
+            speculative_prefetch=os.environ.get("SPECULATIVE_PREFETCH","false").lower()=="true"
+        self.speculative_prefetch=speculative_prefetch
         self.graph_builder=StateGraph(State)
 
-    @traceable(name="basic_chatbot_build_graph")
+    @traced(name="basic_chatbot_build_graph", component="graph")
     def basic_chatbot_build_graph(self):
         """
         Builds a basic chatbot graph using LangGraph.
@@ -24,22 +35,43 @@ class GraphBuilder:
 
         self.basic_chatbot_node=BasicChatbotNode(self.llm)
 
-        self.graph_builder.add_node("chatbot",self.basic_chatbot_node.process)
+        # Sync and async implementations behind one node
+        self.graph_builder.add_node("chatbot",metered_node("chatbot",RunnableLambda(self.basic_chatbot_node.process,afunc=self.basic_chatbot_node.aprocess,name="chatbot")))
         self.graph_builder.add_edge(START,"chatbot")
         self.graph_builder.add_edge("chatbot",END)
 
-    @traceable(name="chatbot_with_tools_build_graph")
+    @traced(name="chatbot_with_tools_build_graph", component="graph")
     def chatbot_with_tools_build_graph(self):
         """
         Builds an advanced chatbot graph with tool integration.
         This method creates a chatbot graph that includes both a chatbot node 
         and a tool node. It defines tools, initializes the chatbot with tool 
         capabilities, and sets up conditional and direct edges between nodes. 
-        The chatbot node is set as the entry point.
+        The chatbot node is set as the entry point, unless the intent router is
+        enabled: then a deterministic router runs first and sends obvious
+        knowledge-base questions straight to the retrieval tool. With speculative
+        prefetch on, the router also starts likely retrievals in the background
+        and the tool node reuses them when the model asks for the same tool.
+        Each turn gets a deadline and a maximum number of tool rounds; once either
+        is spent, the next tool request goes to a finalize node that answers with
+        what has been gathered. Every hop's duration is recorded in the state.
         """
+        with startup_report.measure("import: Chatbot With Web"):
+            from langgraph.prebuilt import tools_condition
+            from src.langgraphagenticai.tools.search_tool import get_tools,create_tool_node
+            from src.langgraphagenticai.nodes.chatbot_with_Tool_node import ChatbotWithToolNode
+            from src.langgraphagenticai.nodes.intent_router_node import IntentRouterNode
+            from src.langgraphagenticai.nodes.speculative_prefetch import SpeculativePrefetcher, PrefetchPolicy
+
         ## Define the tool and tool node
         tools=get_tools()
-        tool_node=create_tool_node(tools)
+        tool_names=[tool.name for tool in tools]
+        use_router=self.use_intent_router and "himalaya_enterprises_search" in tool_names
+        prefetcher=None
+        if use_router and self.speculative_prefetch:
+            policy=PrefetchPolicy(prefetch_web=os.environ.get("SPECULATIVE_PREFETCH_WEB","false").lower()=="true")
+            prefetcher=SpeculativePrefetcher(tools,policy=policy)
+        tool_node=create_tool_node(tools,prefetcher=prefetcher)
 
         ## Define the LLM
         llm=self.llm
@@ -47,23 +79,98 @@ class GraphBuilder:
         ## Define the chatbot node
 
         obj_chatbot_with_node=ChatbotWithToolNode(llm)
-        chatbot_node=obj_chatbot_with_node.create_chatbot(tools)
+        router=IntentRouterNode(prefetcher=prefetcher) if use_router else None
+        chatbot_node=obj_chatbot_with_node.create_chatbot(
+            tools, on_first_hop=router.stats.observe_first_hop if router else None)
+        budget=self.turn_budget
         ## Add nodes
-        self.graph_builder.add_node("chatbot",chatbot_node)
-        self.graph_builder.add_node("tools",tool_node)
+        self.graph_builder.add_node("start_turn",budget.start_turn)
+        self.graph_builder.add_node("chatbot",timed_node("chatbot",chatbot_node))
+        self.graph_builder.add_node("tools",timed_node("tools",budget.count_tool_round(tool_node)))
+        self.graph_builder.add_node("finalize",timed_node("finalize",budget.create_finalize_node(llm)))
         # Define conditional and direct edges
-        self.graph_builder.add_edge(START,"chatbot")
-        self.graph_builder.add_conditional_edges("chatbot",tools_condition)
+        self.graph_builder.add_edge(START,"start_turn")
+        if router:
+            self.graph_builder.add_node("router",timed_node("router",router.process))
+            self.graph_builder.add_edge("start_turn","router")
+            self.graph_builder.add_conditional_edges("router",router.route,{"tools":"tools","chatbot":"chatbot"})
+        else:
+            self.graph_builder.add_edge("start_turn","chatbot")
+        after_chatbot=budget.route_after_chatbot(tools_condition)
+        if prefetcher:
+            after_chatbot=prefetcher.route_after_chatbot(after_chatbot)
+        self.graph_builder.add_conditional_edges(
+            "chatbot",after_chatbot,{"tools":"tools","finalize":"finalize",END:END})
         self.graph_builder.add_edge("tools","chatbot")
+        self.graph_builder.add_edge("finalize",END)
+
+    @traced(name="agentic_rag_build_graph", component="graph")
+    def agentic_rag_build_graph(self):
+        """
+        Builds the Agentic RAG graph over the Himalaya Enterprises knowledge base.
+        The agent decides whether to retrieve; retrieved chunks are graded in one
+        batched call, and if none is relevant the question is rewritten and
+        retrieved again (at most RAG_MAX_REWRITES times) before generating.
+        """
+        with startup_report.measure("import: Agentic RAG"):
+            from src.langgraphagenticai.nodes.agentic_rag_node import AgenticRagNode
+            from src.langgraphagenticai.tools.webloader_tool import get_himalaya_tool
+
+        self.graph_builder=StateGraph(RagState)
+        rag=AgenticRagNode(self.llm,get_himalaya_tool(),max_rewrites=int(os.environ.get("RAG_MAX_REWRITES",1)))
+
+        ## Add nodes
+        self.graph_builder.add_node("agent",metered_node("agent",RunnableLambda(rag.agent,afunc=rag.aagent,name="agent")))
+        self.graph_builder.add_node("retrieve",metered_node("retrieve",rag.retrieve))
+        self.graph_builder.add_node("grade_documents",metered_node("grade_documents",RunnableLambda(rag.grade_documents,afunc=rag.agrade_documents,name="grade_documents")))
+        self.graph_builder.add_node("rewrite",metered_node("rewrite",RunnableLambda(rag.rewrite,afunc=rag.arewrite,name="rewrite")))
+        self.graph_builder.add_node("generate",metered_node("generate",RunnableLambda(rag.generate,afunc=rag.agenerate,name="generate")))
+        # Define conditional and direct edges
+        self.graph_builder.add_edge(START,"agent")
+        self.graph_builder.add_conditional_edges("agent",rag.route_after_agent,{"retrieve":"retrieve",END:END})
+        self.graph_builder.add_edge("retrieve","grade_documents")
+        self.graph_builder.add_conditional_edges("grade_documents",rag.route_after_grading,{"generate":"generate","rewrite":"rewrite"})
+        self.graph_builder.add_edge("rewrite","retrieve")
+        self.graph_builder.add_edge("generate",END)
+
+    @traced(name="multi_source_research_build_graph", component="graph")
+    def multi_source_research_build_graph(self):
+        """
+        Builds the multi-source research graph: a fan-out subgraph splits the
+        question into sub-queries, searches every relevant source in parallel
+        and reduces the hits into one ranked context, which the model answers from.
+        """
+        with startup_report.measure("import: Multi-Source Research"):
+            from src.langgraphagenticai.tools.retrieval_sources import get_retrieval_sources
+            from src.langgraphagenticai.graph.fanout_retrieval import FanOutRetrieval
+            from src.langgraphagenticai.nodes.research_node import ResearchAnswerNode
+
+        self.graph_builder=StateGraph(ResearchState)
+        retrieval=FanOutRetrieval(get_retrieval_sources())
+        answer=ResearchAnswerNode(self.llm)
+
+        ## Add nodes
+        self.graph_builder.add_node("retrieve",retrieval.build())
+        self.graph_builder.add_node("answer",metered_node("answer",RunnableLambda(answer.process,afunc=answer.aprocess,name="answer")))
+        # Define direct edges
+        self.graph_builder.add_edge(START,"retrieve")
+        self.graph_builder.add_edge("retrieve","answer")
+        self.graph_builder.add_edge("answer",END)
 
-    @traceable(name="setup_graph")
-    def setup_graph(self, usecase: str):
+    @traced(name="setup_graph", component="graph")
+    def setup_graph(self, usecase: str, checkpointer=None):
         """
         Sets up the graph for the selected use case.
+        A checkpointer (shared across requests by the HTTP server) keeps each
+        thread's memory between turns.
         """
         if usecase == "Basic Chatbot":
             self.basic_chatbot_build_graph()
         if usecase == "Chatbot With Web":
             self.chatbot_with_tools_build_graph()
+        if usecase == "Agentic RAG":
+            self.agentic_rag_build_graph()
+        if usecase == "Multi-Source Research":
+            self.multi_source_research_build_graph()
 
-        return self.graph_builder.compile()
+        return self.graph_builder.compile(checkpointer=checkpointer)
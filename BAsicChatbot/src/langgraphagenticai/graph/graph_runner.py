@@ -0,0 +1,193 @@
+"""
+astream-based runner for the compiled graphs.
+
+`GraphRunner` turns one conversation turn into a stream of simple events
+(tokens, tool progress, final answer with latency figures) on top of
+`graph.astream`. Async callers (a headless server) consume `astream_turn`
+directly; sync callers such as the Streamlit script use `stream_turn`, which
+drives the same coroutine on one shared background event loop, so many
+conversations share a loop instead of needing a thread per request.
+
+Each turn waits for a slot from the turn scheduler before the graph runs, so a
+burst of users queues fairly instead of overloading Groq and the host. Whether
+a turn is traced in LangSmith is decided once per turn by the tracing policy.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from src.langgraphagenticai.graph.turn_scheduler import TurnScheduler, turn_scheduler
+from src.langgraphagenticai.utils.tracing import trace_scope
+
+
+class _BackgroundLoop:
+    """A single event loop running in a daemon thread, shared by sync callers."""
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="graph-runner-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coroutine):
+        """Runs a coroutine on the background loop and waits for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.get()).result()
+
+    def iterate(self, async_iterator: AsyncIterator) -> Iterator:
+        """
+        Drives an async iterator in a single task on the background loop and yields
+        its items here. One task for the whole iteration (not one per item) keeps
+        context variables set inside the iterator, such as the turn's tracing
+        decision, alive from the first item to the last.
+        """
+        items = queue.Queue()
+        pump_task = {}
+
+        async def pump():
+            pump_task["task"] = asyncio.current_task()
+            try:
+                async for item in async_iterator:
+                    items.put((False, item))
+            except Exception as e:
+                items.put((True, e))
+            else:
+                items.put((True, None))
+            finally:
+                await async_iterator.aclose()
+
+        async def stop():
+            task = pump_task.get("task")
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        loop = self.get()
+        pumping = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                finished, item = items.get()
+                if not finished:
+                    yield item
+                elif item is not None:
+                    raise item
+                else:
+                    return
+        finally:
+            # The consumer stopped early: cancel the turn and wait for its cleanup
+            if not pumping.done():
+                asyncio.run_coroutine_threadsafe(stop(), loop).result()
+
+
+background_loop = _BackgroundLoop()
+
+
+class GraphRunner:
+    """
+    Runs conversation turns through a compiled graph and emits UI-agnostic events:
+    - {"type": "token", "text", "message_id"}
+    - {"type": "tool_start", "name"} / {"type": "tool_end", "name", "status"}
+    - {"type": "done", "content", "time_to_first_token", "total_latency", "hops", "queue_wait"}
+    """
+    def __init__(self, graph, usecase: str = None, scheduler: TurnScheduler = None):
+        self.graph = graph
+        self.usecase = usecase
+        self.scheduler = scheduler or turn_scheduler
+
+    @staticmethod
+    def make_config(thread_id: str, usecase: str = None) -> Dict[str, Any]:
+        """Run config for a turn; the use case rides along in the metadata for usage accounting."""
+        return {"configurable": {"thread_id": thread_id}, "metadata": {"usecase": usecase}}
+
+    @staticmethod
+    def make_input(user_message: str) -> Dict[str, Any]:
+        return {"messages": [("user", user_message)]}
+
+    async def astream_turn(self, user_message: str, thread_id: str, config: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams one turn as events, ending with a "done" event. The turn first
+        waits for a scheduler slot (AdmissionRejected if it cannot get one in time).
+        """
+        queued = time.perf_counter()
+        async with self.scheduler.aadmit(thread_id, self.usecase):
+            queue_wait = time.perf_counter() - queued
+            with trace_scope("graph"):
+                async for event in self._astream_graph(user_message, thread_id, config):
+                    if event["type"] == "done":
+                        event["queue_wait"] = queue_wait
+                    yield event
+
+    async def _astream_graph(self, user_message: str, thread_id: str, config: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        config = config or self.make_config(thread_id, self.usecase)
+        started = time.perf_counter()
+        first_token_at = None
+        texts = {}
+        current_id = None
+        announced = set()
+        hops = []
+
+        async for mode, payload in self.graph.astream(self.make_input(user_message), config,
+                                                      stream_mode=["messages", "updates"]):
+            if mode == "messages":
+                chunk, metadata = payload
+                if not isinstance(chunk, AIMessage):
+                    continue
+                tool_calls = chunk.tool_call_chunks if isinstance(chunk, AIMessageChunk) else chunk.tool_calls
+                for tool_call in tool_calls:
+                    key = (chunk.id, tool_call.get("index", tool_call.get("id")))
+                    if tool_call.get("name") and key not in announced:
+                        announced.add(key)
+                        yield {"type": "tool_start", "name": tool_call["name"]}
+                if not isinstance(chunk.content, str) or not chunk.content:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                current_id = chunk.id
+                if isinstance(chunk, AIMessageChunk):
+                    texts[current_id] = texts.get(current_id, "") + chunk.content
+                else:
+                    # Complete message emitted by a node that did not stream (e.g. a cached reply)
+                    texts[current_id] = chunk.content
+                yield {"type": "token", "text": chunk.content, "message_id": current_id}
+            elif mode == "updates":
+                for value in payload.values():
+                    if isinstance(value, dict) and value.get("hop_timings"):
+                        hops.extend(value["hop_timings"])
+                    messages = value.get("messages", []) if isinstance(value, dict) else []
+                    if not isinstance(messages, list):
+                        messages = [messages]
+                    for message in messages:
+                        if isinstance(message, ToolMessage):
+                            yield {"type": "tool_end", "name": message.name, "status": message.status}
+
+        total = time.perf_counter() - started
+        yield {
+            "type": "done",
+            "content": texts.get(current_id, ""),
+            "time_to_first_token": (first_token_at - started) if first_token_at else None,
+            "total_latency": total,
+            "hops": hops,
+        }
+
+    async def arun_turn(self, user_message: str, thread_id: str, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Runs one turn and returns the final "done" event."""
+        result = {}
+        async for event in self.astream_turn(user_message, thread_id, config):
+            if event["type"] == "done":
+                result = event
+        return result
+
+    def stream_turn(self, user_message: str, thread_id: str, config: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """Sync bridge over astream_turn, for callers without an event loop (Streamlit)."""
+        return background_loop.iterate(self.astream_turn(user_message, thread_id, config))
+
+    def run_turn(self, user_message: str, thread_id: str, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        return background_loop.run(self.arun_turn(user_message, thread_id, config))
@@ -0,0 +1,299 @@
+"""
+Admission control for graph executions.
+
+Every conversation turn asks `TurnScheduler` for a slot before the graph runs.
+The scheduler caps how many turns run at once in this process, and queues the
+rest:
+
+- fairly across conversations: the waiting thread id served least recently
+  goes first, and a thread has at most one turn in flight (its turns share one
+  checkpoint, so running two at once would race anyway);
+- short "Basic Chatbot" turns before tool-heavy ones, with aging so a
+  tool-heavy turn that has waited `aging_seconds` is no longer passed over;
+- with a queue deadline: a turn that cannot start in time is rejected with
+  AdmissionRejected, immediately when the queue is full or the expected wait
+  already exceeds the deadline.
+
+Queue depth, in-flight turns, wait times, rejections and cancelled waits are
+available from `snapshot()`.
+Waiters can be threads (`admit`) or coroutines on any event loop (`aadmit`).
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+PRIORITY_SHORT = 0
+PRIORITY_TOOLS = 1
+
+# Use cases whose turns are a single LLM call
+SHORT_USECASES = {"Basic Chatbot"}
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a turn cannot start before its queue deadline."""
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def priority_for(usecase: Optional[str]) -> int:
+    return PRIORITY_SHORT if usecase in SHORT_USECASES else PRIORITY_TOOLS
+
+
+class _Waiter:
+    __slots__ = ("user", "priority", "enqueued", "wake", "granted")
+
+    def __init__(self, user: str, priority: int, wake):
+        self.user = user
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.wake = wake
+        self.granted = False
+
+
+class SchedulerStats:
+    """Admission counters and a window of recent queue waits."""
+    def __init__(self, window: int = 1000):
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        # Waiters whose caller went away; not rejections, the scheduler never refused them
+        self.cancelled = 0
+        self.waits = deque(maxlen=window)
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float):
+        self.admitted += 1
+        self.waits.append(seconds)
+        self.max_wait = max(self.max_wait, seconds)
+
+    def record_rejection(self, reason: str):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def wait_percentiles(self) -> dict:
+        waits = sorted(self.waits)
+        if not waits:
+            return {"p50": None, "p95": None, "p99": None}
+        pick = lambda q: waits[min(len(waits) - 1, int(q * len(waits)))]
+        return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+class TurnScheduler:
+    """
+    Global concurrency limit with a fair, prioritized queue in front of it.
+    """
+    def __init__(self, max_concurrent: int = 16, queue_timeout: float = 15.0, max_queue_depth: int = 128,
+                 max_per_user: int = 1, aging_seconds: float = 5.0, enabled: bool = True):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.max_queue_depth = max_queue_depth
+        self.max_per_user = max_per_user
+        self.aging_seconds = aging_seconds
+        self.enabled = enabled
+        self.stats = SchedulerStats()
+        # priority -> user -> waiting turns, in arrival order of the users
+        self._queues = {PRIORITY_SHORT: OrderedDict(), PRIORITY_TOOLS: OrderedDict()}
+        self._depth = 0
+        self._in_flight = 0
+        self._user_in_flight: Dict[str, int] = {}
+        # user -> sequence number of their last admission, most recent last (bounded)
+        self._last_served = OrderedDict()
+        self._service_seconds = None
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    # Queue bookkeeping; callers hold self._lock
+
+    def _eligible(self, user: str) -> bool:
+        return self._user_in_flight.get(user, 0) < self.max_per_user
+
+    def _grant(self, user: str):
+        self._in_flight += 1
+        self._user_in_flight[user] = self._user_in_flight.get(user, 0) + 1
+        self._last_served[user] = next(self._seq)
+        self._last_served.move_to_end(user)
+        if len(self._last_served) > 10000:
+            self._last_served.popitem(last=False)
+
+    def _head(self, priority: int) -> Optional[_Waiter]:
+        """The next waiter of this class: the least recently served user not already at their limit."""
+        best = None
+        for user, waiters in self._queues[priority].items():
+            if self._eligible(user):
+                if best is None or self._last_served.get(user, -1) < self._last_served.get(best.user, -1):
+                    best = waiters[0]
+        return best
+
+    def _pick(self) -> Optional[_Waiter]:
+        short, tools = self._head(PRIORITY_SHORT), self._head(PRIORITY_TOOLS)
+        if tools is not None and (short is None or time.monotonic() - tools.enqueued >= self.aging_seconds):
+            return tools
+        return short
+
+    def _remove(self, waiter: _Waiter):
+        queue = self._queues[waiter.priority]
+        waiters = queue.get(waiter.user)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._depth -= 1
+        if not waiters:
+            del queue[waiter.user]
+
+    def _dispatch(self):
+        while self._in_flight < self.max_concurrent:
+            waiter = self._pick()
+            if waiter is None:
+                return
+            self._remove(waiter)
+            self._grant(waiter.user)
+            waiter.granted = True
+            waiter.wake()
+
+    def _enqueue(self, user: str, priority: int, timeout: float, wake) -> Optional[_Waiter]:
+        """Admits right away (returns None), queues (returns the waiter) or raises AdmissionRejected."""
+        with self._lock:
+            # Waiters of the same or a higher priority start before this one
+            ahead = sum(len(waiters) for level, queue in self._queues.items() if level <= priority
+                        for waiters in queue.values())
+            waiter = _Waiter(user, priority, wake)
+            self._queues[priority].setdefault(user, deque()).append(waiter)
+            self._depth += 1
+            self._dispatch()
+            if waiter.granted:
+                self.stats.record_wait(0.0)
+                return None
+            if self._depth > self.max_queue_depth:
+                self._remove(waiter)
+                self.stats.record_rejection("queue_full")
+                raise AdmissionRejected(f"Turn queue is full ({self._depth} waiting)",
+                                        retry_after=self._service_seconds or 1.0)
+            # Until a turn has finished there is no service time to estimate with
+            expected_wait = (ahead + 1) / self.max_concurrent * (self._service_seconds or 0.0)
+            if expected_wait > timeout:
+                self._remove(waiter)
+                self.stats.record_rejection("expected_wait")
+                raise AdmissionRejected(
+                    f"Expected queue wait {expected_wait:.1f}s exceeds the {timeout:g}s deadline",
+                    retry_after=expected_wait,
+                )
+            return waiter
+
+    def _give_up(self, waiter: _Waiter, cancelled: bool = False) -> bool:
+        """Leaves the queue; returns True if the slot was granted in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._remove(waiter)
+            if cancelled:
+                self.stats.cancelled += 1
+            else:
+                self.stats.record_rejection("deadline")
+            return False
+
+    def _admitted(self, waiter: _Waiter):
+        with self._lock:
+            self.stats.record_wait(time.monotonic() - waiter.enqueued)
+
+    def release(self, user: str, service_seconds: Optional[float]):
+        """Frees the user's slot; `service_seconds` is None for a slot that was never used."""
+        with self._lock:
+            self._in_flight -= 1
+            remaining = self._user_in_flight.get(user, 1) - 1
+            if remaining:
+                self._user_in_flight[user] = remaining
+            else:
+                self._user_in_flight.pop(user, None)
+            # Moving average of how long a turn holds its slot, for the expected-wait estimate
+            if service_seconds is not None and self._service_seconds is None:
+                self._service_seconds = service_seconds
+            elif service_seconds is not None:
+                self._service_seconds = 0.9 * self._service_seconds + 0.1 * service_seconds
+            self._dispatch()
+
+    def _deadline_error(self, timeout: float) -> AdmissionRejected:
+        return AdmissionRejected(f"Turn could not start within the {timeout:g}s queue deadline",
+                                 retry_after=self._service_seconds or timeout)
+
+    @contextmanager
+    def admit(self, user: str, usecase: str = None, timeout: float = None):
+        """Holds a turn slot for the duration of the block (blocking callers)."""
+        if not self.enabled:
+            yield
+            return
+        timeout = self.queue_timeout if timeout is None else timeout
+        event = threading.Event()
+        waiter = self._enqueue(user, priority_for(usecase), timeout, event.set)
+        if waiter is not None:
+            if not event.wait(timeout) and not self._give_up(waiter):
+                raise self._deadline_error(timeout)
+            self._admitted(waiter)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user, time.monotonic() - started)
+
+    @asynccontextmanager
+    async def aadmit(self, user: str, usecase: str = None, timeout: float = None):
+        """Async variant; waits without blocking the event loop."""
+        if not self.enabled:
+            yield
+            return
+        timeout = self.queue_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(True))
+
+        waiter = self._enqueue(user, priority_for(usecase), timeout, wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                if not self._give_up(waiter):
+                    raise self._deadline_error(timeout)
+            except asyncio.CancelledError:
+                # The caller went away while queued (e.g. a closed HTTP connection)
+                if self._give_up(waiter, cancelled=True):
+                    self.release(user, None)
+                raise
+            self._admitted(waiter)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user, time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        """Queue depth, in-flight turns, admissions, rejections and queue-wait percentiles."""
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrent": self.max_concurrent,
+                "queue_depth": self._depth,
+                "queue_depth_by_priority": {
+                    "short": sum(len(waiters) for waiters in self._queues[PRIORITY_SHORT].values()),
+                    "tools": sum(len(waiters) for waiters in self._queues[PRIORITY_TOOLS].values()),
+                },
+                "admitted": self.stats.admitted,
+                "rejected": dict(self.stats.rejected),
+                "cancelled": self.stats.cancelled,
+                "queue_wait_seconds": {**self.stats.wait_percentiles(), "max": self.stats.max_wait},
+                "avg_turn_seconds": self._service_seconds,
+            }
+
+
+# Process-wide scheduler in front of every graph execution
+turn_scheduler = TurnScheduler(
+    max_concurrent=int(os.environ.get("TURN_MAX_CONCURRENT", 16)),
+    queue_timeout=float(os.environ.get("TURN_QUEUE_TIMEOUT", 15)),
+    max_queue_depth=int(os.environ.get("TURN_MAX_QUEUE", 128)),
+    enabled=os.environ.get("TURN_SCHEDULER", "true").lower() == "true",
+)
@@ -1,46 +1,117 @@
+import os
+import time
+_import_started = time.perf_counter()
 import streamlit as st
 from src.langgraphagenticai.ui.streamlitui.loadui import LoadStreamlitUI
 from src.langgraphagenticai.LLMS.groqllm import GroqLLM
 from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+from src.langgraphagenticai.graph.turn_scheduler import AdmissionRejected
 from src.langgraphagenticai.ui.streamlitui.display_result import DisplayResultStreamlit
+from src.langgraphagenticai.ui.streamlitui.chat_history import ChatHistory
 from src.langgraphagenticai.utils.service_status import ServiceStatusChecker
+from src.langgraphagenticai.LLMS.service_health import get_health_monitor
 from src.langgraphagenticai.utils.langsmith_config import setup_langsmith
 from src.langgraphagenticai.utils.langsmith_monitor import LangSmithMonitor
+from src.langgraphagenticai.utils.startup_report import startup_report
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.usage_ledger import get_usage_ledger
 from dotenv import load_dotenv
-from langsmith import traceable
+from src.langgraphagenticai.utils.tracing import traced
 
 # Load environment variables
 load_dotenv()
 
-# Initialize LangSmith for debugging and monitoring
-langsmith_enabled = setup_langsmith()
 monitor = LangSmithMonitor()
+startup_report.record("import app modules", time.perf_counter() - _import_started)
 
-@traceable(name="langgraph_agenticai_app")
+
+def show_startup_report():
+    """Sidebar panel with the cold-start timings of this process."""
+    with st.expander("⏱️ Startup Time"):
+        for name, seconds in startup_report.timings().items():
+            st.write(f"• {name}: {seconds:.2f}s")
+
+def show_metrics_panel():
+    """Sidebar panel with this process's stage latencies and counters (same data as /metrics)."""
+    with st.expander("📈 Latency & Counters"):
+        rows = metrics.rows()
+        if not rows:
+            st.write("No measurements yet.")
+            return
+        st.dataframe(rows, hide_index=True)
+        for counter, series in metrics.snapshot()["counters"].items():
+            for entry in series:
+                labels = ", ".join(f"{key}={value}" for key, value in entry["labels"].items())
+                st.write(f"• {counter} ({labels}): {entry['value']:g}")
+        for component, stats in metrics.snapshot()["components"].items():
+            values = ", ".join(f"{key}={value:.3g}" if isinstance(value, float) else f"{key}={value}"
+                               for key, value in stats.items())
+            st.write(f"• {component}: {values}")
+
+# Streamlit reruns the script on every interaction; the ledger is read at most this often per session
+USAGE_PANEL_TTL = 5.0
+
+def _usage_panel_data(ledger, thread_id):
+    """This conversation's totals and today's per-model totals, cached in the session for a few seconds."""
+    cached = st.session_state.get("usage_panel")
+    now = time.monotonic()
+    if cached is None or cached["thread_id"] != thread_id or now - cached["read_at"] > USAGE_PANEL_TTL:
+        cached = {"thread_id": thread_id, "read_at": now,
+                  "usage": ledger.thread_usage(thread_id), "rows": ledger.totals("model", since_days=0)}
+        st.session_state.usage_panel = cached
+    return cached
+
+def show_usage_panel(thread_id):
+    """Sidebar panel with this conversation's tokens and today's spend per model (same data as /usage)."""
+    ledger = get_usage_ledger()
+    if ledger is None:
+        return
+    with st.expander("🧮 Token Usage"):
+        data = _usage_panel_data(ledger, thread_id)
+        usage = data["usage"]
+        st.write(f"• This conversation: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens "
+                 f"in {usage['calls']} calls ({usage['cached_calls']} cached)")
+        st.write(f"• Tool output: ~{usage['tool_tokens']} tokens · embeddings: ~{usage['embedding_tokens']} tokens")
+        rows = data["rows"]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+
+@traced(name="langgraph_agenticai_app", component="app")
 def load_langgraph_agenticai_app():
     """
     Loads and runs the LangGraph AgenticAI application with Streamlit UI.
     This function initializes the UI, handles user input, configures the LLM model,
     sets up the graph based on the selected use case, and displays the output while 
     implementing exception handling for robustness. Now includes chat memory support.
+    The UI loader and its config are built once per session, not on every rerun.
     """
+    render_started = time.perf_counter()
 
     # Initialize session state for chat history and thread ID
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-    
     if "thread_id" not in st.session_state:
         import uuid
         st.session_state.thread_id = str(uuid.uuid4())
+    history = ChatHistory()
 
     ##Load UI
-    ui=LoadStreamlitUI()
+    if "ui" not in st.session_state:
+        st.session_state.ui = LoadStreamlitUI()
+    ui=st.session_state.ui
     user_input=ui.load_streamlit_ui()
 
+    # Initialize LangSmith for debugging and monitoring (a no-op unless the key changed)
+    langsmith_enabled = setup_langsmith()
+
     if not user_input:
         st.error("Error: Failed to load user input from the UI.")
         return
     
+    # Open the Groq connection before the first turn (once per key and model)
+    if os.environ.get("GROQ_WARM_UP", "true").lower() == "true":
+        GroqLLM(user_contols_input=user_input).warm_up()
+    # Background Groq status polling (once per process)
+    get_health_monitor().start()
+
     # Add LangSmith monitoring sidebar
     with st.sidebar:
         st.markdown("---")
@@ -49,6 +120,7 @@ def load_langgraph_agenticai_app():
         if langsmith_enabled:
             st.success("✅ LangSmith Enabled")
             config = monitor.get_monitoring_config()
+            st.caption(f"Sampling {config['sample_rate']:.0%} of traces")
             
             # Dashboard links
             st.markdown(f"🔗 [Dashboard]({config['dashboard_url']})")
@@ -63,16 +135,20 @@ def load_langgraph_agenticai_app():
             st.warning("⚠️ LangSmith Not Configured")
             st.info("Add LANGSMITH_API_KEY to .env file to enable monitoring")
     
-    # Display chat history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.write(message["content"])
+    # Display chat history (the recent window, plus older pages the user opened)
+    history.render()
+
+    startup_report.record("first render", time.perf_counter() - render_started)
+    with st.sidebar:
+        show_startup_report()
+        show_metrics_panel()
+        show_usage_panel(st.session_state.thread_id)
     
     user_message = st.chat_input("Enter your message:")
 
     if user_message:
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_message})
+        history.append("user", user_message)
         
         # Display user message
         with st.chat_message("user"):
@@ -99,7 +175,11 @@ def load_langgraph_agenticai_app():
             try:
                  graph=graph_builder.setup_graph(usecase)
                  print(user_message)
-                 DisplayResultStreamlit(usecase, graph, user_message, st.session_state.thread_id).display_result_on_ui()
+                 DisplayResultStreamlit(usecase, graph, user_message, st.session_state.thread_id,
+                                        streaming=user_input.get("stream_responses", False)).display_result_on_ui()
+            except AdmissionRejected as e:
+                 st.warning(f"⏳ The assistant is busy right now. Please retry in {max(1, round(e.retry_after))}s.")
+                 return
             except Exception as e:
                  error_msg = str(e)
                  if "503" in error_msg or "Service unavailable" in error_msg:
@@ -0,0 +1,219 @@
+"""
+Agentic RAG over the Himalaya Enterprises knowledge base.
+
+Production version of the agent -> retrieve -> grade -> rewrite/generate loop
+prototyped in AgenticRag/agenticRag.ipynb:
+- prompts are module constants and the models are the pooled instances, built
+  once instead of inside every node (no `hub.pull` per answer);
+- all retrieved chunks are graded in one structured-output call, and only the
+  relevant ones reach the answer;
+- a rewrite goes straight back to retrieval, at most `max_rewrites` times.
+A turn that retrieves costs one LLM call more than the tools chatbot: the grader.
+"""
+
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langgraph.graph import END
+from pydantic import BaseModel, Field
+
+from src.langgraphagenticai.LLMS.client_pool import groq_client_pool
+from src.langgraphagenticai.state.state import RagState
+from src.langgraphagenticai.state.tool_compaction import ToolOutputCompactor
+from src.langgraphagenticai.utils.tracing import traced
+
+# Same instructions as the rlm/rag-prompt hub prompt used in the notebook
+RAG_PROMPT = ChatPromptTemplate.from_messages([
+    ("human",
+     "You are an assistant for question-answering tasks. Use the following pieces of retrieved "
+     "context to answer the question. If you don't know the answer, just say that you don't know. "
+     "Use three sentences maximum and keep the answer concise.\n"
+     "Question: {question} \nContext: {context} \nAnswer:"),
+])
+
+GRADE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system",
+     "You are a grader assessing the relevance of retrieved chunks to a user question. "
+     "A chunk is relevant if it contains keywords or meaning related to the question. "
+     "Grade every chunk listed, by its number."),
+    ("human", "Question: {question}\n\nRetrieved chunks:\n\n{chunks}"),
+])
+
+REWRITE_PROMPT = ChatPromptTemplate.from_messages([
+    ("human",
+     "Look at the input and try to reason about the underlying semantic intent / meaning.\n"
+     "Here is the initial question:\n ------- \n{question}\n ------- \n"
+     "The search for it found nothing relevant. Reply with only an improved search query."),
+])
+
+# Calls whose output is internal to the graph are kept out of the token stream
+_INTERNAL = {"tags": ["nostream"]}
+
+
+class ChunkGrade(BaseModel):
+    """Relevance of one retrieved chunk."""
+    index: int = Field(description="Number of the chunk as listed")
+    relevant: bool = Field(description="Whether the chunk is relevant to the question")
+
+
+class DocumentGrades(BaseModel):
+    """Relevance of each retrieved chunk to the user question."""
+    grades: List[ChunkGrade]
+
+
+class AgenticRagNode:
+    """
+    Nodes and routing of the Agentic RAG graph.
+    """
+    def __init__(self, model, retrieval_tool, max_rewrites: int = 1, max_chunk_chars: int = 1500,
+                 compactor: ToolOutputCompactor = None):
+        self.llm = model
+        self.retrieval_tool = retrieval_tool
+        self.max_rewrites = max_rewrites
+        self.max_chunk_chars = max_chunk_chars
+        self.compactor = compactor or ToolOutputCompactor()
+        # Built once per model (cached in the pool), not per node call
+        self.agent_llm = groq_client_pool.bind_tools(model, [retrieval_tool])
+        self.grader = GRADE_PROMPT | groq_client_pool.with_structured_output(model, DocumentGrades).with_config(_INTERNAL)
+        self.rewriter = (REWRITE_PROMPT | model).with_config(_INTERNAL)
+        self.generator = RAG_PROMPT | model
+
+    @staticmethod
+    def _question(state: RagState) -> str:
+        for message in reversed(state["messages"]):
+            if isinstance(message, HumanMessage):
+                return message.content if isinstance(message.content, str) else str(message.content)
+        return ""
+
+    def _agent_input(self, state: RagState):
+        compacted = self.compactor.compact(state["messages"])
+        return compacted, self.compactor.apply(state["messages"], compacted)
+
+    def _agent_update(self, state: RagState, compacted, response) -> dict:
+        return {
+            "messages": compacted + [response],
+            "question": self._question(state),
+            "search_query": "",
+            "rewrite_count": 0,
+            "documents": [],
+        }
+
+    @traced(name="agentic_rag_agent", component="nodes")
+    def agent(self, state: RagState) -> dict:
+        """Decides whether to search the knowledge base or answer directly."""
+        compacted, messages = self._agent_input(state)
+        return self._agent_update(state, compacted, self.agent_llm.invoke(messages))
+
+    @traced(name="agentic_rag_agent_async", component="nodes")
+    async def aagent(self, state: RagState) -> dict:
+        compacted, messages = self._agent_input(state)
+        return self._agent_update(state, compacted, await self.agent_llm.ainvoke(messages))
+
+    @traced(name="agentic_rag_retrieve", component="nodes")
+    def retrieve(self, state: RagState) -> dict:
+        """
+        Retrieves chunks for the agent's query, or for the rewritten query on a retry.
+        The agent's tool call is answered with a ToolMessage so the history stays valid.
+        """
+        last_message = state["messages"][-1]
+        tool_calls = last_message.tool_calls if isinstance(last_message, AIMessage) else []
+        if state.get("search_query"):
+            query = state["search_query"]
+        elif tool_calls:
+            query = tool_calls[0]["args"].get("query") or state.get("question", "")
+        else:
+            query = state.get("question", "")
+        documents = self.retrieval_tool.retrieve_documents(query)
+        update = {"documents": documents}
+        if tool_calls:
+            content = "\n\n".join(doc.page_content for doc in documents) or "No relevant information found."
+            update["messages"] = [
+                ToolMessage(content=content if index == 0 else "See the first search result.",
+                            name=call["name"], tool_call_id=call["id"])
+                for index, call in enumerate(tool_calls)
+            ]
+        return update
+
+    def _grade_input(self, state: RagState) -> dict:
+        chunks = "\n\n".join(
+            f"[{index}] {doc.page_content[:self.max_chunk_chars]}"
+            for index, doc in enumerate(state.get("documents", []), start=1)
+        )
+        return {"question": state.get("question", ""), "chunks": chunks}
+
+    @staticmethod
+    def _grade_update(state: RagState, grades) -> dict:
+        documents = state.get("documents", [])
+        if grades is None:
+            return {}
+        relevant = {grade.index for grade in grades.grades if grade.relevant}
+        kept = [doc for index, doc in enumerate(documents, start=1) if index in relevant]
+        print(f"Graded {len(documents)} chunks, {len(kept)} relevant")
+        return {"documents": kept}
+
+    @traced(name="agentic_rag_grade_documents", component="nodes")
+    def grade_documents(self, state: RagState) -> dict:
+        """Grades all retrieved chunks in a single structured-output call and keeps the relevant ones."""
+        if not state.get("documents"):
+            return {}
+        try:
+            grades = self.grader.invoke(self._grade_input(state))
+        except Exception as e:
+            # Fail open: an ungraded answer is better than no answer
+            print(f"Document grading failed, keeping all chunks: {e}")
+            grades = None
+        return self._grade_update(state, grades)
+
+    @traced(name="agentic_rag_grade_documents_async", component="nodes")
+    async def agrade_documents(self, state: RagState) -> dict:
+        if not state.get("documents"):
+            return {}
+        try:
+            grades = await self.grader.ainvoke(self._grade_input(state))
+        except Exception as e:
+            print(f"Document grading failed, keeping all chunks: {e}")
+            grades = None
+        return self._grade_update(state, grades)
+
+    def route_after_grading(self, state: RagState) -> str:
+        """Generates when something relevant was found, otherwise rewrites while retries remain."""
+        if state.get("documents") or state.get("rewrite_count", 0) >= self.max_rewrites:
+            return "generate"
+        return "rewrite"
+
+    @staticmethod
+    def _rewrite_update(state: RagState, response) -> dict:
+        query = response.content.strip().strip('"') or state.get("question", "")
+        print(f"Rewrote query: {query}")
+        return {"search_query": query, "rewrite_count": state.get("rewrite_count", 0) + 1}
+
+    @traced(name="agentic_rag_rewrite", component="nodes")
+    def rewrite(self, state: RagState) -> dict:
+        """Rewrites the question into a better search query."""
+        return self._rewrite_update(state, self.rewriter.invoke({"question": state.get("question", "")}))
+
+    @traced(name="agentic_rag_rewrite_async", component="nodes")
+    async def arewrite(self, state: RagState) -> dict:
+        return self._rewrite_update(state, await self.rewriter.ainvoke({"question": state.get("question", "")}))
+
+    @staticmethod
+    def _generate_input(state: RagState) -> dict:
+        context = "\n\n".join(doc.page_content for doc in state.get("documents", []))
+        return {"question": state.get("question", ""), "context": context or "No relevant context was found."}
+
+    @traced(name="agentic_rag_generate", component="nodes")
+    def generate(self, state: RagState) -> dict:
+        """Answers from the relevant chunks."""
+        return {"messages": [self.generator.invoke(self._generate_input(state))]}
+
+    @traced(name="agentic_rag_generate_async", component="nodes")
+    async def agenerate(self, state: RagState) -> dict:
+        return {"messages": [await self.generator.ainvoke(self._generate_input(state))]}
+
+    @staticmethod
+    def route_after_agent(state: RagState) -> str:
+        last_message = state["messages"][-1]
+        if isinstance(last_message, AIMessage) and last_message.tool_calls:
+            return "retrieve"
+        return END
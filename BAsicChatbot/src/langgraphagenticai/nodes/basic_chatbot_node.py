@@ -1,5 +1,5 @@
 from src.langgraphagenticai.state.state import State
-from langsmith import traceable
+from src.langgraphagenticai.utils.tracing import traced
 
 class BasicChatbotNode:
     """
@@ -8,10 +8,17 @@ class BasicChatbotNode:
     def __init__(self,model):
         self.llm=model
 
-    @traceable(name="basic_chatbot_process")
+    @traced(name="basic_chatbot_process", component="nodes")
     def process(self,state:State)->dict:
         """
         Processes the input state and generates a chatbot response.
         """
         return {"messages":self.llm.invoke(state['messages'])}
 
+    @traced(name="basic_chatbot_aprocess", component="nodes")
+    async def aprocess(self,state:State)->dict:
+        """
+        Async variant of process, used when the graph runs via ainvoke/astream.
+        """
+        return {"messages":await self.llm.ainvoke(state['messages'])}
+
@@ -1,14 +1,20 @@
+import time
+from langchain_core.messages import HumanMessage
 from src.langgraphagenticai.state.state import State
-from langsmith import traceable
+from src.langgraphagenticai.state.tool_compaction import ToolOutputCompactor
+from src.langgraphagenticai.LLMS.client_pool import groq_client_pool
+from langchain_core.runnables import RunnableLambda
+from src.langgraphagenticai.utils.tracing import traced
 
 class ChatbotWithToolNode:
     """
     Chatbot logic enhanced with tool integration.
     """
-    def __init__(self,model):
+    def __init__(self,model,compactor=None):
         self.llm = model
+        self.compactor = compactor or ToolOutputCompactor()
 
-    @traceable(name="chatbot_with_tools_process")
+    @traced(name="chatbot_with_tools_process", component="nodes")
     def process(self, state: State) -> dict:
         """
         Processes the input state and generates a response with tool integration.
@@ -22,18 +28,43 @@ class ChatbotWithToolNode:
         return {"messages": [llm_response, tools_response]}
     
 
-    @traceable(name="create_chatbot_with_tools")
-    def create_chatbot(self, tools):
+    @traced(name="create_chatbot_with_tools", component="nodes")
+    def create_chatbot(self, tools, on_first_hop=None):
         """
         Returns a chatbot node function.
+        `on_first_hop(seconds)` is called with the duration of the first call of
+        each turn (the one that decides whether to use a tool).
         """
-        llm_with_tools = self.llm.bind_tools(tools)
+        # Cached per model and tool schema, so repeated turns skip bind_tools
+        llm_with_tools = groq_client_pool.bind_tools(self.llm, tools)
+        compactor = self.compactor
 
         def chatbot_node(state: State):
             """
             Chatbot logic for processing the input state and returning a response.
+            Tool outputs the model has already seen (earlier rounds of this turn,
+            earlier turns) are replaced with stubs before the call, and the stubs
+            are written back to the state.
             """
-            return {"messages": [llm_with_tools.invoke(state["messages"])]}
+            compacted = compactor.compact(state["messages"])
+            messages = compactor.apply(state["messages"], compacted)
+            started = time.perf_counter()
+            response = llm_with_tools.invoke(messages)
+            if on_first_hop and isinstance(state["messages"][-1], HumanMessage):
+                on_first_hop(time.perf_counter() - started)
+            return {"messages": compacted + [response]}
 
-        return chatbot_node
+        async def achatbot_node(state: State):
+            """
+            Async variant of chatbot_node, used when the graph runs via ainvoke/astream.
+            """
+            compacted = compactor.compact(state["messages"])
+            messages = compactor.apply(state["messages"], compacted)
+            started = time.perf_counter()
+            response = await llm_with_tools.ainvoke(messages)
+            if on_first_hop and isinstance(state["messages"][-1], HumanMessage):
+                on_first_hop(time.perf_counter() - started)
+            return {"messages": compacted + [response]}
 
+        # Sync and async implementations behind one node
+        return RunnableLambda(chatbot_node, afunc=achatbot_node, name="chatbot")
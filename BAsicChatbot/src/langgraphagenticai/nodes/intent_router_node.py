@@ -0,0 +1,106 @@
+import threading
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.tools.intents import classify_intents, mentions_company, needs_web
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.tracing import traced
+
+HIMALAYA_TOOL_NAME = "himalaya_enterprises_search"
+
+
+class RouterStats:
+    """
+    Counts how often the shortcut fires and estimates the latency it saves.
+    The saving per shortcut is the running average of the first chatbot hop
+    (the tool-decision call) observed on turns that were not shortcut.
+    """
+    def __init__(self, smoothing: float = 0.2):
+        self.turns = 0
+        self.shortcuts = 0
+        self.first_hop_seconds = None
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def record_turn(self, shortcut: bool):
+        with self._lock:
+            self.turns += 1
+            if shortcut:
+                self.shortcuts += 1
+
+    def observe_first_hop(self, seconds: float):
+        with self._lock:
+            if self.first_hop_seconds is None:
+                self.first_hop_seconds = seconds
+            else:
+                self.first_hop_seconds += self.smoothing * (seconds - self.first_hop_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            saved = (self.first_hop_seconds or 0.0) * self.shortcuts
+            return {
+                "turns": self.turns,
+                "shortcuts": self.shortcuts,
+                "shortcut_rate": (self.shortcuts / self.turns) if self.turns else 0.0,
+                "avg_first_hop_seconds": self.first_hop_seconds,
+                "estimated_seconds_saved": saved,
+            }
+
+
+# Shared by every tools graph in the process
+router_stats = RouterStats()
+metrics.register_collector("router", router_stats.snapshot)
+
+
+class IntentRouterNode:
+    """
+    Deterministic pre-router ahead of the chatbot node.
+    When the user's question is unambiguously about the Himalaya knowledge base,
+    it emits the `himalaya_enterprises_search` call itself, so the turn needs a
+    single generation call instead of a tool-decision call plus a generation call.
+    Anything else falls through to the chatbot and `tools_condition` as before;
+    with a `prefetcher`, likely retrievals for those turns start in the background
+    while the chatbot decides.
+    """
+    def __init__(self, stats: RouterStats = None, prefetcher=None):
+        self.stats = stats or router_stats
+        self.prefetcher = prefetcher
+
+    @staticmethod
+    def is_unambiguous(text: str) -> bool:
+        """Names the company and asks about exactly one knowledge-base intent."""
+        if not text or needs_web(text) or text.count("?") > 1:
+            return False
+        return mentions_company(text) and len(classify_intents(text)) == 1
+
+    @traced(name="intent_router_process", component="nodes")
+    def process(self, state: State) -> dict:
+        """
+        Emits a direct retrieval tool call for obvious knowledge-base questions.
+        """
+        last_message = state["messages"][-1] if state["messages"] else None
+        if not isinstance(last_message, HumanMessage):
+            return {}
+        text = last_message.content if isinstance(last_message.content, str) else str(last_message.content)
+        shortcut = self.is_unambiguous(text)
+        self.stats.record_turn(shortcut)
+        if not shortcut:
+            if self.prefetcher is not None:
+                self.prefetcher.start(last_message.id, text)
+            return {}
+        tool_call = {
+            "name": HIMALAYA_TOOL_NAME,
+            "args": {"query": text},
+            "id": f"call_router_{uuid.uuid4().hex[:16]}",
+        }
+        return {"messages": [AIMessage(content="", tool_calls=[tool_call], additional_kwargs={"routed_by": "intent_router"})]}
+
+    @staticmethod
+    def route(state: State) -> str:
+        """Sends shortcut turns straight to the tools node, everything else to the chatbot."""
+        last_message = state["messages"][-1]
+        if isinstance(last_message, AIMessage) and last_message.additional_kwargs.get("routed_by") == "intent_router":
+            return "tools"
+        return "chatbot"
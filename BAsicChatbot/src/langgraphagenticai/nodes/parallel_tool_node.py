@@ -0,0 +1,191 @@
+import asyncio
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.tracing import traced
+from src.langgraphagenticai.utils.usage_ledger import estimate_text_tokens, get_usage_ledger, usage_context
+
+# Per-tool deadlines in seconds; tools not listed use the node's default_timeout
+DEFAULT_TOOL_TIMEOUTS = {
+    "himalaya_enterprises_search": 15.0,
+    "tavily_search_results_json": 10.0,
+}
+
+# Bounded pool shared by every graph in the process
+_tool_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-call")
+
+
+class ParallelToolNode:
+    """
+    Executes the tool calls of the last AI message concurrently.
+    Each call gets its own deadline, capped by a per-turn deadline. A call that
+    misses its deadline is reported back to the model as a timeout note, so the
+    turn continues with partial results instead of blocking on one slow source.
+    With a `prefetcher`, a call whose query was already fetched speculatively
+    for this turn takes that result instead of running the tool again.
+    Every result is written to the usage ledger with the tokens it adds to the
+    next prompt (estimated from its length).
+    """
+    def __init__(self, tools, tool_timeouts: Dict[str, float] = None, default_timeout: float = 20.0,
+                 turn_timeout: float = 30.0, executor: ThreadPoolExecutor = None, prefetcher=None,
+                 usage_ledger=None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.tool_timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(tool_timeouts or {})}
+        self.default_timeout = default_timeout
+        self.turn_timeout = turn_timeout
+        self.executor = executor or _tool_executor
+        self.prefetcher = prefetcher
+        self.usage_ledger = usage_ledger if usage_ledger is not None else get_usage_ledger()
+
+    def _record_usage(self, call, message: ToolMessage, latency: float) -> ToolMessage:
+        if self.usage_ledger is not None:
+            self.usage_ledger.record(
+                "tool", tool=call["name"], tool_tokens=estimate_text_tokens(str(message.content)),
+                latency=latency, context=usage_context(),
+            )
+        return message
+
+    def _run_tool(self, call) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: {call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].",
+                name=call["name"], tool_call_id=call["id"], status="error",
+            )
+        try:
+            # Invoking a tool with a ToolCall returns a ToolMessage
+            started = time.perf_counter()
+            with metrics.time("tool", call["name"]):
+                message = tool.invoke({**call, "type": "tool_call"})
+            return self._record_usage(call, message, time.perf_counter() - started)
+        except Exception as e:
+            return ToolMessage(
+                content=f"Error: {call['name']} failed: {e}",
+                name=call["name"], tool_call_id=call["id"], status="error",
+            )
+
+    def _turn_timeout(self, state: State) -> float:
+        """The node's turn timeout, capped by what is left of the turn's deadline in the state."""
+        deadline = state.get("turn_deadline")
+        if deadline is None:
+            return self.turn_timeout
+        return min(self.turn_timeout, max(deadline - time.time(), 0.0))
+
+    def _claim_prefetch(self, state: State, call):
+        if self.prefetcher is None:
+            return None
+        args = call.get("args")
+        query = args.get("query") if isinstance(args, dict) else None
+        return self.prefetcher.claim(self.prefetcher.turn_id(state), call["name"], query)
+
+    @staticmethod
+    def _prefetched_message(call, result) -> ToolMessage:
+        content = result if isinstance(result, str) else json.dumps(result, default=str)
+        return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"])
+
+    def _run_or_take_prefetch(self, call, prefetch, claimed_at: float) -> ToolMessage:
+        if prefetch is not None:
+            try:
+                result = prefetch.future.result()
+                self.prefetcher.record_use(call["name"], prefetch, claimed_at)
+                return self._record_usage(call, self._prefetched_message(call, result), 0.0)
+            except Exception as e:
+                print(f"Prefetched {call['name']} failed, running it again: {e}")
+        return self._run_tool(call)
+
+    def _timeout_message(self, call, timeout: float) -> ToolMessage:
+        print(f"Tool {call['name']} timed out after {timeout:.1f}s")
+        metrics.inc("tool_timeouts", tool=call["name"])
+        return ToolMessage(
+            content=(
+                f"Note: {call['name']} did not respond within {timeout:.0f}s and was skipped. "
+                "Answer with the results from the other sources."
+            ),
+            name=call["name"], tool_call_id=call["id"], status="error",
+        )
+
+    @traced(name="parallel_tool_node", component="tools")
+    def __call__(self, state: State) -> dict:
+        """
+        Runs every tool call of the last message and returns one ToolMessage per call, in call order.
+        """
+        last_message = state["messages"][-1]
+        tool_calls = last_message.tool_calls if isinstance(last_message, AIMessage) else []
+        started = time.monotonic()
+        turn_timeout = self._turn_timeout(state)
+        turn_deadline = started + turn_timeout
+
+        futures = []
+        for call in tool_calls:
+            prefetch = self._claim_prefetch(state, call)
+            # Copy the context so tracing and callbacks follow the call into the worker thread
+            context = contextvars.copy_context()
+            futures.append((call, self.executor.submit(
+                context.run, self._run_or_take_prefetch, call, prefetch, time.monotonic())))
+
+        messages = []
+        for call, future in futures:
+            tool_timeout = self.tool_timeouts.get(call["name"], self.default_timeout)
+            remaining = min(started + tool_timeout, turn_deadline) - time.monotonic()
+            try:
+                messages.append(future.result(timeout=max(remaining, 0)))
+            except FutureTimeoutError:
+                # The worker cannot be interrupted; its late result is discarded
+                future.cancel()
+                messages.append(self._timeout_message(call, min(tool_timeout, turn_timeout)))
+        return {"messages": messages}
+
+    async def _arun_tool(self, call, prefetch=None) -> ToolMessage:
+        if prefetch is not None:
+            claimed_at = time.monotonic()
+            try:
+                result = await asyncio.wrap_future(prefetch.future)
+                self.prefetcher.record_use(call["name"], prefetch, claimed_at)
+                return self._record_usage(call, self._prefetched_message(call, result), 0.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Prefetched {call['name']} failed, running it again: {e}")
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._run_tool(call)
+        try:
+            started = time.perf_counter()
+            with metrics.time("tool", call["name"]):
+                message = await tool.ainvoke({**call, "type": "tool_call"})
+            return self._record_usage(call, message, time.perf_counter() - started)
+        except Exception as e:
+            return ToolMessage(
+                content=f"Error: {call['name']} failed: {e}",
+                name=call["name"], tool_call_id=call["id"], status="error",
+            )
+
+    @traced(name="parallel_tool_node_async", component="tools")
+    async def acall(self, state: State) -> dict:
+        """
+        Async variant: runs the tool calls as concurrent tasks on the event loop.
+        """
+        last_message = state["messages"][-1]
+        tool_calls = last_message.tool_calls if isinstance(last_message, AIMessage) else []
+        started = time.monotonic()
+        turn_timeout = self._turn_timeout(state)
+        turn_deadline = started + turn_timeout
+
+        async def _with_deadline(call):
+            tool_timeout = self.tool_timeouts.get(call["name"], self.default_timeout)
+            remaining = min(started + tool_timeout, turn_deadline) - time.monotonic()
+            prefetch = self._claim_prefetch(state, call)
+            try:
+                return await asyncio.wait_for(self._arun_tool(call, prefetch), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                return self._timeout_message(call, min(tool_timeout, turn_timeout))
+
+        messages = await asyncio.gather(*(_with_deadline(call) for call in tool_calls))
+        return {"messages": list(messages)}
@@ -0,0 +1,31 @@
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.langgraphagenticai.state.state import ResearchState
+from src.langgraphagenticai.utils.tracing import traced
+
+RESEARCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system",
+     "You answer multi-part questions from the numbered sources below. Answer every part "
+     "of the question, cite sources by their number like [2], and say which parts the "
+     "sources do not cover.\n\nSources:\n{context}"),
+    ("placeholder", "{messages}"),
+])
+
+
+class ResearchAnswerNode:
+    """
+    Answers the question from the context reduced by the fan-out retrieval.
+    """
+    def __init__(self, model):
+        self.chain = RESEARCH_PROMPT | model
+
+    def _input(self, state: ResearchState) -> dict:
+        return {"context": state.get("context") or "No sources returned results.", "messages": state["messages"]}
+
+    @traced(name="research_answer", component="nodes")
+    def process(self, state: ResearchState) -> dict:
+        return {"messages": [self.chain.invoke(self._input(state))]}
+
+    @traced(name="research_answer_async", component="nodes")
+    async def aprocess(self, state: ResearchState) -> dict:
+        return {"messages": [await self.chain.ainvoke(self._input(state))]}
@@ -0,0 +1,234 @@
+"""
+Speculative retrieval prefetch.
+
+Retrieval normally starts only after the first Groq call comes back with a tool
+call. With prefetch on, the router starts `himalaya_enterprises_search` (and,
+if allowed, the Tavily search) for the user's message in the background while
+the chatbot is still deciding. If the model then calls that tool during the
+same turn with the same query (compared after normalising case, whitespace
+and trailing punctuation), the tool node takes the prefetched result instead
+of running the search again; otherwise the result expires unused.
+
+A `PrefetchPolicy` caps what speculation may cost: only messages with a
+knowledge-base (or web) signal are prefetched, paid web searches are off by
+default and limited per hour, and at most a few prefetches run at a time.
+"""
+
+import threading
+import time
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import HumanMessage
+
+from src.langgraphagenticai.tools.intents import classify_intents, mentions_company, needs_web
+from src.langgraphagenticai.utils.metrics import metrics
+
+HIMALAYA_TOOL_NAME = "himalaya_enterprises_search"
+TAVILY_TOOL_NAME = "tavily_search_results_json"
+
+# Small dedicated pool: speculation must never starve real tool calls
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool-prefetch")
+
+
+def normalize_query(query) -> str:
+    return " ".join(str(query).lower().split()).strip(" ?.!")
+
+
+class PrefetchPolicy:
+    """
+    Decides which tools may be prefetched for a message.
+    """
+    def __init__(self, prefetch_web: bool = False, max_web_per_hour: int = 20,
+                 max_in_flight: int = 2, ttl_seconds: float = 60.0):
+        self.prefetch_web = prefetch_web
+        self.max_web_per_hour = max_web_per_hour
+        self.max_in_flight = max_in_flight
+        self.ttl_seconds = ttl_seconds
+        self._web_started = deque()
+        self._lock = threading.Lock()
+
+    def tools_for(self, text: str, available) -> list:
+        """Returns the tool names worth prefetching for this message."""
+        names = []
+        if HIMALAYA_TOOL_NAME in available and (mentions_company(text) or classify_intents(text)):
+            names.append(HIMALAYA_TOOL_NAME)
+        if self.prefetch_web and TAVILY_TOOL_NAME in available and needs_web(text) and self._take_web_budget():
+            names.append(TAVILY_TOOL_NAME)
+        return names
+
+    def _take_web_budget(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._web_started and now - self._web_started[0] > 3600:
+                self._web_started.popleft()
+            if len(self._web_started) >= self.max_web_per_hour:
+                return False
+            self._web_started.append(now)
+            return True
+
+
+class PrefetchStats:
+    """
+    Counts prefetches started, used and wasted, calls that found a prefetch for
+    a different query, and the time the used ones saved.
+    """
+    def __init__(self):
+        self.started = {}
+        self.used = {}
+        self.wasted = {}
+        self.mismatched = {}
+        self.skipped = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+
+    def _bump(self, counter: Dict[str, int], tool_name: str):
+        with self._lock:
+            counter[tool_name] = counter.get(tool_name, 0) + 1
+
+    def record_start(self, tool_name: str):
+        self._bump(self.started, tool_name)
+
+    def record_waste(self, tool_name: str):
+        self._bump(self.wasted, tool_name)
+
+    def record_mismatch(self, tool_name: str):
+        self._bump(self.mismatched, tool_name)
+
+    def record_use(self, tool_name: str, seconds_saved: float):
+        self._bump(self.used, tool_name)
+        with self._lock:
+            self.seconds_saved += seconds_saved
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            started = sum(self.started.values())
+            used = sum(self.used.values())
+            return {
+                "started": dict(self.started),
+                "used": dict(self.used),
+                "wasted": dict(self.wasted),
+                "mismatched": dict(self.mismatched),
+                "skipped": self.skipped,
+                "use_rate": (used / started) if started else 0.0,
+                "seconds_saved": self.seconds_saved,
+            }
+
+
+# Shared by every tools graph in the process
+prefetch_stats = PrefetchStats()
+metrics.register_collector("prefetch", prefetch_stats.snapshot)
+
+
+class _Prefetch:
+    def __init__(self, future: Future, query: str):
+        self.future = future
+        self.query = normalize_query(query)
+        self.started = time.monotonic()
+        self.finished = None
+        future.add_done_callback(self._mark_done)
+
+    def _mark_done(self, _future):
+        self.finished = time.monotonic()
+
+
+class SpeculativePrefetcher:
+    """
+    Starts speculative tool runs keyed by turn and hands them to the tool node.
+    A turn is identified by the id of its HumanMessage, which both the router and
+    the tool node can read from the graph state.
+    """
+    def __init__(self, tools, policy: PrefetchPolicy = None, stats: PrefetchStats = None,
+                 executor: ThreadPoolExecutor = None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.policy = policy or PrefetchPolicy()
+        self.stats = stats or prefetch_stats
+        self.executor = executor or _prefetch_executor
+        self._pending: Dict[tuple, _Prefetch] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def turn_id(state) -> Optional[str]:
+        for message in reversed(state["messages"]):
+            if isinstance(message, HumanMessage):
+                return message.id
+        return None
+
+    def _expire(self):
+        """Drops prefetches nobody claimed within the TTL."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, item in self._pending.items() if now - item.started > self.policy.ttl_seconds]
+            for key in expired:
+                self._pending.pop(key).future.cancel()
+        for _, tool_name in expired:
+            self.stats.record_waste(tool_name)
+
+    def start(self, turn_id: str, text: str):
+        """Starts the prefetches the policy allows for this turn's message."""
+        self._expire()
+        if not turn_id or not text:
+            return
+        for tool_name in self.policy.tools_for(text, self.tools_by_name):
+            with self._lock:
+                in_flight = sum(1 for item in self._pending.values() if not item.future.done())
+                if in_flight >= self.policy.max_in_flight or (turn_id, tool_name) in self._pending:
+                    self.stats.record_skip()
+                    continue
+                tool = self.tools_by_name[tool_name]
+                context = contextvars.copy_context()
+                self._pending[(turn_id, tool_name)] = _Prefetch(self.executor.submit(context.run, tool.invoke, text), text)
+            self.stats.record_start(tool_name)
+
+    def claim(self, turn_id: str, tool_name: str, query) -> Optional[_Prefetch]:
+        """
+        Hands over the prefetch for this turn and tool if it ran the query the
+        model asks for. A call with another query (the model rephrased or split
+        the question) runs the tool itself; the prefetch stays pending for a
+        matching call and is otherwise discarded with the turn.
+        """
+        key = (turn_id, tool_name)
+        with self._lock:
+            prefetch = self._pending.get(key)
+            if prefetch is None:
+                return None
+            matches = query is not None and normalize_query(query) == prefetch.query
+            if matches:
+                del self._pending[key]
+        if not matches:
+            self.stats.record_mismatch(tool_name)
+            return None
+        return prefetch
+
+    def record_use(self, tool_name: str, prefetch: _Prefetch, claimed_at: float):
+        # The head start the prefetch had over running the tool at claim time
+        finished = prefetch.finished or time.monotonic()
+        self.stats.record_use(tool_name, max(0.0, min(finished, claimed_at) - prefetch.started))
+
+    def route_after_chatbot(self, condition):
+        """
+        Wraps the chatbot's routing condition so a turn that ends (or is
+        finalized) without calling the prefetched tools discards their results
+        right away.
+        """
+        def route(state):
+            destination = condition(state)
+            if destination != "tools":
+                self.discard_turn(self.turn_id(state))
+            return destination
+        return route
+
+    def discard_turn(self, turn_id: str):
+        """Drops the turn's unclaimed prefetches, e.g. once the turn has answered."""
+        with self._lock:
+            keys = [key for key in self._pending if key[0] == turn_id]
+            items = [(key[1], self._pending.pop(key)) for key in keys]
+        for tool_name, item in items:
+            item.future.cancel()
+            self.stats.record_waste(tool_name)
@@ -0,0 +1,149 @@
+"""
+Per-turn latency budget and loop guard for the chatbot <-> tools cycle.
+
+`tools_condition` alone ends the loop only when the model stops calling tools,
+so a model that keeps calling them runs until LangGraph's recursion limit.
+`TurnBudget` puts a wall-clock deadline and a maximum number of tool rounds
+into the graph state when the turn starts. Once either is spent, the chatbot's
+next tool request is routed to a finalize node that answers with what has been
+gathered so far. Every hop's duration is recorded in `hop_timings`.
+"""
+
+import os
+import time
+from typing import Optional
+
+from langchain_core.messages import AIMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END
+
+from src.langgraphagenticai.state.state import State
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.tracing import traced
+
+FINALIZE_PROMPT = (
+    "The time or tool budget for this turn is spent, so no more tools can be called. "
+    "Answer the user now using only the information already gathered above, and say "
+    "briefly if part of the question could not be checked."
+)
+
+
+def timed_node(name: str, node):
+    """
+    Wraps a node (function or runnable) so its update also records how long the hop took.
+    The duration also goes to the process metrics as stage "node".
+    """
+    runnable = node if hasattr(node, "invoke") else RunnableLambda(node)
+
+    def _with_timing(update, started: float) -> dict:
+        update = dict(update or {})
+        seconds = time.perf_counter() - started
+        metrics.observe("node", name, seconds)
+        update["hop_timings"] = [{"node": name, "seconds": seconds}]
+        return update
+
+    def run(state: State, config):
+        started = time.perf_counter()
+        return _with_timing(runnable.invoke(state, config), started)
+
+    async def arun(state: State, config):
+        started = time.perf_counter()
+        return _with_timing(await runnable.ainvoke(state, config), started)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+class TurnBudget:
+    """
+    Deadline and tool-round limit for one conversation turn.
+    """
+    def __init__(self, turn_timeout: float = None, max_tool_iterations: int = None):
+        self.turn_timeout = turn_timeout if turn_timeout is not None else float(
+            os.environ.get("TURN_TIMEOUT_SECONDS", 45))
+        self.max_tool_iterations = max_tool_iterations if max_tool_iterations is not None else int(
+            os.environ.get("MAX_TOOL_ITERATIONS", 4))
+
+    def start_turn(self, state: State) -> dict:
+        """Entry node: stamps the budget for this turn into the state."""
+        return {
+            "turn_deadline": time.time() + self.turn_timeout,
+            "tool_iterations": 0,
+            "max_tool_iterations": self.max_tool_iterations,
+            "hop_timings": None,
+        }
+
+    @staticmethod
+    def exhausted(state: State) -> Optional[str]:
+        """Returns why the turn's budget is spent, or None."""
+        deadline = state.get("turn_deadline")
+        if deadline is not None and time.time() >= deadline:
+            return "deadline"
+        limit = state.get("max_tool_iterations")
+        if limit is not None and state.get("tool_iterations", 0) >= limit:
+            return "max_tool_iterations"
+        return None
+
+    @staticmethod
+    def remaining_seconds(state: State) -> Optional[float]:
+        deadline = state.get("turn_deadline")
+        return None if deadline is None else max(deadline - time.time(), 0.0)
+
+    def count_tool_round(self, tool_node):
+        """Wraps the tool node so each round increments `tool_iterations`."""
+        def _count(update, state: State) -> dict:
+            update = dict(update or {})
+            update["tool_iterations"] = state.get("tool_iterations", 0) + 1
+            return update
+
+        def run(state: State, config):
+            return _count(tool_node.invoke(state, config), state)
+
+        async def arun(state: State, config):
+            return _count(await tool_node.ainvoke(state, config), state)
+
+        return RunnableLambda(run, afunc=arun, name="tools")
+
+    def route_after_chatbot(self, condition):
+        """
+        Wraps the chatbot's routing condition: a tool request made after the
+        budget is spent goes to "finalize" instead of "tools".
+        """
+        def route(state: State):
+            destination = condition(state)
+            if destination != END:
+                reason = self.exhausted(state)
+                if reason:
+                    print(f"Turn budget spent ({reason}), finalizing with the results so far")
+                    return "finalize"
+            return destination
+        return route
+
+    def create_finalize_node(self, llm):
+        """
+        Returns the node that closes a turn whose budget is spent. The pending
+        tool calls are answered with a note (the API rejects unanswered calls),
+        then the model answers once more without tools.
+        """
+        def _skipped(state: State) -> list:
+            last_message = state["messages"][-1]
+            tool_calls = last_message.tool_calls if isinstance(last_message, AIMessage) else []
+            reason = self.exhausted(state) or "budget"
+            return [
+                ToolMessage(content=f"Skipped: the turn's {reason.replace('_', ' ')} budget is spent.",
+                            name=call["name"], tool_call_id=call["id"], status="error")
+                for call in tool_calls
+            ]
+
+        @traced(name="finalize_turn", component="nodes")
+        def finalize(state: State) -> dict:
+            skipped = _skipped(state)
+            response = llm.invoke(state["messages"] + skipped + [SystemMessage(content=FINALIZE_PROMPT)])
+            return {"messages": skipped + [response]}
+
+        @traced(name="finalize_turn_async", component="nodes")
+        async def afinalize(state: State) -> dict:
+            skipped = _skipped(state)
+            response = await llm.ainvoke(state["messages"] + skipped + [SystemMessage(content=FINALIZE_PROMPT)])
+            return {"messages": skipped + [response]}
+
+        return RunnableLambda(finalize, afunc=afinalize, name="finalize")
@@ -0,0 +1,138 @@
+"""
+Pre-fork serving mode for the headless HTTP server.
+
+The master process builds every graph once (tools, the Himalaya index, model
+clients), moves the index embeddings into a read-only memory-mapped file, and
+only then forks the workers. Workers inherit everything copy-on-write and
+accept connections on the socket the master bound, so adding a worker adds
+throughput without another index build or another copy of the embeddings.
+
+`gc.freeze()` moves the preloaded objects out of the garbage collector's reach
+before forking: a collection in a worker would otherwise write to their headers
+and copy the pages it touches.
+
+The master does not serve requests itself, so no event loop, thread pool or
+open HTTP connection exists at fork time. Building the graphs does open the
+response cache and usage ledger SQLite connections; every worker drops those
+and opens its own (see utils/forksafe.py).
+
+Conversation memory must be shared by all workers, since the kernel hands
+consecutive requests of one thread to different workers: pre-fork mode refuses
+to start with the in-process checkpointer and needs
+CHAT_SERVER_CHECKPOINTER=sqlite:<path> (see graph/checkpointer.py). Platforms
+without `os.fork` (Windows) fall back to a single process.
+"""
+
+import asyncio
+import gc
+import os
+import signal
+import socket
+import time
+
+from src.langgraphagenticai.tools import webloader_tool
+
+
+def preload(registry):
+    """Builds the shared state in the master; returns the shared index, if any."""
+    started = time.perf_counter()
+    registry.preload()
+    shared_index = None
+    # Only share the index if a graph actually built it
+    if webloader_tool._himalaya_tool is not None:
+        shared_index = webloader_tool._himalaya_tool.share_index()
+    gc.collect()
+    gc.freeze()
+    print(f"Pre-fork master loaded {len(registry._graphs)} graph(s) in {time.perf_counter() - started:.1f}s")
+    return shared_index
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket) -> None:
+    import uvicorn
+    # Drop the master's handlers; uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=os.environ.get("CHAT_SERVER_LOG_LEVEL", "info")))
+    asyncio.run(server.serve(sockets=[sock]))
+
+
+def _spawn(app, sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock)
+        except BaseException as e:
+            print(f"Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(app, workers: int, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Preloads in this process, forks `workers` workers and restarts any that die."""
+    if not hasattr(os, "fork"):
+        import uvicorn
+        print("os.fork is not available on this platform; serving from a single process")
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    registry = app.state.registry
+    if not registry.shares_checkpoints:
+        raise SystemExit(
+            f"CHAT_SERVER_WORKERS={workers} needs a checkpointer shared by every worker; the in-process "
+            "one would lose a conversation's memory whenever its turns land on different workers. "
+            "Set CHAT_SERVER_CHECKPOINTER=sqlite:<path>."
+        )
+    shared_index = preload(registry)
+    sock = _bind(host, port)
+    children = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        pid = _spawn(app, sock)
+        children[pid] = time.monotonic()
+    print(f"Serving on http://{host}:{port} with {workers} pre-forked workers: {sorted(children)}")
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = children.pop(pid, None)
+            if stopping or started is None:
+                continue
+            print(f"Worker {pid} exited with status {status}; starting a replacement")
+            # Avoid a tight restart loop when workers die on startup
+            if time.monotonic() - started < 1:
+                time.sleep(1)
+            children[_spawn(app, sock)] = time.monotonic()
+    finally:
+        sock.close()
+        if shared_index is not None:
+            shared_index.close()
@@ -0,0 +1,304 @@
+"""
+Headless HTTP entry point for the chatbot graphs.
+
+A small ASGI app (Starlette) that serves the same graphs as the Streamlit UI,
+without Streamlit's rerun-the-script model:
+
+- POST /chat          {"message", "thread_id"?, "usecase"?} -> JSON answer with latency figures
+- POST /chat/stream   same body -> server-sent events: token, tool_start, tool_end, done
+- GET  /health
+- GET  /scheduler     turn scheduler queue depth, admissions and queue waits
+- GET  /metrics       stage latency histograms and counters, Prometheus text format
+- GET  /metrics.json  the same data as JSON, with p50/p95/p99 per stage
+- GET  /usage         token and latency totals from the usage ledger
+                      (?group_by=thread|model|usecase|tool|node|kind|day, ?thread_id=, ?since_days=)
+
+Graphs are built once per use case and shared by all requests; a shared
+checkpointer keeps each thread's memory, keyed by `thread_id`. By default it is
+an in-process saver that evicts idle threads; CHAT_SERVER_CHECKPOINTER=sqlite:<path>
+keeps conversations in a database file instead (see graph/checkpointer.py).
+Turns run on the async graph path, so one process serves many concurrent
+conversations.
+
+Run with `python -m src.langgraphagenticai.server` from the BAsicChatbot folder
+(CHAT_SERVER_HOST / CHAT_SERVER_PORT). Set CHAT_SERVER_STUB_LLM=true to serve a
+stub model instead of Groq for local load tests, and CHAT_SERVER_WORKERS=N to
+pre-fork N worker processes (see prefork.py).
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from langgraph.checkpoint.memory import InMemorySaver
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from src.langgraphagenticai.graph.checkpointer import checkpointer_spec, is_shared, memory_checkpointer, open_checkpointer
+from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+from src.langgraphagenticai.graph.graph_runner import GraphRunner
+from src.langgraphagenticai.graph.turn_scheduler import AdmissionRejected, turn_scheduler
+from src.langgraphagenticai.ui.uiconfigfile import get_config
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.tracing import get_tracing_client, policy
+from src.langgraphagenticai.utils.usage_ledger import get_usage_ledger
+
+load_dotenv()
+
+DEFAULT_USECASE = "Basic Chatbot"
+
+
+def _stub_mode() -> bool:
+    return os.environ.get("CHAT_SERVER_STUB_LLM", "false").lower() == "true"
+
+
+def load_server_model():
+    """
+    The model behind the server: the pooled Groq model from the environment, or
+    the stub model when CHAT_SERVER_STUB_LLM=true.
+    """
+    if _stub_mode():
+        from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+        return StubChatModel(latency_seconds=float(os.environ.get("CHAT_SERVER_STUB_LATENCY", 0)))
+    from src.langgraphagenticai.LLMS.groqllm import GroqLLM
+    model_options = get_config().get_groq_model_options()
+    user_controls = {
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", ""),
+        "selected_groq_model": os.environ.get("GROQ_MODEL", model_options[0]),
+    }
+    return GroqLLM(user_contols_input=user_controls).get_llm_model()
+
+
+class GraphRegistry:
+    """
+    Compiled graphs shared by every request, built once per use case on first use.
+    A database checkpointer (CHAT_SERVER_CHECKPOINTER=sqlite:...) is opened in each
+    process on its first request, since its connection cannot cross a fork.
+    """
+    def __init__(self, model_factory=load_server_model, checkpointer=None, usecases=None):
+        self.model_factory = model_factory
+        self.checkpointer_spec = checkpointer_spec()
+        # A database checkpointer is opened per process, on first use
+        self._opens_per_process = checkpointer is None and is_shared(self.checkpointer_spec)
+        if checkpointer is not None:
+            self.checkpointer = checkpointer
+        elif self._opens_per_process:
+            self.checkpointer = None
+        else:
+            self.checkpointer = memory_checkpointer()
+        self.usecases = usecases or get_config().get_usecase_options()
+        self._model = None
+        self._graphs = {}
+        self._lock = asyncio.Lock()
+        self._checkpointer_pid = None
+        self._close_checkpointer = None
+
+    @property
+    def shares_checkpoints(self) -> bool:
+        """Whether every process sees the same conversation memory (in-process savers do not)."""
+        return self._opens_per_process or not isinstance(self.checkpointer, InMemorySaver)
+
+    async def ensure_checkpointer(self):
+        """Opens the database checkpointer in this process and points every built graph at it."""
+        if not self._opens_per_process or self._checkpointer_pid == os.getpid():
+            return
+        async with self._lock:
+            if self._checkpointer_pid == os.getpid():
+                return
+            self.checkpointer, self._close_checkpointer = await open_checkpointer(self.checkpointer_spec)
+            for graph in self._graphs.values():
+                graph.checkpointer = self.checkpointer
+            self._checkpointer_pid = os.getpid()
+
+    async def close(self):
+        if self._close_checkpointer is not None and self._checkpointer_pid == os.getpid():
+            await self._close_checkpointer()
+
+    def preload(self) -> None:
+        """Builds every use case's graph now; the pre-fork master does this before forking workers."""
+        for usecase in self.usecases:
+            if usecase in self._graphs:
+                continue
+            try:
+                self._graphs[usecase] = self._build(usecase)
+            except Exception as e:
+                print(f"Could not preload the '{usecase}' graph, it will be built on first use: {e}")
+
+    async def get(self, usecase: str):
+        if usecase not in self.usecases:
+            raise KeyError(usecase)
+        await self.ensure_checkpointer()
+        graph = self._graphs.get(usecase)
+        if graph is not None:
+            return graph
+        async with self._lock:
+            if usecase not in self._graphs:
+                # Building can load the knowledge index, so keep it off the event loop
+                self._graphs[usecase] = await asyncio.to_thread(self._build, usecase)
+            return self._graphs[usecase]
+
+    def _build(self, usecase: str):
+        if self._model is None:
+            self._model = self.model_factory()
+        return GraphBuilder(self._model).setup_graph(usecase, checkpointer=self.checkpointer)
+
+
+async def _parse_turn(request: Request, registry: GraphRegistry):
+    """Returns (runner, message, thread_id) or an error response."""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, ValueError):
+        return JSONResponse({"error": "Request body must be JSON"}, status_code=400)
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        return JSONResponse({"error": "'message' is required"}, status_code=400)
+    usecase = body.get("usecase") or DEFAULT_USECASE
+    try:
+        graph = await registry.get(usecase)
+    except KeyError:
+        return JSONResponse({"error": f"Unknown usecase '{usecase}'", "usecases": registry.usecases}, status_code=400)
+    return GraphRunner(graph, usecase=usecase), message, body.get("thread_id") or str(uuid.uuid4())
+
+
+def _rejected(error: AdmissionRejected, thread_id: str) -> JSONResponse:
+    return JSONResponse({"error": str(error), "thread_id": thread_id}, status_code=503,
+                        headers={"Retry-After": str(max(1, round(error.retry_after)))})
+
+
+def create_app(registry: GraphRegistry = None) -> Starlette:
+    registry = registry or GraphRegistry()
+
+    async def chat(request: Request):
+        parsed = await _parse_turn(request, registry)
+        if isinstance(parsed, JSONResponse):
+            return parsed
+        runner, message, thread_id = parsed
+        try:
+            done = await runner.arun_turn(message, thread_id)
+        except AdmissionRejected as e:
+            return _rejected(e, thread_id)
+        except Exception as e:
+            return JSONResponse({"error": str(e), "thread_id": thread_id}, status_code=502)
+        return JSONResponse({
+            "thread_id": thread_id,
+            "content": done.get("content", ""),
+            "time_to_first_token": done.get("time_to_first_token"),
+            "total_latency": done.get("total_latency"),
+            "hops": done.get("hops", []),
+            "queue_wait": done.get("queue_wait"),
+        })
+
+    async def chat_stream(request: Request):
+        parsed = await _parse_turn(request, registry)
+        if isinstance(parsed, JSONResponse):
+            return parsed
+        runner, message, thread_id = parsed
+        stream = runner.astream_turn(message, thread_id)
+        # Pull the first event before answering, so a rejected turn gets a 503 and not an empty stream
+        try:
+            first = await stream.__anext__()
+        except AdmissionRejected as e:
+            return _rejected(e, thread_id)
+        except Exception as e:
+            return JSONResponse({"error": str(e), "thread_id": thread_id}, status_code=502)
+
+        async def replay():
+            try:
+                yield first
+                async for event in stream:
+                    yield event
+            finally:
+                await stream.aclose()
+
+        async def events():
+            try:
+                async for event in replay():
+                    payload = {key: value for key, value in event.items() if key != "type"}
+                    if event["type"] == "done":
+                        payload["thread_id"] = thread_id
+                    yield f"event: {event['type']}\ndata: {json.dumps(payload, default=str)}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Thread-Id": thread_id})
+
+    async def health(request: Request):
+        return JSONResponse({"status": "ok", "usecases": registry.usecases, "stub_llm": _stub_mode(),
+                             "pid": os.getpid()})
+
+    async def scheduler(request: Request):
+        return JSONResponse(turn_scheduler.snapshot())
+
+    async def metrics_text(request: Request):
+        return PlainTextResponse(metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+    async def metrics_json(request: Request):
+        return JSONResponse(metrics.snapshot())
+
+    async def usage(request: Request):
+        ledger = get_usage_ledger()
+        if ledger is None:
+            return JSONResponse({"error": "The usage ledger is off (USAGE_LEDGER=false)"}, status_code=404)
+        group_by = request.query_params.get("group_by", "model")
+        thread_id = request.query_params.get("thread_id")
+        try:
+            since_days = request.query_params.get("since_days")
+            since_days = float(since_days) if since_days is not None else None
+            rows = await asyncio.to_thread(ledger.totals, group_by, thread_id, since_days)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        body = {"group_by": group_by, "rows": rows}
+        if thread_id is not None:
+            body["thread"] = await asyncio.to_thread(ledger.thread_usage, thread_id)
+        return JSONResponse(body)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Per worker process: the export client's background thread does not survive a fork
+        if policy.active:
+            get_tracing_client()
+        # Fails at startup, not on the first request, when the checkpointer cannot be opened
+        await registry.ensure_checkpointer()
+        yield
+        await registry.close()
+        # The flush thread is a daemon; write what it has not picked up yet before the worker exits
+        ledger = get_usage_ledger()
+        if ledger is not None:
+            await asyncio.to_thread(ledger.flush)
+
+    app = Starlette(lifespan=lifespan, routes=[
+        Route("/chat", chat, methods=["POST"]),
+        Route("/chat/stream", chat_stream, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/scheduler", scheduler, methods=["GET"]),
+        Route("/metrics", metrics_text, methods=["GET"]),
+        Route("/metrics.json", metrics_json, methods=["GET"]),
+        Route("/usage", usage, methods=["GET"]),
+    ])
+    app.state.registry = registry
+    return app
+
+
+app = create_app()
+
+
+def main():
+    host = os.environ.get("CHAT_SERVER_HOST", "127.0.0.1")
+    port = int(os.environ.get("CHAT_SERVER_PORT", 8000))
+    workers = int(os.environ.get("CHAT_SERVER_WORKERS", 1))
+    if workers > 1:
+        from src.langgraphagenticai.prefork import serve
+        serve(app, workers=workers, host=host, port=port)
+        return
+    import uvicorn
+    uvicorn.run(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,56 @@
-from typing_extensions import TypedDict,List
+from typing_extensions import TypedDict,List,NotRequired
 from langgraph.graph.message import add_messages
-from typing import Annotated
+from typing import Annotated,Any
+
+
+def extend_or_reset(existing,new):
+    """
+    Appends to a per-turn list; an update of None starts a new turn's list.
+    """
+    if new is None:
+        return []
+    return (existing or [])+new
 
 
 class State(TypedDict):
     """
     Represent the structure of the state used in graph
     """
-    messages: Annotated[List,add_messages]
\ No newline at end of file
+    messages: Annotated[List,add_messages]
+    # Per-turn budget, set when the turn starts (wall-clock epoch seconds)
+    turn_deadline: NotRequired[float]
+    tool_iterations: NotRequired[int]
+    max_tool_iterations: NotRequired[int]
+    # [{"node": name, "seconds": duration}] for each hop of the current turn
+    hop_timings: Annotated[List,extend_or_reset]
+
+
+class RagState(State):
+    """
+    State of the Agentic RAG graph
+    """
+    question: NotRequired[str]
+    search_query: NotRequired[str]
+    documents: NotRequired[List[Any]]
+    rewrite_count: NotRequired[int]
+
+
+class ResearchState(State):
+    """
+    State of the multi-source research graph
+    """
+    question: NotRequired[str]
+    sub_queries: NotRequired[List[str]]
+    # Hits from every (sub-query, source) branch of the fan-out
+    results: Annotated[List,extend_or_reset]
+    context: NotRequired[str]
+
+
+class ResearchOutput(TypedDict):
+    """
+    What the fan-out retrieval subgraph hands back to the research graph
+    """
+    # Not the hits: through the parent's reducer they would pile up turn after turn
+    question: NotRequired[str]
+    sub_queries: NotRequired[List[str]]
+    context: NotRequired[str]
\ No newline at end of file
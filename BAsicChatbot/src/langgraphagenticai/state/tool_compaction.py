@@ -0,0 +1,109 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+
+class ToolOutputStore:
+    """
+    Bounded in-memory side store for tool payloads evicted from the conversation state.
+    """
+    def __init__(self, max_entries: int = 500):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, tool_name: str, tool_call_id: str, content: str) -> str:
+        """Store a tool payload and return its reference."""
+        ref = f"tool-output://{tool_name}/{tool_call_id or uuid.uuid4().hex}"
+        with self._lock:
+            self._entries[ref] = content
+            self._entries.move_to_end(ref)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        """Return the full payload for a reference, or None if it was evicted."""
+        with self._lock:
+            content = self._entries.get(ref)
+            if content is not None:
+                self._entries.move_to_end(ref)
+            return content
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide store shared by all graphs
+tool_output_store = ToolOutputStore()
+
+
+class ToolOutputCompactor:
+    """
+    Replaces consumed tool payloads in the message history with short stubs.
+
+    A ToolMessage is considered consumed once the model has been called with it,
+    that is, once any later AIMessage exists: a final answer, or the next round of
+    tool calls within the same turn. Only the latest round's results stay in full.
+    The full payload is kept in the side store and the stub carries its
+    reference, so it stays retrievable if needed.
+    """
+    def __init__(self, store: ToolOutputStore = None, min_chars: int = 400, preview_chars: int = 160):
+        # Not `store or ...`: an empty store is falsy (it defines __len__)
+        self.store = store if store is not None else tool_output_store
+        self.min_chars = min_chars
+        self.preview_chars = preview_chars
+
+    def _is_compacted(self, message: ToolMessage) -> bool:
+        return "compacted_ref" in message.additional_kwargs
+
+    def _last_ai_index(self, messages: List) -> int:
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], AIMessage):
+                return index
+        return -1
+
+    def _make_stub(self, message: ToolMessage) -> ToolMessage:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        tool_name = message.name or "tool"
+        ref = self.store.put(tool_name, message.tool_call_id, content)
+        preview = " ".join(content[:self.preview_chars].split())
+        stub = (
+            f"[{tool_name} output compacted after use: {len(content)} chars stored as {ref}. "
+            f"Preview: {preview}...]"
+        )
+        return ToolMessage(
+            content=stub,
+            id=message.id,
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+            additional_kwargs={**message.additional_kwargs, "compacted_ref": ref},
+        )
+
+    def compact(self, messages: List) -> List[ToolMessage]:
+        """
+        Returns replacement stubs for consumed tool messages.
+        The stubs reuse the original message ids, so returning them from a node
+        overwrites the bulky payloads in the graph state via `add_messages`.
+        """
+        last_ai = self._last_ai_index(messages)
+        replacements = []
+        for message in messages[:max(last_ai, 0)]:
+            if not isinstance(message, ToolMessage) or not message.id or self._is_compacted(message):
+                continue
+            content = message.content if isinstance(message.content, str) else str(message.content)
+            if len(content) < self.min_chars:
+                continue
+            replacements.append(self._make_stub(message))
+        return replacements
+
+    @staticmethod
+    def apply(messages: List, replacements: List[ToolMessage]) -> List:
+        """Returns the message list with replacements swapped in by id."""
+        if not replacements:
+            return list(messages)
+        by_id = {message.id: message for message in replacements}
+        return [by_id.get(getattr(message, "id", None), message) for message in messages]
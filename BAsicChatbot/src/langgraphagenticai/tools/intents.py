@@ -0,0 +1,53 @@
+"""
+Keyword intents for Himalaya Enterprises queries.
+Shared by the search tool and the graph's pre-router, and kept free of heavy imports.
+
+Matching is on whole words (an optional plural "s" allowed), so "range" never
+fires inside "orange" or "arrange". INTENTS uses only specific keywords; the
+broader keyword lists still drive the search tool's source selection.
+"""
+
+import re
+
+LINKEDIN_POST_KEYWORDS = ['latest post', 'recent post', 'latest linkedin post', 'recent linkedin post',
+                          'latest update', 'recent update', 'new post', 'current post', 'recent activity']
+MACHINE_KEYWORDS = ['machine', 'machinery', 'equipment', 'list of machines', 'machine names',
+                    'machine description', 'quantity', 'machines used', 'equipment list']
+CALIBRATION_KEYWORDS = ['calibration', 'instrument', 'report number', 'range', 'due date', 'calibration-instruments',
+                        'calibration instruments', 'calibration excel', 'calibration-instruments.xlsx']
+# The company's name only: "himalaya" on its own is usually the mountains
+COMPANY_KEYWORDS = ['himalaya enterprises', 'himalaya entp', 'himalayaentp']
+
+# Signals that the question needs the open web or the model's own judgement
+WEB_KEYWORDS = ['news', 'weather', 'stock', 'price of', 'today', 'yesterday', 'compare', 'competitor',
+                'search the web', 'google', 'wikipedia', 'who won', 'score']
+
+INTENTS = {
+    "linkedin_posts": LINKEDIN_POST_KEYWORDS + ['linkedin'],
+    "machines": ['machine', 'machinery', 'equipment list', 'machine names', 'machine description'],
+    "calibration": ['calibration', 'calibrated', 'report number', 'calibration instruments',
+                    'calibration-instruments.xlsx'],
+}
+
+
+def _pattern(keywords) -> re.Pattern:
+    alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})s?\b", re.IGNORECASE)
+
+
+_INTENT_PATTERNS = {intent: _pattern(keywords) for intent, keywords in INTENTS.items()}
+_COMPANY_PATTERN = _pattern(COMPANY_KEYWORDS)
+_WEB_PATTERN = _pattern(WEB_KEYWORDS)
+
+
+def classify_intents(text: str) -> set:
+    """Returns the knowledge-base intents whose keywords appear in the text as whole words."""
+    return {intent for intent, pattern in _INTENT_PATTERNS.items() if pattern.search(text)}
+
+
+def mentions_company(text: str) -> bool:
+    return bool(_COMPANY_PATTERN.search(text))
+
+
+def needs_web(text: str) -> bool:
+    return bool(_WEB_PATTERN.search(text))
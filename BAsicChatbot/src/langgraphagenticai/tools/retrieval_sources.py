@@ -0,0 +1,105 @@
+"""
+Knowledge sources for the fan-out retrieval subgraph.
+
+Each source turns a query into a list of hits, `{"content", "source", "url"}`.
+The Himalaya index is always available; the web search needs a Tavily key (or
+TAVILY_STUB=true), and Wikipedia and Arxiv are used only when their optional
+packages (`wikipedia`, `arxiv`) are installed.
+"""
+
+import os
+from typing import Callable, Dict, List
+
+from src.langgraphagenticai.tools.intents import classify_intents, mentions_company, needs_web
+
+Hit = Dict[str, str]
+
+# Keyword signals for the public-knowledge sources
+WIKIPEDIA_KEYWORDS = ['what is', 'what are', 'who is', 'who was', 'history of', 'define', 'definition', 'meaning of']
+ARXIV_KEYWORDS = ['paper', 'research', 'arxiv', 'study', 'studies', 'publication', 'state of the art']
+
+# Used to rank hits when reducing; the company's own data comes first
+SOURCE_WEIGHTS = {"himalaya": 1.0, "web": 0.8, "wikipedia": 0.7, "arxiv": 0.7}
+
+
+def _himalaya_source() -> Callable[[str], List[Hit]]:
+    from .webloader_tool import get_himalaya_tool
+    tool = get_himalaya_tool()
+
+    def search(query: str) -> List[Hit]:
+        return [
+            {"content": doc.page_content, "source": "himalaya", "url": str(doc.metadata.get("source", ""))}
+            for doc in tool.retrieve_documents(query)
+        ]
+    return search
+
+
+def _web_source() -> Callable[[str], List[Hit]]:
+    from .search_tool import get_web_search_tool
+    from .tool_cache import cache_tools
+    tool = cache_tools([get_web_search_tool()])[0]
+
+    def search(query: str) -> List[Hit]:
+        results = tool.invoke({"query": query})
+        if not isinstance(results, list):
+            return []
+        return [
+            {"content": result.get("content", ""), "source": "web", "url": result.get("url", "")}
+            for result in results if isinstance(result, dict)
+        ]
+    return search
+
+
+def _document_source(name: str, loader) -> Callable[[str], List[Hit]]:
+    def search(query: str) -> List[Hit]:
+        return [
+            {"content": doc.page_content, "source": name,
+             "url": str(doc.metadata.get("source") or doc.metadata.get("Entry ID") or doc.metadata.get("Title", ""))}
+            for doc in loader(query)
+        ]
+    return search
+
+
+def _wikipedia_source():
+    import wikipedia  # noqa: F401  (optional dependency)
+    from langchain_community.utilities import WikipediaAPIWrapper
+    wrapper = WikipediaAPIWrapper(top_k_results=2, doc_content_chars_max=1500)
+    return _document_source("wikipedia", wrapper.load)
+
+
+def _arxiv_source():
+    import arxiv  # noqa: F401  (optional dependency)
+    from langchain_community.utilities import ArxivAPIWrapper
+    wrapper = ArxivAPIWrapper(top_k_results=2, doc_content_chars_max=1500)
+    return _document_source("arxiv", wrapper.get_summaries_as_docs)
+
+
+def get_retrieval_sources() -> Dict[str, Callable[[str], List[Hit]]]:
+    """
+    Returns the sources usable in this environment, by name.
+    """
+    sources = {"himalaya": _himalaya_source()}
+    if os.environ.get("TAVILY_API_KEY") or os.environ.get("TAVILY_STUB", "false").lower() == "true":
+        sources["web"] = _web_source()
+    for name, factory in (("wikipedia", _wikipedia_source), ("arxiv", _arxiv_source)):
+        try:
+            sources[name] = factory()
+        except ImportError:
+            print(f"{name} retrieval source disabled: optional package not installed")
+    return sources
+
+
+def pick_sources(query: str, available) -> List[str]:
+    """Returns the sources relevant to one sub-query, defaulting to the knowledge base and the web."""
+    query_lower = query.lower()
+    picked = []
+    if mentions_company(query) or classify_intents(query):
+        picked.append("himalaya")
+    if needs_web(query):
+        picked.append("web")
+    if any(keyword in query_lower for keyword in WIKIPEDIA_KEYWORDS):
+        picked.append("wikipedia")
+    if any(keyword in query_lower for keyword in ARXIV_KEYWORDS):
+        picked.append("arxiv")
+    picked = [name for name in picked if name in available]
+    return picked or [name for name in ("himalaya", "web") if name in available]
@@ -1,19 +1,43 @@
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langgraph.prebuilt import ToolNode
-from .webloader_tool import get_himalaya_tool
+import os
+from langchain_core.runnables import RunnableLambda
+from .tavily_stub import StubTavilySearchResults
+from .tool_cache import cache_tools
+from .web_knowledge import WebKnowledgeWriter, WriteThroughSearchTool, write_through_enabled
+from src.langgraphagenticai.nodes.parallel_tool_node import ParallelToolNode
+
+def get_web_search_tool():
+    """
+    Return the web search tool; TAVILY_STUB=true swaps in an offline stub
+    """
+    if os.environ.get("TAVILY_STUB", "false").lower() == "true":
+        return StubTavilySearchResults(max_results=2)
+    from langchain_community.tools.tavily_search import TavilySearchResults
+    return TavilySearchResults(max_results=2)
 
 def get_tools():
     """
-    Return the list of tools to be used in the chatbot
+    Return the list of tools to be used in the chatbot, wrapped in the
+    shared tool-call cache so repeated calls with the same arguments are reused.
+    With WEB_WRITE_THROUGH=true, web results are also written into the
+    Himalaya index so later questions can be answered locally
     """
+    from .webloader_tool import get_himalaya_tool
+    himalaya_tool = get_himalaya_tool()
+    web_search_tool = get_web_search_tool()
+    if write_through_enabled():
+        web_search_tool = WriteThroughSearchTool(web_search_tool, writer=WebKnowledgeWriter(himalaya_tool))
     tools = [
-        TavilySearchResults(max_results=2),
-        get_himalaya_tool()
+        web_search_tool,
+        himalaya_tool
     ]
-    return tools
+    return cache_tools(tools)
 
-def create_tool_node(tools):
+def create_tool_node(tools, tool_timeouts=None, turn_timeout=30.0, prefetcher=None):
     """
-    creates and returns a tool node for the graph
+    creates and returns a tool node for the graph that runs independent
+    tool calls concurrently with per-tool and per-turn deadlines
     """
-    return ToolNode(tools=tools)
+    tool_node = ParallelToolNode(tools=tools, tool_timeouts=tool_timeouts, turn_timeout=turn_timeout,
+                                 prefetcher=prefetcher)
+    # Sync and async implementations behind one node
+    return RunnableLambda(tool_node, afunc=tool_node.acall, name="tools")
@@ -0,0 +1,136 @@
+"""
+Read-only, memory-mapped copy of the Himalaya vector index.
+
+The pre-fork server builds the Chroma index once in the master process, then
+exports the chunk embeddings to a float32 matrix on disk (in /dev/shm when it
+exists) and the chunk texts and metadata next to it. Every worker maps the same
+file read-only, so the operating system keeps one copy of the embeddings in
+memory however many workers there are. Chroma itself is not carried across the
+fork: its SQLite connection must not be shared between processes.
+
+Web search results written through into the index (see web_knowledge.py) go
+into a small per-process overlay on top of the shared matrix.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.usage_ledger import embedding_usage
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+
+def _shared_memory_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class SharedEmbeddingIndex:
+    """
+    Cosine-similarity search over a memory-mapped embedding matrix, with the
+    same `add_documents` / `as_retriever` surface the tool uses on Chroma.
+    """
+    def __init__(self, path: str, embedding_model: str = EMBEDDING_MODEL, embeddings_factory=None):
+        self.path = path
+        self.embedding_model = embedding_model
+        self.embeddings_factory = embeddings_factory
+        self.matrix = np.load(f"{path}.npy", mmap_mode="r")
+        with open(f"{path}.json", encoding="utf-8") as f:
+            records = json.load(f)
+        self.documents = [Document(page_content=record["page_content"], metadata=record["metadata"])
+                          for record in records]
+        self._overlay: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._embeddings = None
+        self._embeddings_pid = None
+
+    @classmethod
+    def export_chroma(cls, vectorstore, name: str = "himalaya-index", directory: str = None,
+                      embeddings_factory=None) -> "SharedEmbeddingIndex":
+        """Writes a Chroma collection's embeddings, texts and metadata to disk and maps them."""
+        data = vectorstore._collection.get(include=["embeddings", "documents", "metadatas"])
+        path = os.path.join(directory or _shared_memory_dir(), f"{name}-{os.getpid()}")
+        matrix = _normalize(np.asarray(data["embeddings"], dtype=np.float32))
+        np.save(f"{path}.npy", matrix)
+        records = [{"page_content": text, "metadata": metadata or {}}
+                   for text, metadata in zip(data["documents"], data["metadatas"])]
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        return cls(path, embeddings_factory=embeddings_factory)
+
+    def close(self) -> None:
+        """Removes the exported files (the master calls this on shutdown)."""
+        for suffix in (".npy", ".json"):
+            try:
+                os.remove(f"{self.path}{suffix}")
+            except FileNotFoundError:
+                pass
+
+    @property
+    def embeddings(self):
+        # The HTTP client must not be shared with the parent, so each process makes its own
+        if self._embeddings is None or self._embeddings_pid != os.getpid():
+            if self.embeddings_factory:
+                self._embeddings = self.embeddings_factory()
+            else:
+                from langchain_openai import OpenAIEmbeddings
+                self._embeddings = OpenAIEmbeddings(model=self.embedding_model)
+            self._embeddings_pid = os.getpid()
+        return self._embeddings
+
+    def add_documents(self, documents: List[Document], ids: List[str]) -> None:
+        """Upserts documents into this process's overlay."""
+        texts = [doc.page_content for doc in documents]
+        with metrics.time("embedding", "embed_documents"), embedding_usage(self.embedding_model, texts):
+            embedded = self.embeddings.embed_documents(texts)
+        vectors = _normalize(np.asarray(embedded, dtype=np.float32))
+        with self._lock:
+            for doc_id, doc, vector in zip(ids, documents, vectors):
+                self._overlay[doc_id] = (doc, vector)
+
+    def purge_expired(self) -> None:
+        """Drops overlay web_cache chunks whose expiry has passed."""
+        now = time.time()
+        with self._lock:
+            for doc_id in [doc_id for doc_id, (doc, _) in self._overlay.items()
+                           if doc.metadata.get("type") == "web_cache" and doc.metadata.get("expires_at", 0) < now]:
+                del self._overlay[doc_id]
+
+    def similarity_search(self, query: str, k: int = 3) -> List[Document]:
+        with metrics.time("embedding", "embed_query"), embedding_usage(self.embedding_model, query):
+            embedded = self.embeddings.embed_query(query)
+        query_vector = _normalize(np.asarray(embedded, dtype=np.float32))
+        scored = list(zip(self.matrix @ query_vector, self.documents))
+        with self._lock:
+            overlay = list(self._overlay.values())
+        scored.extend((float(vector @ query_vector), doc) for doc, vector in overlay)
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [doc for _, doc in scored[:k]]
+
+    def as_retriever(self, search_kwargs: Optional[dict] = None) -> "SharedIndexRetriever":
+        return SharedIndexRetriever(index=self, k=(search_kwargs or {}).get("k", 3))
+
+
+class SharedIndexRetriever(BaseRetriever):
+    """Retriever over a SharedEmbeddingIndex."""
+    index: SharedEmbeddingIndex
+    k: int = 3
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.index.similarity_search(query, k=self.k)
@@ -0,0 +1,53 @@
+"""
+Offline stand-in for TavilySearchResults.
+
+Same tool name, arguments and (content, artifact) output shape as the real tool,
+but the results are generated locally, so tests and local runs exercise the web
+search path without a TAVILY_API_KEY and without spending API quota.
+`get_tools()` uses it when TAVILY_STUB=true.
+"""
+
+import time
+from typing import Dict, List, Tuple, Type
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+
+class TavilyStubInput(BaseModel):
+    """Input for the Tavily stub, mirroring TavilySearchResults."""
+    query: str = Field(description="search query to look up")
+
+
+class StubTavilySearchResults(BaseTool):
+    """Deterministic, offline web search results for tests."""
+
+    name: str = "tavily_search_results_json"
+    description: str = (
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Useful for when you need to answer questions about current events. "
+        "Input should be a search query."
+    )
+    args_schema: Type[BaseModel] = TavilyStubInput
+    response_format: str = "content_and_artifact"
+    max_results: int = 2
+    # Simulated network latency, so caching effects are measurable in tests
+    latency_seconds: float = 0.0
+    calls: int = 0
+
+    def _results(self, query: str) -> List[Dict[str, str]]:
+        slug = "-".join(query.lower().split())[:60] or "empty"
+        return [
+            {
+                "url": f"https://example.com/search/{slug}/{rank}",
+                "content": f"Stub result {rank} for '{query}'.",
+            }
+            for rank in range(1, self.max_results + 1)
+        ]
+
+    def _run(self, query: str) -> Tuple[List[Dict[str, str]], Dict]:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        results = self._results(query)
+        return results, {"query": query, "results": results, "stub": True}
@@ -0,0 +1,192 @@
+"""
+Memoizing cache for tool calls.
+
+Every tool returned by `get_tools()` is wrapped in a `CachedTool`, so a call
+with the same arguments as a recent one (a repeated web search, the same
+knowledge-base question asked in another session) returns the stored result
+instead of running the tool again. Entries are keyed by tool name and the
+canonical (sorted, whitespace-normalized) arguments, and each tool has its own
+TTL and size limit. Set TOOL_CACHE=false to turn the cache off.
+"""
+
+import copy
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from pydantic import ConfigDict
+
+from src.langgraphagenticai.utils.metrics import metrics
+
+# Per-tool (ttl_seconds, max_entries); tools not listed use DEFAULT_TOOL_CACHE_LIMITS
+TOOL_CACHE_LIMITS = {
+    "tavily_search_results_json": (30 * 60.0, 256),
+    "himalaya_enterprises_search": (10 * 60.0, 256),
+}
+DEFAULT_TOOL_CACHE_LIMITS = (5 * 60.0, 128)
+
+
+def canonical_args(args: Dict[str, Any]) -> str:
+    """Sorted-key JSON of the arguments, with runs of whitespace in strings collapsed."""
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+    return json.dumps(normalize(args), sort_keys=True, default=str)
+
+
+class ToolCallCache:
+    """
+    In-process LRU of tool results with a TTL and size limit per tool.
+    Shared by every session in the process.
+    """
+    def __init__(self, limits: Dict[str, Tuple[float, int]] = None,
+                 default_limits: Tuple[float, int] = DEFAULT_TOOL_CACHE_LIMITS):
+        self.limits = {**TOOL_CACHE_LIMITS, **(limits or {})}
+        self.default_limits = default_limits
+        self._entries: Dict[str, OrderedDict] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _limits_for(self, tool_name: str) -> Tuple[float, int]:
+        return self.limits.get(tool_name, self.default_limits)
+
+    def get(self, tool_name: str, key: str) -> Tuple[bool, Any]:
+        """Returns (hit, result); the result is a copy the caller may modify."""
+        ttl, _ = self._limits_for(tool_name)
+        with self._lock:
+            entries = self._entries.get(tool_name)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None or time.monotonic() - entry[0] > ttl:
+                if entry is not None:
+                    del entries[key]
+                self._misses[tool_name] = self._misses.get(tool_name, 0) + 1
+                metrics.inc("cache_lookups", cache="tool", name=tool_name, result="miss")
+                return False, None
+            entries.move_to_end(key)
+            self._hits[tool_name] = self._hits.get(tool_name, 0) + 1
+            metrics.inc("cache_lookups", cache="tool", name=tool_name, result="hit")
+            return True, copy.deepcopy(entry[1])
+
+    def put(self, tool_name: str, key: str, result: Any):
+        _, max_entries = self._limits_for(tool_name)
+        with self._lock:
+            entries = self._entries.setdefault(tool_name, OrderedDict())
+            entries[key] = (time.monotonic(), copy.deepcopy(result))
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def clear(self, tool_name: Optional[str] = None):
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+                self._hits.clear()
+                self._misses.clear()
+            else:
+                self._entries.pop(tool_name, None)
+                self._hits.pop(tool_name, None)
+                self._misses.pop(tool_name, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            summary = {}
+            for tool_name in set(self._hits) | set(self._misses) | set(self._entries):
+                hits, misses = self._hits.get(tool_name, 0), self._misses.get(tool_name, 0)
+                summary[tool_name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": (hits / (hits + misses)) if hits + misses else 0.0,
+                    "entries": len(self._entries.get(tool_name, ())),
+                }
+            return summary
+
+
+# Shared by every graph in the process
+tool_call_cache = ToolCallCache()
+
+
+def accepts_run_manager(method) -> bool:
+    """Whether a tool's _run/_arun takes a run_manager argument."""
+    return "run_manager" in inspect.signature(method).parameters
+
+
+def _is_cacheable(result) -> bool:
+    """Errors and empty results are not worth replaying."""
+    content = result[0] if isinstance(result, tuple) else result
+    if not content:
+        return False
+    return not (isinstance(content, str) and content.startswith(("Error", "Sorry")))
+
+
+class CachedTool(BaseTool):
+    """
+    Wraps a tool so calls with identical arguments are served from `ToolCallCache`.
+    Name, description, argument schema and response format are the wrapped tool's,
+    so the model sees no difference.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseTool
+    cache: Any = None
+
+    def __init__(self, inner: BaseTool, cache: ToolCallCache = None, **kwargs):
+        super().__init__(
+            inner=inner,
+            cache=cache or tool_call_cache,
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            response_format=inner.response_format,
+            return_direct=inner.return_direct,
+            **kwargs,
+        )
+
+    def _key(self, args, kwargs) -> str:
+        # A plain-string input arrives positionally; key it like the equivalent keyword call
+        named = dict(zip(self.args, args))
+        named.update(kwargs)
+        return canonical_args(named)
+
+    def _run(self, *args, run_manager=None, **kwargs):
+        key = self._key(args, kwargs)
+        hit, result = self.cache.get(self.name, key)
+        if hit:
+            return result
+        if accepts_run_manager(self.inner._run):
+            kwargs["run_manager"] = run_manager
+        result = self.inner._run(*args, **kwargs)
+        if _is_cacheable(result):
+            self.cache.put(self.name, key, result)
+        return result
+
+    async def _arun(self, *args, run_manager=None, **kwargs):
+        key = self._key(args, kwargs)
+        hit, result = self.cache.get(self.name, key)
+        if hit:
+            return result
+        if accepts_run_manager(self.inner._arun):
+            kwargs["run_manager"] = run_manager
+        result = await self.inner._arun(*args, **kwargs)
+        if _is_cacheable(result):
+            self.cache.put(self.name, key, result)
+        return result
+
+
+def cache_tools(tools, cache: ToolCallCache = None) -> list:
+    """
+    Wraps each tool in a CachedTool, unless TOOL_CACHE=false.
+    """
+    if os.environ.get("TOOL_CACHE", "true").lower() != "true":
+        return list(tools)
+    return [tool if isinstance(tool, CachedTool) else CachedTool(tool, cache=cache) for tool in tools]
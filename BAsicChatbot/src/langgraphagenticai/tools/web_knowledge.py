@@ -0,0 +1,131 @@
+"""
+Write-through of web search results into the local knowledge index.
+
+With WEB_WRITE_THROUGH=true, results returned by the Tavily search are chunked,
+deduplicated and upserted into the Himalaya vector index as `web_cache`
+documents tagged with their source URL, fetch time and expiry. A later question
+on the same topic can then be answered by `himalaya_enterprises_search` at local
+latency instead of paying for another web search. The write runs in the
+background so it never adds embedding time to the turn.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+from langchain_core.tools import BaseTool
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pydantic import ConfigDict
+
+from .tool_cache import accepts_run_manager
+
+# One writer thread: upserts are serialized and never compete with tool calls
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="web-write-through")
+
+
+class WebKnowledgeWriter:
+    """
+    Turns web search results into `web_cache` chunks in the Himalaya index.
+    """
+    def __init__(self, himalaya_tool, ttl_seconds: float = None, executor: ThreadPoolExecutor = None):
+        self.himalaya_tool = himalaya_tool
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.environ.get("WEB_WRITE_THROUGH_TTL", 7 * 24 * 3600))
+        self.executor = executor or _write_executor
+        self.splitter = None
+        self.written = 0
+
+    def _get_splitter(self):
+        # Same chunking as the Himalaya index; built on first write, off the request path
+        if self.splitter is None:
+            self.splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(chunk_size=500, chunk_overlap=50)
+        return self.splitter
+
+    @staticmethod
+    def _chunk_id(url: str, text: str) -> str:
+        # Same page and text -> same id, so repeated results upsert instead of duplicating
+        return "web_" + hashlib.sha256(f"{url}\n{' '.join(text.split())}".encode("utf-8")).hexdigest()[:32]
+
+    def to_documents(self, query: str, results: List[Dict[str, Any]]):
+        """Returns (documents, ids) for the usable results, deduplicated by id."""
+        fetched_at = time.time()
+        source_docs = [
+            Document(
+                page_content=result["content"],
+                metadata={
+                    "source": result.get("url", ""),
+                    "title": result.get("title", ""),
+                    "type": "web_cache",
+                    "query": query,
+                    "fetched_at": fetched_at,
+                    "expires_at": fetched_at + self.ttl_seconds,
+                },
+            )
+            for result in results
+            if isinstance(result, dict) and result.get("content")
+        ]
+        chunks = {}
+        for chunk in self._get_splitter().split_documents(source_docs):
+            chunks.setdefault(self._chunk_id(chunk.metadata["source"], chunk.page_content), chunk)
+        return list(chunks.values()), list(chunks.keys())
+
+    def write(self, query: str, results) -> int:
+        """Upserts the results and returns how many chunks were written."""
+        if not isinstance(results, list):
+            return 0
+        try:
+            self.himalaya_tool.purge_expired_web_documents()
+            documents, ids = self.to_documents(query, results)
+            if documents and self.himalaya_tool.add_web_documents(documents, ids):
+                self.written += len(documents)
+                return len(documents)
+        except Exception as e:
+            print(f"Error writing web results into the knowledge index: {e}")
+        return 0
+
+    def submit(self, query: str, results):
+        return self.executor.submit(self.write, query, results)
+
+
+class WriteThroughSearchTool(BaseTool):
+    """
+    Wraps the web search tool so its results are also written into the local index.
+    Name, description, argument schema and response format are the wrapped tool's.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseTool
+    writer: Any
+
+    def __init__(self, inner: BaseTool, writer: WebKnowledgeWriter, **kwargs):
+        super().__init__(
+            inner=inner,
+            writer=writer,
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            response_format=inner.response_format,
+            return_direct=inner.return_direct,
+            **kwargs,
+        )
+
+    def _write_through(self, args, kwargs, result):
+        query = kwargs.get("query", args[0] if args else "")
+        content = result[0] if isinstance(result, tuple) else result
+        self.writer.submit(query, content)
+        return result
+
+    def _run(self, *args, run_manager=None, **kwargs):
+        call_kwargs = {**kwargs, "run_manager": run_manager} if accepts_run_manager(self.inner._run) else kwargs
+        return self._write_through(args, kwargs, self.inner._run(*args, **call_kwargs))
+
+    async def _arun(self, *args, run_manager=None, **kwargs):
+        call_kwargs = {**kwargs, "run_manager": run_manager} if accepts_run_manager(self.inner._arun) else kwargs
+        return self._write_through(args, kwargs, await self.inner._arun(*args, **call_kwargs))
+
+
+def write_through_enabled() -> bool:
+    return os.environ.get("WEB_WRITE_THROUGH", "false").lower() == "true"
@@ -1,16 +1,18 @@
+import asyncio
 import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
 from typing import Optional, Type, Any
-from langchain.tools import BaseTool
-from langchain_community.document_loaders import WebBaseLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
-from bs4 import BeautifulSoup
-import requests
 from dotenv import load_dotenv
-from docx import Document as DocxDocument
-from langsmith import traceable
+from .intents import LINKEDIN_POST_KEYWORDS, MACHINE_KEYWORDS, CALIBRATION_KEYWORDS
+from .shared_index import EMBEDDING_MODEL, SharedEmbeddingIndex
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.tracing import traced
+from src.langgraphagenticai.utils.usage_ledger import embedding_usage
 
 # Always prefer environment variables set by UI or cloud
 if "GROQ_API_KEY" in os.environ:
@@ -45,10 +47,11 @@ class HimalayaWebLoaderTool(BaseTool):
         super().__init__(**kwargs)
         self._initialize_vectorstore()
     
-    @traceable(name="extract_docx_content")
+    @traced(name="extract_docx_content", component="loader")
     def _extract_docx_content(self, file_path):
         """Extract text content from a Word document."""
         try:
+            from docx import Document as DocxDocument
             doc = DocxDocument(file_path)
             text_content = []
             
@@ -71,9 +74,11 @@ class HimalayaWebLoaderTool(BaseTool):
             print(f"Error extracting content from {file_path}: {e}")
             return None
 
-    @traceable(name="extract_web_content")
+    @traced(name="extract_web_content", component="loader")
     def _extract_text_content(self, url):
         """Extract clean text content from a URL using BeautifulSoup."""
+        import requests
+        from bs4 import BeautifulSoup
         try:
             # Special handling for LinkedIn URLs
             if "linkedin.com" in url:
@@ -82,7 +87,8 @@ class HimalayaWebLoaderTool(BaseTool):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            with metrics.time("http", "web_page"):
+                response = requests.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -106,6 +112,8 @@ class HimalayaWebLoaderTool(BaseTool):
     
     def _extract_linkedin_content(self, url):
         """Extract content from LinkedIn profile with fallback to manual content."""
+        import requests
+        from bs4 import BeautifulSoup
         try:
             # LinkedIn has anti-scraping measures, so we'll try to extract what we can
             # and provide fallback content based on the profile
@@ -118,7 +126,8 @@ class HimalayaWebLoaderTool(BaseTool):
                 'Upgrade-Insecure-Requests': '1',
             }
             
-            response = requests.get(url, headers=headers, timeout=15)
+            with metrics.time("http", "linkedin_profile"):
+                response = requests.get(url, headers=headers, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -228,6 +237,8 @@ class HimalayaWebLoaderTool(BaseTool):
 
     def _get_linkedin_posts_info(self, url):
         """Attempt to get LinkedIn posts information using alternative methods."""
+        import requests
+        from bs4 import BeautifulSoup
         try:
             # Try to access LinkedIn with different strategies
             session = requests.Session()
@@ -249,7 +260,8 @@ class HimalayaWebLoaderTool(BaseTool):
             session.headers.update(headers)
             
             # Try to get the page with session
-            response = session.get(url, timeout=20)
+            with metrics.time("http", "linkedin_posts"):
+                response = session.get(url, timeout=20)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -288,7 +300,7 @@ class HimalayaWebLoaderTool(BaseTool):
             print(f"Error getting LinkedIn posts info: {e}")
             return "Unable to access LinkedIn posts due to platform restrictions."
 
-    @traceable(name="_extract_pdf_content")
+    @traced(name="_extract_pdf_content", component="loader")
     def _extract_pdf_content(self, file_path):
         """Extract text content from a PDF file."""
         try:
@@ -306,6 +318,11 @@ class HimalayaWebLoaderTool(BaseTool):
 
     def _initialize_vectorstore(self):
         """Initialize the vector store with Himalaya Enterprises content."""
+        # Loaded here and not at module import: only the tool-using use cases need them
+        from langchain_community.document_loaders import WebBaseLoader
+        from langchain_community.vectorstores import Chroma
+        from langchain_openai import OpenAIEmbeddings
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
         try:
             # Load content from multiple Himalaya Enterprises website pages and LinkedIn
             urls = [
@@ -358,9 +375,8 @@ class HimalayaWebLoaderTool(BaseTool):
                 print(f"Loading calibration instruments Excel from: {calibration_xlsx_path}")
                 try:
                     import pandas as pd
-                    from langsmith import traceable
 
-                    @traceable(name="extract_calibration_excel_content")
+                    @traced(name="extract_calibration_excel_content", component="loader")
                     def extract_calibration_excel_content(file_path):
                         df = pd.read_excel(file_path)
                         excel_texts = []
@@ -423,11 +439,13 @@ class HimalayaWebLoaderTool(BaseTool):
             embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
 
             # Always rebuild vector store in memory (no persistence)
-            self._vectorstore = Chroma.from_documents(
-                documents=doc_splits,
-                collection_name="himalaya-enterprises",
-                embedding=embeddings
-            )
+            with metrics.time("embedding", "index_build"), \
+                    embedding_usage(embeddings.model, [doc.page_content for doc in doc_splits]):
+                self._vectorstore = Chroma.from_documents(
+                    documents=doc_splits,
+                    collection_name="himalaya-enterprises",
+                    embedding=embeddings
+                )
             # Create retriever
             self._retriever = self._vectorstore.as_retriever(search_kwargs={"k": 3})
             print("Vector store initialized in memory (rebuilds on every startup)!")
@@ -438,8 +456,69 @@ class HimalayaWebLoaderTool(BaseTool):
             traceback.print_exc()
             self._vectorstore = None
             self._retriever = None
+
+    def add_web_documents(self, documents, ids) -> bool:
+        """Upserts web search chunks (type `web_cache`) into the vector index."""
+        if not self._vectorstore:
+            return False
+        # The shared index records its own embedding usage
+        usage = (nullcontext() if isinstance(self._vectorstore, SharedEmbeddingIndex)
+                 else embedding_usage(EMBEDDING_MODEL, [doc.page_content for doc in documents]))
+        with metrics.time("embedding", "web_cache_upsert"), usage:
+            self._vectorstore.add_documents(documents=documents, ids=ids)
+        return True
+
+    def share_index(self) -> Optional[SharedEmbeddingIndex]:
+        """
+        Moves the index into a read-only memory-mapped copy that forked workers
+        share, and drops the Chroma collection so it is not duplicated per worker.
+        """
+        if not self._vectorstore or isinstance(self._vectorstore, SharedEmbeddingIndex):
+            return self._vectorstore
+        shared = SharedEmbeddingIndex.export_chroma(self._vectorstore)
+        self._vectorstore.delete_collection()
+        self._vectorstore = shared
+        self._retriever = shared.as_retriever(search_kwargs={"k": 3})
+        print(f"Vector store shared read-only from {shared.path}.npy ({len(shared.documents)} chunks)")
+        return shared
+
+    def purge_expired_web_documents(self) -> None:
+        """Deletes `web_cache` chunks whose expiry has passed."""
+        if not self._vectorstore:
+            return
+        if isinstance(self._vectorstore, SharedEmbeddingIndex):
+            self._vectorstore.purge_expired()
+            return
+        self._vectorstore._collection.delete(
+            where={"$and": [{"type": "web_cache"}, {"expires_at": {"$lt": time.time()}}]}
+        )
+
+    def retrieve_documents(self, query: str):
+        """Returns the retrieved chunks themselves (for callers that grade or rank them)."""
+        if not self._retriever:
+            return []
+        with metrics.time("retrieval", "himalaya_index"):
+            docs = self._retriever.invoke(query)
+        return self._fresh_docs(docs)
+
+    @staticmethod
+    def _fresh_docs(docs):
+        """Drops expired web_cache chunks and labels live ones with their source and fetch time."""
+        fresh = []
+        for doc in docs:
+            if doc.metadata.get("type") != "web_cache":
+                fresh.append(doc)
+                continue
+            if doc.metadata.get("expires_at", 0) < time.time():
+                continue
+            fetched = datetime.fromtimestamp(doc.metadata.get("fetched_at", 0)).strftime("%Y-%m-%d %H:%M")
+            labelled = doc.model_copy()
+            labelled.page_content = (f"{doc.page_content}\n(From a web search: {doc.metadata.get('source')}, "
+                                     f"fetched {fetched})")
+            fresh.append(labelled)
+        return fresh
     
-    @traceable(name="himalaya_search")
+    @traced(name="himalaya_search", component="tools")
     def _run(self, query: str) -> str:
         """Execute the search for Himalaya Enterprises information."""
         if not self._retriever:
@@ -447,20 +526,19 @@ class HimalayaWebLoaderTool(BaseTool):
         
         try:
             # Check if this is a LinkedIn posts query
-            linkedin_post_keywords = ['latest post', 'recent post', 'latest linkedin post', 'recent linkedin post', 
-                                    'latest update', 'recent update', 'new post', 'current post', 'recent activity']
+            linkedin_post_keywords = LINKEDIN_POST_KEYWORDS
             
             # Check if this is a machines query
-            machine_keywords = ['machine', 'machinery', 'equipment', 'list of machines', 'machine names', 
-                              'machine description', 'quantity', 'machines used', 'equipment list']
-            calibration_keywords = ['calibration', 'instrument', 'report number', 'range', 'due date', 'calibration-instruments', 'calibration instruments', 'calibration excel', 'calibration-instruments.xlsx']
+            machine_keywords = MACHINE_KEYWORDS
+            calibration_keywords = CALIBRATION_KEYWORDS
 
             query_lower = query.lower()
             is_linkedin_post_query = any(keyword in query_lower for keyword in linkedin_post_keywords)
             is_machine_query = any(keyword in query_lower for keyword in machine_keywords)
             is_calibration_query = any(keyword in query_lower for keyword in calibration_keywords)
 
-            docs = self._retriever.invoke(query)
+            with metrics.time("retrieval", "himalaya_index"):
+                docs = self._fresh_docs(self._retriever.invoke(query))
 
             if is_linkedin_post_query:
                 linkedin_url = "https://www.linkedin.com/in/himalaya-enterprises-34a0141a9/"
@@ -516,10 +594,23 @@ Note: For the most current LinkedIn posts, please visit the profile directly at:
             return f"Error searching Himalaya Enterprises information: {str(e)}"
     
     async def _arun(self, query: str) -> str:
-        """Async version of the search."""
-        return self._run(query)
+        """Async version of the search.
+        Retrieval and the LinkedIn fetch are blocking, so they run in a worker
+        thread instead of stalling the event loop that serves other conversations."""
+        return await asyncio.to_thread(self._run, query)
+
+
+_himalaya_tool = None
+_himalaya_tool_lock = threading.Lock()
 
 
 def get_himalaya_tool():
-    """Return the Himalaya Enterprises search tool."""
-    return HimalayaWebLoaderTool()
+    """Return the Himalaya Enterprises search tool.
+    The vector index is built once per process and shared by every graph, so
+    content written into it (web_cache chunks) outlives a single turn. A tool
+    whose index failed to load is rebuilt on the next call."""
+    global _himalaya_tool
+    with _himalaya_tool_lock:
+        if _himalaya_tool is None or _himalaya_tool._retriever is None:
+            _himalaya_tool = HimalayaWebLoaderTool()
+        return _himalaya_tool
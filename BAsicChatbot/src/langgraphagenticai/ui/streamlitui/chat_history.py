@@ -0,0 +1,85 @@
+import os
+
+import streamlit as st
+
+from src.langgraphagenticai.utils.thread_store import get_thread_store
+
+# Messages kept in the session and rendered on every rerun
+HISTORY_WINDOW = int(os.environ.get("CHAT_HISTORY_WINDOW", 20))
+# Older messages loaded from the thread store per "load earlier" click
+HISTORY_PAGE_SIZE = int(os.environ.get("CHAT_HISTORY_PAGE_SIZE", 20))
+
+
+class ChatHistory:
+    """
+    Windowed chat history for the Streamlit session.
+    `st.session_state.messages` holds only the most recent `window` messages;
+    every message is also written to the thread store, and older ones are read
+    back a page at a time only when the user asks for them. A rerun therefore
+    renders at most `window` messages plus the pages the user opened, however
+    long the conversation is.
+    """
+    def __init__(self, store=None, window: int = HISTORY_WINDOW, page_size: int = HISTORY_PAGE_SIZE):
+        self.store = store or get_thread_store()
+        self.window = window
+        self.page_size = page_size
+        if "messages" not in st.session_state:
+            st.session_state.messages = []
+        if "history_total" not in st.session_state:
+            st.session_state.history_total = len(st.session_state.messages)
+        if "history_pages" not in st.session_state:
+            st.session_state.history_pages = 0
+
+    def append(self, role: str, content: str):
+        try:
+            self.store.append(st.session_state.thread_id, role, content)
+        except Exception as e:
+            print(f"Could not write the message to the thread store: {e}")
+        st.session_state.history_total += 1
+        messages = st.session_state.messages
+        messages.append({"role": role, "content": content})
+        if len(messages) > self.window:
+            del messages[:len(messages) - self.window]
+
+    def older_count(self) -> int:
+        return st.session_state.history_total - len(st.session_state.messages)
+
+    @staticmethod
+    def _render_message(message):
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+
+    def _load_more(self):
+        st.session_state.history_pages += 1
+
+    def _hide_older(self):
+        st.session_state.history_pages = 0
+
+    def render(self):
+        """Renders the opened pages of older messages, then the recent window."""
+        older = self.older_count()
+        if older > 0:
+            shown = min(older, st.session_state.history_pages * self.page_size)
+            if shown < older:
+                st.button(f"🕘 Load earlier messages ({older - shown} more)", on_click=self._load_more,
+                          key="history_load_more")
+            if shown:
+                for message in self.store.page(st.session_state.thread_id, before_seq=older, limit=shown):
+                    self._render_message(message)
+                st.button("Hide earlier messages", on_click=self._hide_older, key="history_hide")
+                st.divider()
+        for message in st.session_state.messages:
+            self._render_message(message)
+
+    def clear(self):
+        """Starts a new thread and deletes the old one's transcript."""
+        import uuid
+        if "thread_id" in st.session_state:
+            try:
+                self.store.delete_thread(st.session_state.thread_id)
+            except Exception as e:
+                print(f"Could not delete the thread transcript: {e}")
+        st.session_state.messages = []
+        st.session_state.history_total = 0
+        st.session_state.history_pages = 0
+        st.session_state.thread_id = str(uuid.uuid4())
@@ -1,17 +1,82 @@
 import streamlit as st
 from langchain_core.messages import HumanMessage,AIMessage,ToolMessage
 import json
-from langsmith import traceable
+from src.langgraphagenticai.utils.tracing import traced
+from src.langgraphagenticai.graph.graph_runner import GraphRunner
+from src.langgraphagenticai.graph.turn_scheduler import turn_scheduler
+from src.langgraphagenticai.ui.streamlitui.chat_history import ChatHistory
+
+# Progress labels shown while a tool call is running
+TOOL_PROGRESS_LABELS = {
+    "himalaya_enterprises_search": "🔎 Searching knowledge base…",
+    "tavily_search_results_json": "🌐 Searching the web…",
+}
 
 
 class DisplayResultStreamlit:
-    def __init__(self, usecase, graph, user_message, thread_id):
+    def __init__(self, usecase, graph, user_message, thread_id, streaming=False):
         self.usecase = usecase
         self.graph = graph
         self.user_message = user_message
         self.thread_id = thread_id
+        self.streaming = streaming
+
+    def _record_latency(self, ttft, total):
+        """Keep per-turn latency figures in the session for the UI."""
+        if "turn_latencies" not in st.session_state:
+            st.session_state.turn_latencies = []
+        st.session_state.turn_latencies.append({
+            "usecase": self.usecase,
+            "time_to_first_token": ttft,
+            "total_latency": total,
+        })
+        print(f"Turn latency: ttft={ttft}, total={total:.3f}s")
+
+    @traced(name="stream_result_ui", component="app")
+    def stream_result_on_ui(self):
+        """
+        Streams the graph run token by token into the chat UI.
+        Events come from GraphRunner, which drives graph.astream on a shared
+        background event loop, and include tool progress plus
+        time-to-first-token and total latency.
+        """
+        runner = GraphRunner(self.graph, usecase=self.usecase)
+        texts = {}
+        current_id = None
+        done = {}
+
+        with st.chat_message("assistant"):
+            status = st.empty()
+            placeholder = st.empty()
+            for event in runner.stream_turn(self.user_message, self.thread_id):
+                if event["type"] == "tool_start":
+                    status.info(TOOL_PROGRESS_LABELS.get(event["name"], f"🛠️ Calling {event['name']}…"))
+                elif event["type"] == "tool_end":
+                    status.info(f"✅ Got results from {event['name']}")
+                elif event["type"] == "token":
+                    if event["message_id"] != current_id:
+                        current_id = event["message_id"]
+                        texts[current_id] = ""
+                    texts[current_id] += event["text"]
+                    placeholder.markdown(texts[current_id] + "▌")
+                elif event["type"] == "done":
+                    done = event
+
+            ai_response = done.get("content", "")
+            status.empty()
+            if ai_response:
+                placeholder.markdown(ai_response)
+            else:
+                placeholder.empty()
+
+        ttft = done.get("time_to_first_token")
+        total = done.get("total_latency", 0.0)
+        self._record_latency(ttft, total)
+        if ttft is not None:
+            st.caption(f"⏱️ first token {ttft:.2f}s · total {total:.2f}s")
+        return ai_response
 
-    @traceable(name="display_result_ui")
+    @traced(name="display_result_ui", component="app")
     def display_result_on_ui(self):
         usecase = self.usecase
         graph = self.graph
@@ -20,10 +85,26 @@ class DisplayResultStreamlit:
         
         print(f"Processing message: {user_message}")
         print(f"Thread ID: {thread_id}")
-        
+
+        if self.streaming and usecase in ("Basic Chatbot", "Chatbot With Web", "Agentic RAG", "Multi-Source Research"):
+            ai_response = self.stream_result_on_ui()
+            if ai_response:
+                ChatHistory().append("assistant", ai_response)
+            return
+
+        # Blocking runs take a turn slot too, so they queue with the streamed ones
+        with turn_scheduler.admit(thread_id, usecase):
+            self._display_blocking_result()
+
+    def _display_blocking_result(self):
+        usecase = self.usecase
+        graph = self.graph
+        user_message = self.user_message
+        thread_id = self.thread_id
+        # thread_id for memory persistence; thread and use case also attribute the turn's usage
+        config = GraphRunner.make_config(thread_id, usecase)
+
         if usecase == "Basic Chatbot":
-            # Create config with thread_id for memory persistence
-            config = {"configurable": {"thread_id": thread_id}}
             
             # Stream the graph with memory support
             ai_response = ""
@@ -50,15 +131,28 @@ class DisplayResultStreamlit:
                     st.write(ai_response)
                 
                 # Add assistant message to session state
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": ai_response
-                })
+                ChatHistory().append("assistant", ai_response)
+
+        elif usecase in ("Agentic RAG", "Multi-Source Research"):
+            res = graph.invoke({"messages": [user_message]}, config)
+
+            # The answer is the last AI message with content (agent, generator or research answer)
+            ai_response = ""
+            for message in reversed(res['messages']):
+                if type(message) == AIMessage and message.content:
+                    ai_response = message.content
+                    break
+
+            if ai_response:
+                with st.chat_message("assistant"):
+                    st.write(ai_response)
+
+                ChatHistory().append("assistant", ai_response)
 
         elif usecase == "Chatbot With Web":
             # Prepare state and invoke the graph
             initial_state = {"messages": [user_message]}
-            res = graph.invoke(initial_state)
+            res = graph.invoke(initial_state, config)
             
             # Find the AI response from the messages
             ai_response = ""
@@ -73,7 +167,4 @@ class DisplayResultStreamlit:
                     st.write(ai_response)
                 
                 # Add assistant message to session state
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": ai_response
-                })
+                ChatHistory().append("assistant", ai_response)
@@ -1,12 +1,13 @@
 import streamlit as st
 import os
 
-from src.langgraphagenticai.ui.uiconfigfile import Config
+from src.langgraphagenticai.ui.uiconfigfile import get_config
+from src.langgraphagenticai.ui.streamlitui.chat_history import ChatHistory
 
 class LoadStreamlitUI:
     def __init__(self):
         try:
-            self.config = Config()
+            self.config = get_config()
         except Exception as e:
             st.error(f"Error loading configuration: {e}")
             # Create a minimal config with defaults
@@ -71,15 +72,25 @@ class LoadStreamlitUI:
                     st.error(f"Error loading model options: {e}")
                     model_options = ["llama3-8b-8192", "llama3-70b-8192", "gemma2-9b-it"]
                 self.user_controls["selected_groq_model"] = st.selectbox("Select Model", model_options)
+                # Optional small → large cascade instead of a single model
+                small_model, large_model = self.config.get_cascade_models() if self.config else ("llama3-8b-8192", "llama3-70b-8192")
+                self.user_controls["cascade_mode"] = st.checkbox(
+                    f"Cascade mode ({small_model} → {large_model})", value=False,
+                    help="Answer with the small model first and escalate to the large model only when needed")
+                self.user_controls["cascade_small_model"] = small_model
+                self.user_controls["cascade_large_model"] = large_model
                 self.user_controls["GROQ_API_KEY"] = st.session_state["GROQ_API_KEY"] = st.text_input("GROQ API Key", type="password")
                 # Validate API key
                 if not self.user_controls["GROQ_API_KEY"]:
                     st.warning("⚠️ Please enter your GROQ API key to proceed. Don't have? refer : https://console.groq.com/keys ")
 
+            # Token-level streaming of responses
+            self.user_controls["stream_responses"] = st.checkbox("Stream responses", value=True)
+
             ## Usecase selection
             self.user_controls["selected_usecase"] = st.selectbox("Select Usecases", usecase_options)
 
-            if self.user_controls["selected_usecase"] == 'Chatbot With Web':
+            if self.user_controls["selected_usecase"] in ('Chatbot With Web', 'Multi-Source Research'):
                 os.environ["TAVILY_API_KEY"] = self.user_controls["TAVILY_API_KEY"] = st.session_state["TAVILY_API_KEY"] = st.text_input("TAVILY API Key", type="password")
                 # Validate API key
                 if not self.user_controls["TAVILY_API_KEY"]:
@@ -93,9 +104,7 @@ class LoadStreamlitUI:
             # Add Clear Chat button
             st.markdown("---")
             if st.button("🗑️ Clear Chat History", type="secondary"):
-                st.session_state.messages = []
-                import uuid
-                st.session_state.thread_id = str(uuid.uuid4())
+                ChatHistory().clear()
                 st.rerun()
 
         return self.user_controls
@@ -1,4 +1,5 @@
 from configparser import ConfigParser
+from functools import lru_cache
 import os
 
 
@@ -11,7 +12,9 @@ class Config:
             "PAGE_TITLE": "LangGraph: Build Stateful Agentic AI graph",
             "LLM_OPTIONS": "Groq",
             "USECASE_OPTIONS": "Basic Chatbot",
-            "GROQ_MODEL_OPTIONS": "llama3-8b-8192, llama3-70b-8192, gemma2-9b-it"
+            "GROQ_MODEL_OPTIONS": "llama3-8b-8192, llama3-70b-8192, gemma2-9b-it",
+            "CASCADE_SMALL_MODEL": "llama3-8b-8192",
+            "CASCADE_LARGE_MODEL": "llama3-70b-8192"
         }
         
         # Determine config file path
@@ -48,5 +51,16 @@ class Config:
         value = self.config["DEFAULT"].get("GROQ_MODEL_OPTIONS", self.defaults["GROQ_MODEL_OPTIONS"])
         return value.split(", ") if value else ["llama3-8b-8192", "llama3-70b-8192", "gemma2-9b-it"]
     
+    def get_cascade_models(self):
+        small = self.config["DEFAULT"].get("CASCADE_SMALL_MODEL", self.defaults["CASCADE_SMALL_MODEL"])
+        large = self.config["DEFAULT"].get("CASCADE_LARGE_MODEL", self.defaults["CASCADE_LARGE_MODEL"])
+        return small, large
+
     def get_page_title(self):
         return self.config["DEFAULT"].get("PAGE_TITLE", self.defaults["PAGE_TITLE"])
+
+
+@lru_cache(maxsize=None)
+def get_config(config_file=None):
+    """Return the parsed config, read once per process and shared by every rerun and session."""
+    return Config(config_file)
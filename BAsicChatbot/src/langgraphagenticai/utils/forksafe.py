@@ -0,0 +1,30 @@
+"""
+Per-process state that must not cross a fork.
+
+The pre-fork server builds its graphs in the master, which opens the response
+cache and usage ledger SQLite connections before the workers are forked. SQLite
+connections must not be used from two processes, and a lock held by another
+thread of the master at fork time would stay held forever in the child. Objects
+registered here get `_after_fork()` called in every forked child, where they
+drop their connection (reopened lazily) and replace their locks.
+"""
+
+import os
+import weakref
+
+_registered = weakref.WeakSet()
+
+
+def reset_after_fork(obj):
+    """Calls `obj._after_fork()` in every child forked while `obj` is alive."""
+    _registered.add(obj)
+    return obj
+
+
+def _after_fork_in_child():
+    for obj in list(_registered):
+        obj._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
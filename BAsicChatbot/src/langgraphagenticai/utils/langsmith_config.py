@@ -4,13 +4,24 @@ LangSmith configuration for debugging and monitoring
 
 import os
 from dotenv import load_dotenv
+from src.langgraphagenticai.utils.tracing import get_tracing_client, policy
 
 # Load environment variables
 load_dotenv()
 
+# (api key, result) of the last setup, so reruns with the same key skip it
+_last_setup = None
+
 def setup_langsmith():
-    """Configure LangSmith for tracing and monitoring"""
-    
+    """Configure LangSmith for tracing and monitoring (once per API key)"""
+    global _last_setup
+    langsmith_api_key = os.environ.get("LANGSMITH_API_KEY", "")
+    if _last_setup is not None and _last_setup[0] == langsmith_api_key:
+        return _last_setup[1]
+    _last_setup = (langsmith_api_key, _configure_langsmith(langsmith_api_key))
+    return _last_setup[1]
+
+def _configure_langsmith(langsmith_api_key):
     # Set LangSmith environment variables
     langsmith_config = {
         "LANGCHAIN_TRACING_V2": "true",
@@ -18,14 +29,15 @@ def setup_langsmith():
         "LANGCHAIN_PROJECT": "himalaya-enterprises-chatbot",
     }
     
-    # Get LangSmith API key from environment (prefer UI/session)
-    langsmith_api_key = os.environ.get("LANGSMITH_API_KEY", "")
     if langsmith_api_key:
         langsmith_config["LANGCHAIN_API_KEY"] = langsmith_api_key
         # Set environment variables
         for key, value in langsmith_config.items():
             os.environ[key] = value
-        print("✅ LangSmith tracing enabled")
+        # Sampled traces, exported through a bounded queue (see tracing.py)
+        policy.refresh()
+        get_tracing_client()
+        print(f"✅ LangSmith tracing enabled (sample rate {policy.sample_rate:g})")
         print(f"📊 Project: {langsmith_config['LANGCHAIN_PROJECT']}")
         print(f"🔗 Dashboard: https://smith.langchain.com/o/default/projects/p/{langsmith_config['LANGCHAIN_PROJECT']}")
         return True
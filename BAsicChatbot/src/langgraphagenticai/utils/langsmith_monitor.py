@@ -8,6 +8,8 @@ chatbot using LangSmith's tracing and analytics capabilities.
 import os
 from typing import Dict, Any, Optional
 
+from src.langgraphagenticai.utils.tracing import policy
+
 class LangSmithMonitor:
     """
     LangSmith monitoring and debugging utilities
@@ -38,6 +40,8 @@ class LangSmithMonitor:
             "analytics_url": self.get_analytics_url(),
             "tracing_enabled": os.getenv("LANGCHAIN_TRACING_V2") == "true",
             "api_key_configured": bool(os.getenv("LANGSMITH_API_KEY")),
+            "sample_rate": policy.sample_rate,
+            "component_sample_rates": dict(policy.component_rates),
             "traced_components": [
                 "WebLoader Tool",
                 "Graph Builder",
@@ -137,9 +141,10 @@ USAGE_EXAMPLES = """
 
 3. Trace Custom Functions:
    ```python
-   from langsmith import traceable
+   from src.langgraphagenticai.utils.tracing import traced
    
-   @traceable(name="my_function")
+   # Sampled like the rest of the app (TRACING_SAMPLE_RATE / TRACING_SAMPLE_RATES)
+   @traced(name="my_function", component="app")
    def my_function(input_data):
        return process_data(input_data)
    ```
@@ -0,0 +1,254 @@
+"""
+In-process latency histograms and counters.
+
+Every stage the app spends time in records into the process-wide `metrics`
+registry:
+
+- "node": each graph node (hop);
+- "tool": each tool call made by the tool node;
+- "embedding": each embedding batch (index build, web cache upserts, queries);
+- "retrieval": each vector index or fan-out source lookup;
+- "http": each outbound page fetch or status check;
+- "llm": each model call that reached the API.
+
+A histogram keeps cumulative counts in fixed buckets (exported in Prometheus
+text format) and a window of recent samples for p50/p95/p99. Counters count
+cache lookups, retries, tokens and timeouts. Components that keep their own
+stats (the intent router, the prefetcher, the model cascade) register a
+collector and are reported alongside, as gauges. The same snapshot feeds the
+server's /metrics and /metrics.json endpoints and the Streamlit sidebar panel,
+so regressions show up without an external service. Metrics are per process;
+with pre-forked workers each worker reports its own. METRICS=false turns
+recording off.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, from a cache hit to a slow tool-heavy turn
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "chatbot"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram plus a window of recent samples for percentiles."""
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def percentiles(self) -> dict:
+        samples = sorted(self.recent)
+        if not samples:
+            return {"p50": None, "p95": None, "p99": None}
+        pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+        return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs as Prometheus expects them, ending with +Inf."""
+        pairs, running = [], 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            running += count
+            pairs.append((f"{bound:g}", running))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+def _labels_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _flatten(prefix: str, value):
+    """(name, number) pairs from a possibly nested stats dict; other values are skipped."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(f"{prefix}_{key}", item)
+    elif isinstance(value, (int, float)):
+        yield re.sub(r"[^a-zA-Z0-9_]", "_", prefix), float(value)
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    Latency histograms keyed by (stage, name) and labelled counters.
+    """
+    def __init__(self, enabled: bool = True, buckets=DEFAULT_BUCKETS, window: int = 1024):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.window = window
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+    def register_collector(self, name: str, collect: Callable[[], dict]):
+        """
+        Reports a component's own stats (`collect()` returns a dict of numbers,
+        possibly nested) under "components" in snapshots and as gauges in the text export.
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _collect(self) -> Dict[str, dict]:
+        with self._lock:
+            collectors = sorted(self._collectors.items())
+        components = {}
+        for name, collect in collectors:
+            try:
+                components[name] = collect()
+            except Exception as e:
+                components[name] = {"error": str(e)}
+        return components
+
+    def observe(self, stage: str, name: str, seconds: float):
+        """Records one duration of `name` in `stage` (e.g. stage "node", name "chatbot")."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get((stage, name))
+            if histogram is None:
+                histogram = self._histograms[(stage, name)] = Histogram(self.buckets, self.window)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str, name: str):
+        """Observes how long the block took, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, name, time.perf_counter() - started)
+
+    def inc(self, counter: str, amount: float = 1, **labels):
+        if not self.enabled or not amount:
+            return
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(counter, {})
+            series[key] = series.get(key, 0) + amount
+
+    def counter(self, counter: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(counter, {}).get(_labels_key(labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """Per-stage latency summaries and counter values, as plain JSON-ready data."""
+        with self._lock:
+            latency: Dict[str, Dict[str, dict]] = {}
+            for (stage, name), histogram in sorted(self._histograms.items()):
+                latency.setdefault(stage, {})[name] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "max": histogram.max,
+                    **histogram.percentiles(),
+                }
+            counters = {
+                counter: [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+                for counter, series in sorted(self._counters.items())
+            }
+        return {"pid": os.getpid(), "latency_seconds": latency, "counters": counters, "components": self._collect()}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        histogram_name = f"{METRIC_PREFIX}_stage_latency_seconds"
+        quantile_name = f"{METRIC_PREFIX}_stage_latency_recent_seconds"
+        lines = []
+        components = self._collect()
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            if histograms:
+                lines.append(f"# HELP {histogram_name} Duration of each stage (node, tool, embedding, retrieval, http, llm).")
+                lines.append(f"# TYPE {histogram_name} histogram")
+                for (stage, name), histogram in histograms:
+                    base = [("stage", stage), ("name", name)]
+                    for le, count in histogram.cumulative():
+                        lines.append(f"{histogram_name}_bucket{_format_labels(base + [('le', le)])} {count}")
+                    lines.append(f"{histogram_name}_sum{_format_labels(base)} {histogram.sum:.6f}")
+                    lines.append(f"{histogram_name}_count{_format_labels(base)} {histogram.count}")
+                lines.append(f"# HELP {quantile_name} Percentiles over the most recent samples of each stage.")
+                lines.append(f"# TYPE {quantile_name} gauge")
+                for (stage, name), histogram in histograms:
+                    for quantile, value in zip(("0.5", "0.95", "0.99"), histogram.percentiles().values()):
+                        labels = _format_labels([("stage", stage), ("name", name), ("quantile", quantile)])
+                        lines.append(f"{quantile_name}{labels} {value:.6f}")
+            for counter, series in sorted(self._counters.items()):
+                metric = f"{METRIC_PREFIX}_{counter}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        for component, stats in components.items():
+            for name, value in _flatten(f"{METRIC_PREFIX}_{component}", stats):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def rows(self, stage: Optional[str] = None) -> List[dict]:
+        """One flat row per (stage, name), in milliseconds, for tables."""
+        to_ms = lambda seconds: None if seconds is None else round(seconds * 1000, 1)
+        rows = []
+        for stage_name, names in self.snapshot()["latency_seconds"].items():
+            if stage is not None and stage_name != stage:
+                continue
+            for name, summary in names.items():
+                rows.append({
+                    "stage": stage_name, "name": name, "count": summary["count"],
+                    "p50 ms": to_ms(summary["p50"]), "p95 ms": to_ms(summary["p95"]),
+                    "p99 ms": to_ms(summary["p99"]), "max ms": to_ms(summary["max"]),
+                })
+        return rows
+
+
+def metered_node(name: str, node):
+    """
+    Wraps a node (function or runnable) so every run is observed as stage "node".
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    runnable = node if hasattr(node, "invoke") else RunnableLambda(node)
+
+    def run(state, config):
+        with metrics.time("node", name):
+            return runnable.invoke(state, config)
+
+    async def arun(state, config):
+        with metrics.time("node", name):
+            return await runnable.ainvoke(state, config)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+# Process-wide registry
+metrics = MetricsRegistry(enabled=os.environ.get("METRICS", "true").lower() == "true")
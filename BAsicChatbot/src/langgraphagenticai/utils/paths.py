@@ -0,0 +1,13 @@
+import os
+
+# BAsicChatbot/ project root
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def get_cache_dir() -> str:
+    """
+    Directory for local caches and stores (SQLite files), overridable with APP_CACHE_DIR
+    """
+    cache_dir = os.environ.get("APP_CACHE_DIR") or os.path.join(PROJECT_ROOT, ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
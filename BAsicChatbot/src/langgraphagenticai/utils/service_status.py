@@ -1,7 +1,8 @@
-import requests
 import streamlit as st
 from datetime import datetime
 
+from src.langgraphagenticai.LLMS.service_health import get_health_monitor
+
 class ServiceStatusChecker:
     """
     Utility class to check Groq service status
@@ -10,35 +11,19 @@ class ServiceStatusChecker:
     @staticmethod
     def check_groq_status():
         """
-        Check Groq service status from their status page
+        Return the Groq service status cached by the background health poller
+        (no network call), with the recent error rate of our own calls
         """
-        try:
-            response = requests.get("https://groqstatus.com/api/v2/status.json", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                status = data.get("status", {})
-                indicator = status.get("indicator", "unknown")
-                description = status.get("description", "Unknown status")
-                
-                return {
-                    "indicator": indicator,
-                    "description": description,
-                    "is_operational": indicator == "none"
-                }
-        except Exception as e:
-            st.warning(f"Could not check service status: {e}")
-            
-        return {
-            "indicator": "unknown",
-            "description": "Could not determine service status",
-            "is_operational": False
-        }
+        return get_health_monitor().snapshot()
     
     @staticmethod
     def display_service_status():
         """
         Display service status in Streamlit UI
         """
+        monitor = get_health_monitor()
+        # Ask for a fresh check in the background; the cached status is shown right away
+        monitor.refresh()
         status = ServiceStatusChecker.check_groq_status()
         
         if status["is_operational"]:
@@ -46,5 +31,11 @@ class ServiceStatusChecker:
         else:
             st.error(f"🔴 Groq API Status: {status['description']}")
             st.info("Check https://groqstatus.com/ for more details")
+
+        if status["checked_at"]:
+            checked = datetime.fromtimestamp(status["checked_at"]).strftime("%H:%M:%S")
+            st.caption(f"Last checked {checked} · {status['error_rate']:.0%} of {status['recent_calls']} recent calls failed")
+        if status["degraded"]:
+            st.warning(f"New requests fail fast while degraded: {status['degraded']}")
             
         return status
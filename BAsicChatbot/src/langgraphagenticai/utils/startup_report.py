@@ -0,0 +1,51 @@
+"""
+Cold-start timings for the app.
+
+Records how long the process took to import the app modules, to render the
+first page, and to lazily load each use case's dependencies the first time it
+was used. Only the first measurement of each step is kept, since later ones hit
+warm module and resource caches. The report is printed once and shown in the
+Streamlit sidebar.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """First-seen duration of each named startup step, in seconds."""
+    def __init__(self):
+        self.created = time.perf_counter()
+        self._timings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> bool:
+        """Keeps the first duration recorded under `name`; returns False for repeats."""
+        with self._lock:
+            if name in self._timings:
+                return False
+            self._timings[name] = seconds
+        print(f"Startup: {name} took {seconds:.3f}s")
+        return True
+
+    def seen(self, name: str) -> bool:
+        with self._lock:
+            return name in self._timings
+
+    @contextmanager
+    def measure(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def timings(self) -> "OrderedDict[str, float]":
+        with self._lock:
+            return OrderedDict(self._timings)
+
+
+# Process-wide report
+startup_report = StartupReport()
@@ -0,0 +1,91 @@
+"""
+Persistent per-thread chat transcript.
+
+The Streamlit session only keeps the most recent messages of a conversation;
+every message is also written here, so older ones can be paged back in on
+demand instead of living in session memory for the whole session. Messages are
+stored in SQLite, numbered per thread, and threads idle for longer than the TTL
+are purged when the store opens.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from src.langgraphagenticai.utils.paths import get_cache_dir
+
+
+class ThreadStore:
+    """
+    SQLite-backed transcript of each conversation thread.
+    """
+    def __init__(self, path: str = None, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path or os.path.join(get_cache_dir(), "threads.sqlite")
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "thread_id TEXT, seq INTEGER, role TEXT, content TEXT, created REAL, "
+            "PRIMARY KEY (thread_id, seq))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS messages_created ON messages(created)")
+        self._conn.commit()
+        self.purge_expired()
+
+    def append(self, thread_id: str, role: str, content: str) -> int:
+        """Stores a message and returns its sequence number in the thread (0-based)."""
+        with self._lock:
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO messages (thread_id, seq, role, content, created) VALUES (?, ?, ?, ?, ?)",
+                (thread_id, seq, role, content, time.time()),
+            )
+            self._conn.commit()
+            return seq
+
+    def count(self, thread_id: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+    def page(self, thread_id: str, before_seq: int, limit: int) -> List[Dict[str, str]]:
+        """Up to `limit` messages immediately before `before_seq`, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE thread_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (thread_id, before_seq, limit),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Deletes threads whose last message is older than the TTL."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM messages WHERE thread_id IN "
+                "(SELECT thread_id FROM messages GROUP BY thread_id HAVING MAX(created) < ?)",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._conn.commit()
+
+
+_thread_store = None
+_thread_store_lock = threading.Lock()
+
+
+def get_thread_store() -> ThreadStore:
+    """Returns the process-wide thread store (THREAD_STORE_TTL_DAYS, default 7)."""
+    global _thread_store
+    with _thread_store_lock:
+        if _thread_store is None:
+            _thread_store = ThreadStore(ttl_seconds=float(os.environ.get("THREAD_STORE_TTL_DAYS", 7)) * 24 * 3600)
+        return _thread_store
@@ -0,0 +1,250 @@
+"""
+Sampled, bounded LangSmith tracing.
+
+`@traceable` on every node, tool and loader method traces each call as soon as
+LANGCHAIN_TRACING_V2 is on, and LangChain adds a run for every LLM call and
+graph step beneath it. Under load that is a lot of serialization and upload
+work for traces nobody reads. `traced` replaces `@traceable` with a policy:
+
+- when tracing is off, the wrapper calls the function directly (one attribute check);
+- a trace is kept with probability TRACING_SAMPLE_RATE, decided once at the
+  root, and every traced call beneath it follows that decision; an unsampled
+  trace also switches LangChain's own runs off, so nothing of it is recorded;
+- TRACING_SAMPLE_RATES (e.g. "tools=0.1,loader=0") samples a component at its
+  own rate, both as a root and inside a sampled trace, where skipping it drops
+  that call's subtree from the trace;
+- runs are exported by a client whose background batch queue is bounded: when
+  more than TRACING_MAX_PENDING runs are waiting, new runs are dropped instead
+  of piling up in memory, and their updates with them;
+- strings in run inputs and outputs (retrieved context, page text) are cut to
+  TRACING_MAX_PAYLOAD_CHARS.
+
+Sampling decisions and dropped runs are counted in the process metrics.
+"""
+
+import functools
+import inspect
+import os
+import random
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from src.langgraphagenticai.utils.metrics import metrics
+
+# Whether the current call tree is being traced; None outside any traced call
+_sampled: ContextVar[Optional[bool]] = ContextVar("trace_sampled", default=None)
+
+# Lists longer than this are cut as well (e.g. dozens of retrieved documents)
+MAX_PAYLOAD_ITEMS = 20
+
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            component, rate = part.split("=", 1)
+            rates[component.strip()] = float(rate)
+    return rates
+
+
+def truncate_payload(value, max_chars: int, max_items: int = MAX_PAYLOAD_ITEMS):
+    """Copy of a run payload with long strings, documents and lists cut down."""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}... [{len(value) - max_chars} chars truncated]"
+    if isinstance(value, dict):
+        return {key: truncate_payload(item, max_chars, max_items) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [truncate_payload(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... [{len(value) - max_items} items truncated]")
+        return items
+    page_content = getattr(value, "page_content", None)
+    if isinstance(page_content, str) and len(page_content) > max_chars and hasattr(value, "model_copy"):
+        return value.model_copy(update={"page_content": truncate_payload(page_content, max_chars)})
+    return value
+
+
+class TracingPolicy:
+    """
+    Global and per-component sample rates, plus the export limits.
+    """
+    def __init__(self, sample_rate: float = 1.0, component_rates: Dict[str, float] = None,
+                 max_payload_chars: int = 2000, max_pending: int = 1000):
+        self.sample_rate = sample_rate
+        self.component_rates = dict(component_rates or {})
+        self.max_payload_chars = max_payload_chars
+        self.max_pending = max_pending
+        self.active = self._tracing_env()
+
+    @classmethod
+    def from_env(cls) -> "TracingPolicy":
+        return cls(
+            sample_rate=float(os.environ.get("TRACING_SAMPLE_RATE", 1.0)),
+            component_rates=_parse_rates(os.environ.get("TRACING_SAMPLE_RATES", "")),
+            max_payload_chars=int(os.environ.get("TRACING_MAX_PAYLOAD_CHARS", 2000)),
+            max_pending=int(os.environ.get("TRACING_MAX_PENDING", 1000)),
+        )
+
+    @staticmethod
+    def _tracing_env() -> bool:
+        return (os.environ.get("LANGCHAIN_TRACING_V2") == "true"
+                or os.environ.get("LANGSMITH_TRACING") == "true")
+
+    def refresh(self):
+        """Re-reads whether tracing is on; setup_langsmith switches it on at runtime."""
+        self.active = self._tracing_env()
+
+    def rate(self, component: str) -> float:
+        return self.component_rates.get(component, self.sample_rate)
+
+    def decide(self, component: str) -> Optional[bool]:
+        """
+        Whether this call is traced; None when there is nothing to decide
+        (tracing is off, or the enclosing trace was not sampled).
+        """
+        if not self.active:
+            return None
+        parent = _sampled.get()
+        if parent is False:
+            return None
+        if parent is None:
+            sampled = random.random() < self.rate(component)
+        elif component in self.component_rates:
+            sampled = random.random() < self.component_rates[component]
+        else:
+            return True
+        metrics.inc("traces", component=component, sampled=str(sampled).lower())
+        return sampled
+
+
+policy = TracingPolicy.from_env()
+
+
+@contextmanager
+def _applied(sampled: bool):
+    """Runs the block under a sampling decision; an unsampled block has LangChain's tracing off too."""
+    previous = _sampled.get()
+    _sampled.set(sampled)
+    try:
+        if sampled:
+            yield
+        else:
+            from langsmith import tracing_context
+            with tracing_context(enabled=False):
+                yield
+    finally:
+        _sampled.set(previous)
+
+
+@contextmanager
+def trace_scope(component: str):
+    """
+    Applies the sampling decision to a block that runs LangChain code without
+    a `traced` function around it (e.g. a graph turn driven by GraphRunner).
+    """
+    sampled = policy.decide(component)
+    if sampled is None:
+        yield
+        return
+    with _applied(sampled):
+        yield
+
+
+def traced(name: str, component: str = "app", **traceable_kwargs):
+    """
+    Drop-in replacement for `@traceable(name=...)` that follows the tracing policy.
+    """
+    def decorate(func):
+        from langsmith import traceable
+        traced_func = traceable(name=name, **traceable_kwargs)(func)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                sampled = policy.decide(component)
+                if sampled is None:
+                    return await func(*args, **kwargs)
+                with _applied(sampled):
+                    return await (traced_func if sampled else func)(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sampled = policy.decide(component)
+            if sampled is None:
+                return func(*args, **kwargs)
+            with _applied(sampled):
+                return (traced_func if sampled else func)(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _bounded_client_class():
+    from langsmith import Client
+
+    class BoundedTracingClient(Client):
+        """
+        LangSmith client that drops new runs while its background batch queue is
+        backed up, and truncates run payloads before they are queued.
+        """
+        def __init__(self, max_pending: int = 1000, max_payload_chars: int = 2000, **kwargs):
+            truncate = functools.partial(truncate_payload, max_chars=max_payload_chars)
+            super().__init__(hide_inputs=truncate, hide_outputs=truncate, auto_batch_tracing=True, **kwargs)
+            self.max_pending = max_pending
+            self.dropped = 0
+            # Ids of dropped runs, so their updates are dropped too (bounded)
+            self._dropped_ids = OrderedDict()
+            self._drop_lock = threading.Lock()
+
+        def _backlogged(self) -> bool:
+            queue = getattr(self, "tracing_queue", None)
+            return queue is not None and queue.qsize() >= self.max_pending
+
+        def _drop(self, run_id, operation: str):
+            with self._drop_lock:
+                self.dropped += 1
+                if run_id is not None:
+                    self._dropped_ids[str(run_id)] = True
+                    if len(self._dropped_ids) > 10000:
+                        self._dropped_ids.popitem(last=False)
+            metrics.inc("tracing_dropped", operation=operation)
+
+        def create_run(self, name, inputs, run_type, **kwargs):
+            if self._backlogged():
+                self._drop(kwargs.get("id"), "create")
+                return None
+            return super().create_run(name, inputs, run_type, **kwargs)
+
+        def update_run(self, run_id, **kwargs):
+            with self._drop_lock:
+                dropped = self._dropped_ids.pop(str(run_id), False)
+            if dropped:
+                metrics.inc("tracing_dropped", operation="update")
+                return None
+            return super().update_run(run_id, **kwargs)
+
+    return BoundedTracingClient
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_tracing_client():
+    """
+    Returns the process-wide bounded LangSmith client and makes it the default
+    for traced functions and LangChain runs. Called once tracing is configured.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            import langsmith
+            _client = _bounded_client_class()(max_pending=policy.max_pending,
+                                              max_payload_chars=policy.max_payload_chars)
+            langsmith.configure(client=_client)
+        return _client
@@ -0,0 +1,285 @@
+"""
+Token and latency accounting per thread, model, use case and tool.
+
+Every model call, tool call and embedding batch is written to a local SQLite
+ledger with its tokens and latency:
+
+- "llm": prompt and completion tokens as reported in the response's
+  usage_metadata (cache hits are recorded with cached=1 and no tokens);
+- "tool": an estimate of the tokens the tool's output adds to the next prompt;
+- "embedding": an estimate of the embedded tokens (~4 characters per token),
+  since OpenAIEmbeddings does not return usage.
+
+Each call is attributed to the conversation (thread_id), use case and graph
+node it ran in, read from the run's metadata. A daily rollup per (use case,
+model, tool, kind) is maintained as calls are written, so totals stay cheap
+to query after the per-call rows have been purged (USAGE_LEDGER_RETENTION_DAYS).
+Writes are buffered and flushed in batches by a background thread, so the
+call path never waits on SQLite; what is still buffered at interpreter exit is
+flushed by an atexit hook. USAGE_LEDGER=false turns the ledger off.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from src.langgraphagenticai.utils.forksafe import reset_after_fork
+from src.langgraphagenticai.utils.paths import get_cache_dir
+
+KINDS = ("llm", "tool", "embedding")
+
+# Columns a rollup query can group by
+GROUP_BY = {
+    "thread": "thread_id", "model": "model", "usecase": "usecase", "tool": "tool",
+    "node": "node", "kind": "kind", "day": "day",
+}
+
+_TOTALS = (
+    "COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens, "
+    "SUM(tool_tokens) AS tool_tokens, SUM(embedding_tokens) AS embedding_tokens, "
+    "SUM(latency) AS latency_seconds, SUM(cached) AS cached_calls"
+)
+
+_ROLLUP_TOTALS = (
+    "SUM(calls) AS calls, SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens, "
+    "SUM(tool_tokens) AS tool_tokens, SUM(embedding_tokens) AS embedding_tokens, "
+    "SUM(latency) AS latency_seconds, SUM(cached_calls) AS cached_calls"
+)
+
+
+def estimate_text_tokens(texts) -> int:
+    """~4 characters per token, like the rate limiter's estimate."""
+    if isinstance(texts, str):
+        texts = [texts]
+    return sum(len(text) for text in texts) // 4
+
+
+def usage_context(run_manager=None) -> Dict[str, Optional[str]]:
+    """
+    thread_id, use case and graph node of the current call, from the run
+    manager's metadata or, without one, from the config of the running node.
+    """
+    metadata = getattr(run_manager, "metadata", None)
+    if metadata is None:
+        from langchain_core.runnables.config import var_child_runnable_config
+        config = var_child_runnable_config.get() or {}
+        metadata = {**config.get("metadata", {}), **config.get("configurable", {})}
+    return {
+        "thread_id": metadata.get("thread_id"),
+        "usecase": metadata.get("usecase"),
+        "node": metadata.get("langgraph_node"),
+    }
+
+
+class UsageLedger:
+    """
+    SQLite ledger of per-call usage, with daily rollups.
+    """
+    def __init__(self, path: str = None, retention_days: float = 30, flush_interval: float = 2.0,
+                 max_buffer: int = 200):
+        self.path = path or os.path.join(get_cache_dir(), "usage.sqlite")
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher_pid = None
+        self._connection = None
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            "ts REAL, day TEXT, kind TEXT, thread_id TEXT, usecase TEXT, node TEXT, model TEXT, tool TEXT, "
+            "prompt_tokens INTEGER, completion_tokens INTEGER, tool_tokens INTEGER, embedding_tokens INTEGER, "
+            "latency REAL, cached INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS calls_thread ON calls(thread_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS calls_ts ON calls(ts)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily ("
+            "day TEXT, kind TEXT, usecase TEXT, model TEXT, tool TEXT, calls INTEGER, "
+            "prompt_tokens INTEGER, completion_tokens INTEGER, tool_tokens INTEGER, embedding_tokens INTEGER, "
+            "latency REAL, cached_calls INTEGER, PRIMARY KEY (day, kind, usecase, model, tool))"
+        )
+        self._conn.commit()
+        self.purge_expired()
+        reset_after_fork(self)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """This process's connection, opened on first use (and again in a forked worker)."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        return self._connection
+
+    def _after_fork(self):
+        # Rows buffered by the parent are the parent's to write; its connection is abandoned, not closed
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._connection = None
+
+    # Recording
+
+    def record(self, kind: str, model: str = None, tool: str = None, prompt_tokens: int = 0,
+               completion_tokens: int = 0, tool_tokens: int = 0, embedding_tokens: int = 0,
+               latency: float = 0.0, cached: bool = False, context: Dict[str, Optional[str]] = None):
+        """Buffers one call; it reaches the database within `flush_interval` seconds."""
+        context = context or {}
+        now = time.time()
+        row = (
+            now, time.strftime("%Y-%m-%d", time.localtime(now)), kind,
+            context.get("thread_id"), context.get("usecase") or "", context.get("node"),
+            model or "", tool or "", int(prompt_tokens or 0), int(completion_tokens or 0),
+            int(tool_tokens or 0), int(embedding_tokens or 0), float(latency), int(bool(cached)),
+        )
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.max_buffer
+        self._start_flusher()
+        if full:
+            self._wake.set()
+
+    def _start_flusher(self):
+        """Starts the flush thread (again in a forked child, where the parent's thread does not exist)."""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._buffer_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._run_flusher, name="usage-ledger-flush", daemon=True).start()
+        # The daemon thread dies with the interpreter; a forked child inherits the parent's hook,
+        # so it is replaced rather than added twice
+        atexit.unregister(self._flush_at_exit)
+        atexit.register(self._flush_at_exit)
+
+    def _run_flusher(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Could not write usage records: {e}")
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Could not write usage records: {e}")
+
+    def flush(self) -> int:
+        """Writes buffered calls and updates the daily rollups; returns the number written."""
+        with self._buffer_lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany("INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany(
+                "INSERT INTO daily VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (day, kind, usecase, model, tool) DO UPDATE SET "
+                "calls = calls + 1, prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+                "completion_tokens = completion_tokens + excluded.completion_tokens, "
+                "tool_tokens = tool_tokens + excluded.tool_tokens, "
+                "embedding_tokens = embedding_tokens + excluded.embedding_tokens, "
+                "latency = latency + excluded.latency, cached_calls = cached_calls + excluded.cached_calls",
+                [(day, kind, usecase, model, tool, prompt, completion, tool_tokens, embedding, latency, cached)
+                 for (_, day, kind, _, usecase, _, model, tool, prompt, completion, tool_tokens, embedding,
+                      latency, cached) in rows],
+            )
+            self._conn.commit()
+        return len(rows)
+
+    # Queries
+
+    def _query(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def totals(self, group_by: str = "model", thread_id: str = None, since_days: float = None) -> List[Dict[str, Any]]:
+        """
+        Totals grouped by thread, model, usecase, tool, node, kind or day,
+        largest token spend first. Thread and node totals come from the per-call
+        rows (within the retention window); the others from the daily rollups.
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        column = GROUP_BY[group_by]
+        per_call = column in ("thread_id", "node") or thread_id is not None
+        conditions, params = [], []
+        if since_days is not None:
+            if per_call:
+                conditions.append("ts >= ?")
+                params.append(time.time() - since_days * 86400)
+            else:
+                conditions.append("day >= ?")
+                params.append(time.strftime("%Y-%m-%d", time.localtime(time.time() - since_days * 86400)))
+        if thread_id is not None:
+            conditions.append("thread_id = ?")
+            params.append(thread_id)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        table, totals = ("calls", _TOTALS) if per_call else ("daily", _ROLLUP_TOTALS)
+        return self._query(
+            f"SELECT {column} AS {group_by}, {totals} FROM {table} {where}GROUP BY {column} "
+            "ORDER BY SUM(prompt_tokens) + SUM(completion_tokens) + SUM(tool_tokens) + SUM(embedding_tokens) DESC",
+            params,
+        )
+
+    def thread_usage(self, thread_id: str) -> Dict[str, Any]:
+        """One conversation's totals across all its calls."""
+        rows = self._query(f"SELECT {_TOTALS} FROM calls WHERE thread_id = ?", (thread_id,))
+        return {key: value or 0 for key, value in rows[0].items()}
+
+    def calls(self, thread_id: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """The most recent calls, newest first."""
+        if thread_id is None:
+            return self._query("SELECT * FROM calls ORDER BY ts DESC LIMIT ?", (limit,))
+        return self._query("SELECT * FROM calls WHERE thread_id = ? ORDER BY ts DESC LIMIT ?", (thread_id, limit))
+
+    def purge_expired(self):
+        """Deletes per-call rows older than the retention window; daily rollups are kept."""
+        with self._lock:
+            self._conn.execute("DELETE FROM calls WHERE ts < ?", (time.time() - self.retention_days * 86400,))
+            self._conn.commit()
+
+
+@contextmanager
+def embedding_usage(model: str, texts):
+    """Records the embedding call made in the block (estimated tokens, latency) in the ledger."""
+    ledger = get_usage_ledger()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if ledger is not None:
+            ledger.record("embedding", model=model, embedding_tokens=estimate_text_tokens(texts),
+                          latency=time.perf_counter() - started, context=usage_context())
+
+
+_usage_ledger = None
+_usage_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """
+    Returns the process-wide usage ledger, or None when USAGE_LEDGER=false
+    """
+    global _usage_ledger
+    if os.environ.get("USAGE_LEDGER", "true").lower() != "true":
+        return None
+    with _usage_ledger_lock:
+        if _usage_ledger is None:
+            _usage_ledger = UsageLedger(retention_days=float(os.environ.get("USAGE_LEDGER_RETENTION_DAYS", 30)))
+        return _usage_ledger
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the small → large model cascade offline, with fake tiers. Long or
+multi-part questions should go straight to the large model, empty, hedging or
+unparseable small answers should escalate, every path (sync, async, streamed)
+should route the same way with the run's callbacks reaching the small tier,
+and the cascade counters should be exported with the metrics.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.langgraphagenticai.LLMS.cascade_llm import CascadeChatModel, CascadeStats, check_answer, needs_large_model
+from src.langgraphagenticai.utils.metrics import metrics
+
+
+class Tier(GenericFakeChatModel):
+    """Fake tier that always gives the same answer and remembers whether it got a run manager."""
+    answer: str = ""
+    run_managers: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.run_managers.append(run_manager)
+        self.messages = iter([AIMessage(content=self.answer)])
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.messages = iter([AIMessage(content=self.answer)])
+        yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class RecordingHandler(BaseCallbackHandler):
+    def __init__(self):
+        self.starts = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.starts += 1
+
+
+def cascade(small_answer: str):
+    return CascadeChatModel(small=Tier(messages=iter([]), answer=small_answer, run_managers=[]),
+                            large=Tier(messages=iter([]), answer="large answer", run_managers=[]),
+                            stats=CascadeStats())
+
+
+def test_escalation_rules():
+    """The cheap checks pick out questions and answers the small model should not handle."""
+    assert needs_large_model([HumanMessage(content="x" * 700)]) == "long_question"
+    assert needs_large_model([HumanMessage(content="What is A? And B?")]) == "multi_part_question"
+    assert needs_large_model([HumanMessage(content="1. pricing\n2. contact")]) == "multi_part_question"
+    assert needs_large_model([HumanMessage(content="What machines do you have?")]) is None
+    assert check_answer(AIMessage(content="  ")) == "empty_answer"
+    assert check_answer(AIMessage(content="I'm not sure about that.")) == "low_confidence"
+    assert check_answer(AIMessage(content="", invalid_tool_calls=[{"name": "x", "args": "{", "id": "1",
+                                                                   "error": "bad"}])) == "tool_call_parse_failure"
+    assert check_answer(AIMessage(content="We have 12 machines.")) is None
+
+
+def test_routes_sync_async_and_streamed():
+    """All call paths keep good small answers and escalate hedging ones."""
+    good, hedging = cascade("We have 12 machines."), cascade("I don't know.")
+    assert good.invoke("machines?").content == "We have 12 machines."
+    assert hedging.invoke("machines?").content == "large answer"
+    assert asyncio.run(hedging.ainvoke("machines?")).content == "large answer"
+    assert "".join(chunk.content for chunk in good.stream("machines?")) == "We have 12 machines."
+    assert "".join(chunk.content for chunk in hedging.stream("machines?")) == "large answer"
+
+    async def astream(model):
+        return "".join([chunk.content async for chunk in model.astream("machines?")])
+    assert asyncio.run(astream(good)) == "We have 12 machines."
+    assert asyncio.run(astream(hedging)) == "large answer"
+    print(f"Hedging cascade stats: {hedging.stats.snapshot()}")
+    assert hedging.stats.snapshot()["escalations"] == 4
+    assert hedging.stats.snapshot()["reasons"] == {"low_confidence": 4}
+    assert good.stats.snapshot()["escalations"] == 0
+
+
+def test_small_tier_gets_run_manager():
+    """The small tier is called with the run's manager, so its usage is attributed to the turn."""
+    model = cascade("We have 12 machines.")
+    handler = RecordingHandler()
+    model.invoke("machines?", config={"callbacks": [handler]})
+    asyncio.run(model.ainvoke("machines?", config={"callbacks": [handler]}))
+    print(f"Small tier run managers: {model.small.run_managers}")
+    assert len(model.small.run_managers) == 2 and all(model.small.run_managers)
+    assert all(manager.handlers == [handler] for manager in model.small.run_managers)
+
+
+def test_stats_exported():
+    """The pooled cascades' counters reach /metrics."""
+    assert "cascade" in metrics.snapshot()["components"]
+    assert "chatbot_cascade_escalation_rate " in metrics.to_prometheus()
+
+
+if __name__ == "__main__":
+    test_escalation_rules()
+    test_routes_sync_async_and_streamed()
+    test_small_tier_gets_run_manager()
+    test_stats_exported()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the windowed chat history and its thread store offline, on a temporary
+database and outside a Streamlit run. Messages should be numbered per thread,
+`page(before_seq=...)` should return the messages just before that point,
+oldest first, the session should keep only the recent window, and opening
+earlier pages should render the older messages ahead of that window.
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+import uuid
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from src.langgraphagenticai.ui.streamlitui import chat_history
+from src.langgraphagenticai.ui.streamlitui.chat_history import ChatHistory
+from src.langgraphagenticai.utils.thread_store import ThreadStore
+
+
+class SessionState(dict):
+    """Attribute access over a dict, like st.session_state."""
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+class RecordingStreamlit:
+    """The few Streamlit calls ChatHistory makes, recording what would be rendered."""
+    def __init__(self):
+        self.session_state = SessionState(thread_id=str(uuid.uuid4()))
+        self.rendered = []
+        self.buttons = []
+
+    @contextlib.contextmanager
+    def chat_message(self, role):
+        self.rendered.append(role)
+        yield
+
+    def write(self, content):
+        self.rendered[-1] = (self.rendered[-1], content)
+
+    def button(self, label, on_click=None, key=None):
+        self.buttons.append(label)
+
+    def divider(self):
+        pass
+
+
+class swapped_streamlit:
+    def __enter__(self):
+        self.saved = chat_history.st
+        chat_history.st = RecordingStreamlit()
+        return chat_history.st
+
+    def __exit__(self, *exc):
+        chat_history.st = self.saved
+
+
+def temp_store() -> ThreadStore:
+    return ThreadStore(path=os.path.join(tempfile.mkdtemp(), "threads.sqlite"))
+
+
+def test_thread_store_paging():
+    """Sequence numbers count per thread; pages end just before `before_seq`."""
+    store = temp_store()
+    assert [store.append("a", "user", f"m{i}") for i in range(5)] == [0, 1, 2, 3, 4]
+    assert store.append("b", "user", "other") == 0
+    assert store.count("a") == 5
+    assert [m["content"] for m in store.page("a", before_seq=4, limit=2)] == ["m2", "m3"]
+    assert [m["content"] for m in store.page("a", before_seq=2, limit=10)] == ["m0", "m1"]
+    assert store.page("a", before_seq=0, limit=10) == []
+    store.delete_thread("a")
+    assert store.count("a") == 0 and store.count("b") == 1
+
+
+def test_history_window_and_pages():
+    """The session keeps the last `window` messages; opened pages render the older ones first."""
+    with swapped_streamlit() as st:
+        history = ChatHistory(store=temp_store(), window=3, page_size=2)
+        for i in range(7):
+            history.append("user" if i % 2 == 0 else "assistant", f"m{i}")
+        assert [m["content"] for m in st.session_state.messages] == ["m4", "m5", "m6"]
+        assert history.older_count() == 4
+
+        history.render()
+        assert [content for _, content in st.rendered] == ["m4", "m5", "m6"]
+        assert st.buttons == ["🕘 Load earlier messages (4 more)"]
+
+        st.rendered, st.buttons = [], []
+        st.session_state.history_pages = 1
+        history.render()
+        print(f"Rendered with one page open: {st.rendered}")
+        assert [content for _, content in st.rendered] == ["m2", "m3", "m4", "m5", "m6"]
+        assert st.buttons == ["🕘 Load earlier messages (2 more)", "Hide earlier messages"]
+
+        old_thread = st.session_state.thread_id
+        history.clear()
+        assert st.session_state.messages == [] and history.older_count() == 0
+        assert history.store.count(old_thread) == 0 and st.session_state.thread_id != old_thread
+
+
+if __name__ == "__main__":
+    test_thread_store_paging()
+    test_history_window_and_pages()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test the headless HTTP server with the stub LLM, in process (no network).
+A thread should keep its memory across requests, /chat/stream should emit
+server-sent events, concurrent turns should overlap instead of queueing, and
+idle threads should be evicted from the default in-memory checkpointer.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+import httpx
+
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+from src.langgraphagenticai.graph.checkpointer import BoundedMemorySaver
+from src.langgraphagenticai.server import GraphRegistry, create_app
+
+STUB_LATENCY = 0.2
+
+
+def make_client(checkpointer=None, latency=STUB_LATENCY):
+    registry = GraphRegistry(model_factory=lambda: StubChatModel(latency_seconds=latency),
+                             checkpointer=checkpointer, usecases=["Basic Chatbot"])
+    transport = httpx.ASGITransport(app=create_app(registry))
+    return httpx.AsyncClient(transport=transport, base_url="http://chat.test", timeout=30)
+
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _memory_across_requests():
+    async with make_client() as client:
+        first = (await client.post("/chat", json={"message": "hello", "thread_id": "t-1"})).json()
+        second = (await client.post("/chat", json={"message": "again", "thread_id": "t-1"})).json()
+        other = (await client.post("/chat", json={"message": "hi"})).json()
+        bad = await client.post("/chat", json={"message": "hi", "usecase": "Nope"})
+    print(f"First: {first['content']!r}")
+    print(f"Second: {second['content']!r}")
+    print(f"New thread: {other['content']!r} ({other['thread_id']})")
+    assert first["content"] == "Echo (turn 1): hello"
+    assert second["content"] == "Echo (turn 2): again"
+    assert other["content"] == "Echo (turn 1): hi" and other["thread_id"] != "t-1"
+    assert bad.status_code == 400
+
+
+async def _stream_events():
+    async with make_client() as client:
+        response = await client.post("/chat/stream", json={"message": "stream this please", "thread_id": "t-2"})
+    events = parse_sse(response.text)
+    tokens = "".join(data["text"] for name, data in events if name == "token")
+    print(f"Content-Type: {response.headers['content-type']}")
+    print(f"Events: {[name for name, _ in events]}")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert events[-1][0] == "done" and events[-1][1]["thread_id"] == "t-2"
+    assert tokens == "Echo (turn 1): stream this please"
+
+
+async def _concurrent_load(requests: int = 50):
+    async with make_client() as client:
+        await client.post("/chat", json={"message": "warm up"})
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/chat", json={"message": f"question {i}", "thread_id": f"load-{i}"})
+            for i in range(requests)
+        ])
+        elapsed = time.perf_counter() - started
+    latencies = sorted(response.json()["total_latency"] for response in responses)
+    print(f"{requests} concurrent turns in {elapsed:.2f}s "
+          f"(p50 {latencies[len(latencies) // 2]:.2f}s, max {latencies[-1]:.2f}s, "
+          f"sequential would be {requests * STUB_LATENCY:.1f}s)")
+    assert all(response.status_code == 200 for response in responses)
+    assert elapsed < requests * STUB_LATENCY / 4
+
+
+async def _idle_threads_evicted():
+    saver = BoundedMemorySaver(max_threads=3, idle_ttl=0.3)
+    async with make_client(saver, latency=0) as client:
+        for i in range(6):
+            await client.post("/chat", json={"message": "hello", "thread_id": f"evict-{i}"})
+        kept = sorted(saver.storage)
+        await asyncio.sleep(0.4)
+        await client.post("/chat", json={"message": "hello", "thread_id": "evict-new"})
+        again = (await client.post("/chat", json={"message": "again", "thread_id": "evict-0"})).json()
+    print(f"Threads kept after 6 conversations: {kept}; evicted: {saver.evicted}")
+    assert kept == ["evict-3", "evict-4", "evict-5"]
+    assert sorted(saver.storage) == ["evict-0", "evict-new"]
+    assert again["content"] == "Echo (turn 1): again"
+
+
+def test_memory_across_requests():
+    """Two requests on the same thread_id share the conversation."""
+    asyncio.run(_memory_across_requests())
+
+
+def test_stream_events():
+    """/chat/stream returns token events and a final done event."""
+    asyncio.run(_stream_events())
+
+
+def test_concurrent_load():
+    """Concurrent turns overlap on the event loop."""
+    asyncio.run(_concurrent_load())
+
+
+def test_idle_threads_evicted():
+    """The default checkpointer keeps at most max_threads threads and forgets idle ones."""
+    asyncio.run(_idle_threads_evicted())
+
+
+if __name__ == "__main__":
+    test_memory_across_requests()
+    test_stream_events()
+    test_concurrent_load()
+    test_idle_threads_evicted()
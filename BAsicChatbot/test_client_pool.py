@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the Groq client pool offline (no request reaches Groq).
+Each Streamlit turn builds its model through GroqLLM; the pool should hand back
+the same wrapper every turn, so bound-tool runnables are reused, not leaked.
+The connection warm-up should list the models instead of sending a billed
+completion.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from src.langgraphagenticai.LLMS.client_pool import GroqClientPool, groq_client_pool
+from src.langgraphagenticai.LLMS.groqllm import GroqLLM
+from src.langgraphagenticai.LLMS.resilient_llm import RetryPolicy
+from src.langgraphagenticai.tools.tavily_stub import StubTavilySearchResults
+
+USER_CONTROLS = {"GROQ_API_KEY": "gsk_test_pool", "selected_groq_model": "llama-3.1-8b-instant"}
+
+
+class StubGroqHandler(BaseHTTPRequestHandler):
+    """Records every request; answers the model list."""
+    requests = []
+
+    def _record(self):
+        type(self).requests.append((self.command, self.path, self.headers.get("Authorization")))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"object": "list", "data": []}')
+
+    do_GET = do_POST = _record
+
+    def log_message(self, *args):
+        pass
+
+
+def test_model_reused_across_turns():
+    """Five turns with equal retry settings share one wrapper and one bound-tool runnable."""
+    tools = [StubTavilySearchResults()]
+    models = [GroqLLM(user_contols_input=USER_CONTROLS).get_llm_model() for _ in range(5)]
+    bound = [groq_client_pool.bind_tools(model, tools) for model in models]
+    print(f"Wrappers: {len({id(model) for model in models})}, bound runnables: {len({id(b) for b in bound})}")
+    assert all(model is models[0] for model in models)
+    assert all(runnable is bound[0] for runnable in bound)
+    assert RetryPolicy(max_attempts=3) == RetryPolicy()
+
+
+def test_replaced_model_drops_bound_runnables():
+    """A different retry policy replaces the wrapper and evicts the old wrapper's bound runnables."""
+    pool = GroqClientPool()
+    first = pool.get_resilient_model("gsk_test_pool", "llama-3.1-8b-instant")
+    pool.bind_tools(first, [StubTavilySearchResults()])
+    second = pool.get_resilient_model("gsk_test_pool", "llama-3.1-8b-instant", retry_policy=RetryPolicy(max_attempts=5))
+    assert second is not first
+    assert not any(entry[0] is first for entry in pool._bound.values())
+
+
+def test_warm_up_lists_models():
+    """Warm-up sends one unbilled GET for the model list, once per key and model."""
+    server = HTTPServer(("127.0.0.1", 0), StubGroqHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = os.environ.get("GROQ_API_BASE")
+    os.environ["GROQ_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    try:
+        pool = GroqClientPool()
+        pool.warm_up("gsk_test_pool", "llama-3.1-8b-instant", background=False)
+        pool.warm_up("gsk_test_pool", "llama-3.1-8b-instant", background=False)
+    finally:
+        server.shutdown()
+        if saved is None:
+            os.environ.pop("GROQ_API_BASE", None)
+        else:
+            os.environ["GROQ_API_BASE"] = saved
+    print(f"Warm-up requests: {StubGroqHandler.requests}")
+    assert StubGroqHandler.requests == [("GET", "/openai/v1/models", "Bearer gsk_test_pool")]
+
+
+if __name__ == "__main__":
+    test_model_reused_across_turns()
+    test_replaced_model_drops_bound_runnables()
+    test_warm_up_lists_models()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the fan-out retrieval helpers offline. Multi-part questions should split
+into clean sub-queries (no list markers left), duplicate hits from different
+sources should collapse, every sub-query's best hit should come before anyone's
+second-best, the reduced context should stay within its character budget, and
+a checkpointed conversation should not carry one turn's hits into the next.
+"""
+
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.langgraphagenticai.graph.fanout_retrieval import FanOutRetrieval, split_question
+from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+from src.langgraphagenticai.tools import retrieval_sources
+
+
+def hit(content, source="web", rank=0, order=0, url=None):
+    return {"content": content, "source": source, "rank": rank, "order": order, "url": url, "sub_query": f"q{order}"}
+
+
+def test_split_question():
+    """Numbered and bulleted lists, question marks, semicolons and "and also" all split."""
+    assert split_question("1. pricing plans\n2. contact email\n3) machine list") == [
+        "pricing plans", "contact email", "machine list"]
+    assert split_question("- pricing plans\n* contact email") == ["pricing plans", "contact email"]
+    assert split_question("What are the pricing plans? Who do I email?") == [
+        "What are the pricing plans?", "Who do I email?"]
+    assert split_question("pricing plans; contact email and also the machine list") == [
+        "pricing plans", "contact email", "the machine list"]
+    assert split_question("Version 2.5 release notes") == ["Version 2.5 release notes"]
+    assert split_question("hi") == ["hi"]
+    assert len(split_question("a b?\nc d?\ne f?\ng h?\ni j?")) == 4
+
+
+def test_rank_dedups_and_interleaves():
+    """The same text from two sources is kept once; first-ranked hits of every sub-query lead."""
+    retrieval = FanOutRetrieval(sources={}, max_hits=10)
+    results = [
+        hit("Second pricing hit", rank=1, order=0),
+        hit("Pricing  plans start at $10", source="web", rank=0, order=0),
+        hit("pricing plans start at $10", source="himalaya", rank=0, order=0),
+        hit("Contact sales@example.com", source="wikipedia", rank=0, order=1),
+        hit("Second contact hit", rank=1, order=1),
+    ]
+    ranked = retrieval.rank(results)
+    print(f"Ranked: {[(h['source'], h['content']) for h in ranked]}")
+    assert [h["content"] for h in ranked] == [
+        "pricing plans start at $10", "Contact sales@example.com", "Second pricing hit", "Second contact hit"]
+    assert ranked[0]["source"] == "himalaya"
+    assert len(FanOutRetrieval(sources={}, max_hits=2).rank(results)) == 2
+
+
+def test_reduce_respects_budget():
+    """The context is cut at max_context_chars and numbers its sections with their origin."""
+    retrieval = FanOutRetrieval(sources={}, max_context_chars=150)
+    results = [hit("a" * 80, source="himalaya", order=0), hit("b" * 80, source="web", order=1, url="http://b.test"),
+               hit("c" * 80, source="arxiv", order=2)]
+    context = retrieval.reduce({"results": results})["context"]
+    print(f"Context ({len(context)} chars): {context!r}")
+    sections = context.split("\n\n")
+    assert len(context) == 150 and len(sections) == 2
+    assert sections[0] == "[1] (himalaya) " + "a" * 80
+    assert sections[1].startswith("[2] (web: http://b.test) b")
+    # No room for any of the third hit's text: it is dropped, not left as a bare header
+    tight = FanOutRetrieval(sources={}, max_context_chars=len(sections[0]) + 10).reduce({"results": results})
+    assert tight["context"] == sections[0]
+    assert retrieval.reduce({"results": []}) == {"context": ""}
+
+
+def test_hits_do_not_accumulate_across_turns():
+    """Each turn of a checkpointed research thread starts from its own hits only."""
+    saved = retrieval_sources.get_retrieval_sources
+    retrieval_sources.get_retrieval_sources = lambda: {
+        "himalaya": lambda query: [{"content": f"Answer about {query}", "source": "himalaya", "url": None}]}
+    try:
+        graph = GraphBuilder(StubChatModel()).setup_graph("Multi-Source Research", checkpointer=InMemorySaver())
+    finally:
+        retrieval_sources.get_retrieval_sources = saved
+    config = {"configurable": {"thread_id": "research-turns"}}
+    for turn in range(1, 3):
+        graph.invoke({"messages": [("user", f"pricing plans for turn {turn}")]}, config)
+        values = graph.get_state(config).values
+        print(f"Turn {turn}: {len(values.get('results', []))} stored hits; context: {values['context']!r}")
+        assert not values.get("results") and f"turn {turn}" in values["context"]
+        assert len(values["messages"]) == 2 * turn
+
+
+if __name__ == "__main__":
+    test_split_question()
+    test_rank_dedups_and_interleaves()
+    test_reduce_respects_budget()
+    test_hits_do_not_accumulate_across_turns()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the deterministic intent pre-router. Only questions that name the company
+and ask about one knowledge-base topic should skip the tool-decision call;
+off-topic questions that merely contain a keyword-like word must go to the
+chatbot. The router's counters should be exported with the metrics.
+"""
+
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.messages import HumanMessage
+
+from src.langgraphagenticai.nodes.intent_router_node import IntentRouterNode, RouterStats
+from src.langgraphagenticai.tools.intents import classify_intents, mentions_company
+from src.langgraphagenticai.utils.metrics import metrics
+
+ROUTED = [
+    "What machines does Himalaya Enterprises have?",
+    "Show the calibration report number list for Himalaya Enterprises",
+    "What is the latest LinkedIn post of HimalayaEntp?",
+]
+
+NOT_ROUTED = [
+    "Can you arrange a meeting?",
+    "Why is the sky orange at sunset?",
+    "Tell me a strange fact about octopuses",
+    "What is the highest peak in the Himalaya range?",
+    "Which machine learning courses are good?",
+    "Himalaya Enterprises machines and calibration due dates?",
+    "What is the news about Himalaya Enterprises today?",
+]
+
+
+def test_word_boundaries():
+    """Keywords match whole words only; "himalaya" alone is not the company."""
+    assert classify_intents("Can you arrange a meeting?") == set()
+    assert classify_intents("sky orange at sunset") == set()
+    assert classify_intents("list the machines") == {"machines"}
+    assert not mentions_company("highest peak in the Himalaya range")
+    assert mentions_company("who founded himalaya enterprises")
+
+
+def test_routing_decisions():
+    """Company plus one intent is routed; everything else falls through."""
+    for text in ROUTED:
+        print(f"routed:     {text}")
+        assert IntentRouterNode.is_unambiguous(text), text
+    for text in NOT_ROUTED:
+        print(f"not routed: {text}")
+        assert not IntentRouterNode.is_unambiguous(text), text
+
+
+def test_stats_exported():
+    """Routed and fall-through turns are counted and reach /metrics."""
+    stats = RouterStats()
+    node = IntentRouterNode(stats=stats)
+    routed = node.process({"messages": [HumanMessage(content=ROUTED[0], id="m-1")]})
+    skipped = node.process({"messages": [HumanMessage(content=NOT_ROUTED[0], id="m-2")]})
+    assert routed["messages"][0].tool_calls[0]["args"] == {"query": ROUTED[0]}
+    assert skipped == {}
+    assert stats.snapshot()["turns"] == 2 and stats.snapshot()["shortcut_rate"] == 0.5
+
+    assert "router" in metrics.snapshot()["components"]
+    text = metrics.to_prometheus()
+    print(text.splitlines()[-2:])
+    assert "chatbot_router_turns " in text and "chatbot_router_shortcut_rate " in text
+
+
+if __name__ == "__main__":
+    test_word_boundaries()
+    test_routing_decisions()
+    test_stats_exported()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the in-process metrics with the stub LLM and the offline Tavily stub.
+Graph nodes and tool calls should show up as latency histograms with
+percentiles, cache lookups as counters, and both export formats should be
+served by the HTTP server.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+import httpx
+from langchain_core.messages import AIMessage
+
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+from src.langgraphagenticai.nodes.parallel_tool_node import ParallelToolNode
+from src.langgraphagenticai.server import GraphRegistry, create_app
+from src.langgraphagenticai.tools.tavily_stub import StubTavilySearchResults
+from src.langgraphagenticai.tools.tool_cache import CachedTool, ToolCallCache
+from src.langgraphagenticai.utils.metrics import MetricsRegistry, metrics
+
+
+def test_histogram_percentiles_and_export():
+    """Percentiles come from the recent samples; buckets are cumulative in the text format."""
+    registry = MetricsRegistry()
+    for ms in range(1, 101):
+        registry.observe("node", "chatbot", ms / 1000)
+    registry.inc("cache_lookups", cache="response", result="hit")
+    summary = registry.snapshot()["latency_seconds"]["node"]["chatbot"]
+    text = registry.to_prometheus()
+    print(f"Summary: {summary}")
+    print(text.splitlines()[2])
+    assert summary["count"] == 100 and summary["p50"] == 0.051 and summary["p99"] == 0.1
+    assert 'chatbot_stage_latency_seconds_bucket{stage="node",name="chatbot",le="0.05"} 50' in text
+    assert 'chatbot_stage_latency_seconds_bucket{stage="node",name="chatbot",le="+Inf"} 100' in text
+    assert 'chatbot_cache_lookups_total{cache="response",result="hit"} 1' in text
+
+
+def test_tool_calls_and_cache_hits():
+    """Every tool call is timed and repeated calls count as tool cache hits."""
+    stub = StubTavilySearchResults(latency_seconds=0.05)
+    node = ParallelToolNode([CachedTool(stub, cache=ToolCallCache())])
+    call = {"name": stub.name, "args": {"query": "himalaya enterprises"}}
+    hits_before = metrics.counter("cache_lookups", cache="tool", name=stub.name, result="hit")
+    for turn in range(3):
+        node({"messages": [AIMessage(content="", tool_calls=[{**call, "id": f"call_{turn}"}])]})
+    tool = metrics.snapshot()["latency_seconds"]["tool"][stub.name]
+    hits = metrics.counter("cache_lookups", cache="tool", name=stub.name, result="hit") - hits_before
+    print(f"Tool latency: {tool}")
+    print(f"Tool cache hits: {hits}")
+    assert tool["count"] >= 3 and tool["max"] >= 0.05
+    assert hits == 2
+
+
+async def _server_endpoints():
+    registry = GraphRegistry(model_factory=lambda: StubChatModel(latency_seconds=0.02), usecases=["Basic Chatbot"])
+    transport = httpx.ASGITransport(app=create_app(registry))
+    async with httpx.AsyncClient(transport=transport, base_url="http://chat.test", timeout=30) as client:
+        for i in range(5):
+            await client.post("/chat", json={"message": f"question {i}", "thread_id": "metrics-1"})
+        text = await client.get("/metrics")
+        snapshot = (await client.get("/metrics.json")).json()
+    chatbot = snapshot["latency_seconds"]["node"]["chatbot"]
+    print(f"Content-Type: {text.headers['content-type']}")
+    print(f"Chatbot node: {chatbot}")
+    assert text.headers["content-type"].startswith("text/plain")
+    assert 'chatbot_stage_latency_seconds_count{stage="node",name="chatbot"}' in text.text
+    assert chatbot["count"] >= 5 and chatbot["p95"] >= 0.02
+
+
+def test_server_endpoints():
+    """/metrics and /metrics.json report the chatbot node of the turns just served."""
+    asyncio.run(_server_endpoints())
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles_and_export()
+    test_tool_calls_and_cache_hits()
+    test_server_endpoints()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test the Groq rate limiter offline. Async callers should queue in the same FIFO
+order as sync callers, a waiter that passes its deadline should leave the queue
+without blocking the callers behind it, a streamed call should return its
+unused token reservation once the final chunk reports the real usage, and
+failed attempts should give their whole reservation back.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+from src.langgraphagenticai.LLMS.rate_limiter import GroqRateLimiter, RateLimitTimeout
+from src.langgraphagenticai.LLMS.resilient_llm import CircuitBreaker, ResilientChatModel, RetryPolicy
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+
+MODEL = "test-model"
+
+
+def drained_limiter(tpm: int = 6000) -> GroqRateLimiter:
+    """Limiter whose token bucket starts empty, refilling at tpm / 60 tokens per second."""
+    limiter = GroqRateLimiter(budgets={MODEL: {"rpm": 6000, "tpm": tpm}})
+    limiter.acquire(MODEL, tpm)
+    return limiter
+
+
+async def _async_fifo():
+    limiter = drained_limiter()
+    served = []
+
+    async def caller(name, tokens):
+        await limiter.aacquire(MODEL, tokens, timeout=5)
+        served.append(name)
+
+    # The big request arrives first and must not be overtaken by the small ones
+    tasks = [asyncio.create_task(caller("big", 40))]
+    await asyncio.sleep(0.01)
+    tasks += [asyncio.create_task(caller(f"small-{i}", 5)) for i in range(3)]
+    await asyncio.gather(*tasks)
+    return served
+
+
+async def _deadline_leaves_queue():
+    limiter = drained_limiter()
+    head = asyncio.create_task(limiter.aacquire(MODEL, 60, timeout=5))
+    await asyncio.sleep(0.01)
+    started = time.monotonic()
+    try:
+        await limiter.aacquire(MODEL, 5, timeout=0.1)
+        raise AssertionError("expected RateLimitTimeout")
+    except RateLimitTimeout:
+        timed_out_after = time.monotonic() - started
+    await head
+    await limiter.aacquire(MODEL, 5, timeout=1)
+    return timed_out_after, limiter.stats
+
+
+def test_async_callers_served_in_arrival_order():
+    """A large async request at the head is served before smaller ones queued behind it."""
+    served = asyncio.run(_async_fifo())
+    print(f"Served: {served}")
+    assert served == ["big", "small-0", "small-1", "small-2"]
+
+
+def test_sync_and_async_share_the_queue():
+    """A sync caller queued behind an async head waits for it."""
+    limiter = drained_limiter()
+    served = []
+
+    async def async_head():
+        await limiter.aacquire(MODEL, 40, timeout=5)
+        served.append("async")
+
+    def sync_caller():
+        time.sleep(0.05)
+        limiter.acquire(MODEL, 1, timeout=5)
+        served.append("sync")
+
+    thread = threading.Thread(target=sync_caller)
+    thread.start()
+    asyncio.run(async_head())
+    thread.join()
+    assert served == ["async", "sync"]
+
+
+def test_deadline_leaves_queue():
+    """A waiter rejected at its deadline frees its place for later callers."""
+    timed_out_after, stats = asyncio.run(_deadline_leaves_queue())
+    print(f"Rejected after {timed_out_after:.2f}s; stats: {stats}")
+    assert timed_out_after < 0.5
+    assert stats["rejected"] == 1 and stats["granted"] == 3
+
+
+def test_stream_settles_reservation():
+    """A streamed call gives back what it reserved beyond the reported usage."""
+    limiter = GroqRateLimiter(budgets={"stub": {"rpm": 100, "tpm": 100000}})
+    model = ResilientChatModel(inner=StubChatModel(), retry_policy=RetryPolicy(max_attempts=1),
+                               breaker=CircuitBreaker("stub-stream"), request_limiter=limiter)
+    chunks = list(model.stream("hello there"))
+    usage = sum((chunk.usage_metadata or {}).get("total_tokens", 0) for chunk in chunks)
+    left = limiter._buckets._state["stub:tokens"]["tokens"]
+    print(f"Streamed {len(chunks)} chunks using {usage} tokens; bucket left: {left:.0f}")
+    assert usage and abs(100000 - usage - left) < 5
+
+
+class UnavailableModel(GenericFakeChatModel):
+    def _generate(self, *args, **kwargs):
+        raise RuntimeError("Error code: 503 - Service unavailable")
+
+
+def test_failed_attempts_refund_reservation():
+    """Retried 503s do not drain the token bucket the other callers share."""
+    limiter = GroqRateLimiter(budgets={"flaky": {"rpm": 100, "tpm": 100000}})
+    model = ResilientChatModel(inner=UnavailableModel(messages=iter([])), breaker=CircuitBreaker("flaky"),
+                               retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001), request_limiter=limiter)
+    try:
+        model.invoke("hello there " * 200)
+        raise AssertionError("expected the 503 to propagate")
+    except RuntimeError:
+        pass
+    left = limiter._buckets._state["flaky:tokens"]["tokens"]
+    print(f"Bucket after three failed attempts: {left:.0f}")
+    assert abs(100000 - left) < 5
+
+
+if __name__ == "__main__":
+    test_async_callers_served_in_arrival_order()
+    test_sync_and_async_share_the_queue()
+    test_deadline_leaves_queue()
+    test_stream_settles_reservation()
+    test_failed_attempts_refund_reservation()
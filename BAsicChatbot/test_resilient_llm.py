@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test the invocation-level retries and circuit breaker offline.
+Client errors (bad key, bad request) should not open the circuit for other
+callers, a half-open circuit should let exactly one probe through, and a probe
+that never reaches the service (queue timeout, cancellation) should free its slot.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.langgraphagenticai.LLMS.rate_limiter import GroqRateLimiter, RateLimitTimeout
+from src.langgraphagenticai.LLMS.resilient_llm import (CircuitBreaker, CircuitOpenError, ResilientChatModel,
+                                                       RetryPolicy)
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+
+
+class FailingModel(GenericFakeChatModel):
+    status_code: int = 401
+
+    def _generate(self, *args, **kwargs):
+        raise APIStatusError(self.status_code)
+
+
+def test_client_errors_leave_circuit_closed():
+    """Ten 401s from one user's key do not open the model's circuit for a healthy key."""
+    breaker = CircuitBreaker("shared-model", failure_threshold=3)
+    bad_key = ResilientChatModel(inner=FailingModel(messages=iter([])), retry_policy=RetryPolicy(max_attempts=1),
+                                 breaker=breaker)
+    for _ in range(10):
+        try:
+            bad_key.invoke("hi")
+            raise AssertionError("expected APIStatusError")
+        except APIStatusError:
+            pass
+    good_key = ResilientChatModel(inner=GenericFakeChatModel(messages=iter([AIMessage(content="hello")])),
+                                  retry_policy=RetryPolicy(max_attempts=1), breaker=breaker)
+    print(f"Breaker after client errors: {breaker.snapshot()}")
+    assert breaker.state == "closed"
+    assert good_key.invoke("hi").content == "hello"
+
+
+def test_server_errors_open_circuit():
+    """Consecutive 5xx errors open the circuit and later calls fail fast."""
+    breaker = CircuitBreaker("flaky-model", failure_threshold=3, reset_timeout=60)
+    model = ResilientChatModel(inner=FailingModel(messages=iter([]), status_code=503),
+                               retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001), breaker=breaker)
+    try:
+        model.invoke("hi")
+        raise AssertionError("expected APIStatusError")
+    except APIStatusError:
+        pass
+    assert breaker.state == "open"
+    try:
+        model.invoke("hi")
+        raise AssertionError("expected CircuitOpenError")
+    except CircuitOpenError as e:
+        print(f"Failing fast: {e}")
+
+
+def test_half_open_admits_a_single_probe():
+    """After the reset timeout one caller probes; the others fail fast until it reports back."""
+    breaker = CircuitBreaker("probed-model", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    assert breaker.state == "half_open"
+    for _ in range(3):
+        try:
+            breaker.allow()
+            raise AssertionError("expected CircuitOpenError")
+        except CircuitOpenError as e:
+            rejected = str(e)
+    print(f"Second caller: {rejected}")
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+    breaker.allow()
+
+    # A probe that fails reopens the circuit; one that never reports back is replaced
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    breaker.allow()
+    time.sleep(0.06)
+    breaker.allow()
+
+
+def test_probe_slot_freed_without_a_call():
+    """A probe that times out in the rate limiter queue or is cancelled there does not hold the circuit."""
+    breaker = CircuitBreaker("queued-model", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    limiter = GroqRateLimiter(budgets={"queued-model": {"rpm": 6000, "tpm": 6000}}, default_timeout=0.05)
+    limiter.acquire("queued-model", 6000)
+    model = ResilientChatModel(inner=GenericFakeChatModel(messages=iter([AIMessage(content="back")])),
+                               retry_policy=RetryPolicy(max_attempts=1), breaker=breaker, request_limiter=limiter)
+    try:
+        model.invoke("hello there")
+        raise AssertionError("expected RateLimitTimeout")
+    except RateLimitTimeout:
+        pass
+    assert breaker.state == "half_open" and breaker.probe_started is None
+
+    async def cancelled_while_queued():
+        limiter.default_timeout = 5
+        task = asyncio.create_task(model.ainvoke("hello there"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    asyncio.run(cancelled_while_queued())
+    print(f"Breaker after queued probes: {breaker.snapshot()}")
+    assert breaker.probe_started is None
+    breaker.allow()
+
+
+if __name__ == "__main__":
+    test_client_errors_leave_circuit_closed()
+    test_server_errors_open_circuit()
+    test_half_open_admits_a_single_probe()
+    test_probe_slot_freed_without_a_call()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the persistent LLM response cache offline, on a temporary database.
+Keys should ignore whitespace but not the model, temperature or bound tools;
+entries should expire after the TTL; and a repeated prompt should be answered
+from the cache on the sync, async and streamed paths without calling the model.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.langgraphagenticai.LLMS.resilient_llm import CircuitBreaker, ResilientChatModel, RetryPolicy
+from src.langgraphagenticai.LLMS.response_cache import ResponseCache, bypass_response_cache, make_cache_key
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+
+
+class CountingStub(StubChatModel):
+    """Stub model that counts the calls reaching it."""
+    calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def temp_cache(**kwargs) -> ResponseCache:
+    return ResponseCache(path=os.path.join(tempfile.mkdtemp(), "responses.sqlite"), **kwargs)
+
+
+def cached_stub(cache: ResponseCache) -> ResilientChatModel:
+    return ResilientChatModel(inner=CountingStub(), retry_policy=RetryPolicy(max_attempts=1),
+                              breaker=CircuitBreaker("cache-stub"), response_cache=cache)
+
+
+def test_cache_keys():
+    """Whitespace does not change the key; the model, temperature and tools do."""
+    messages = [HumanMessage(content="What  machines\ndo you have?")]
+    key = make_cache_key("small", 0.0, None, messages)
+    assert key == make_cache_key("small", 0.0, None, [HumanMessage(content="What machines do you have?")])
+    assert key != make_cache_key("large", 0.0, None, messages)
+    assert key != make_cache_key("small", 0.7, None, messages)
+    assert key != make_cache_key("small", 0.0, {"tools": [{"name": "search"}]}, messages)
+    assert key != make_cache_key("small", 0.0, None, messages + [AIMessage(content="Ten."), HumanMessage(content="And?")])
+
+
+def test_entries_expire():
+    """An entry older than the TTL is a miss and is removed."""
+    cache = temp_cache(ttl_seconds=0.1)
+    cache.store("key", "small", AIMessage(content="cached"))
+    assert cache.lookup("key").content == "cached"
+    time.sleep(0.15)
+    assert cache.lookup("key") is None
+    print(f"Stats after expiry: {cache.stats()}")
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 0}
+
+
+def test_repeated_prompt_hits_cache():
+    """The second identical call on each path is served from the cache."""
+    cache = temp_cache()
+    model = cached_stub(cache)
+    first = model.invoke("hello")
+    second = model.invoke("hello")
+    assert second.content == first.content and second.response_metadata["cache_hit"]
+    assert asyncio.run(model.ainvoke("hello")).response_metadata["cache_hit"]
+    streamed = "".join(chunk.content for chunk in model.stream("hello"))
+    assert streamed == first.content and model.inner.calls == 1
+
+    async def astream():
+        return "".join([chunk.content async for chunk in model.astream("new question")])
+    assert asyncio.run(astream()) == asyncio.run(astream())
+    print(f"Model calls: {model.inner.calls}; cache: {cache.stats()}")
+    assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 2
+
+
+def test_bypass_skips_stored_entry():
+    """A call inside bypass_response_cache() reaches the model even though the prompt is cached."""
+    cache = temp_cache()
+    model = cached_stub(cache)
+    model.invoke("hello")
+    assert model.invoke("hello").response_metadata["cache_hit"] and model.inner.calls == 1
+    with bypass_response_cache():
+        bypassed = model.invoke("hello")
+        streamed = "".join(chunk.content for chunk in model.stream("hello"))
+    assert not bypassed.response_metadata.get("cache_hit") and streamed
+    print(f"Model calls: {model.inner.calls}; cache: {cache.stats()}")
+    assert model.inner.calls == 3 and cache.stats()["hits"] == 1 and cache.stats()["entries"] == 1
+    assert model.invoke("hello").response_metadata["cache_hit"]
+
+
+if __name__ == "__main__":
+    test_cache_keys()
+    test_entries_expire()
+    test_repeated_prompt_hits_cache()
+    test_bypass_skips_stored_entry()
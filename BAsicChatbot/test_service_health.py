@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test the cached Groq health poller and the health gate against a local stub
+status endpoint. A degraded status page, or a burst of failed calls, should make
+new requests fail fast without reaching the model; client errors (bad key,
+bad request) should not.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.langgraphagenticai.LLMS.resilient_llm import CircuitBreaker, ResilientChatModel, RetryPolicy
+from src.langgraphagenticai.LLMS.service_health import GroqHealthMonitor, ServiceDegradedError
+
+
+class StubStatusHandler(BaseHTTPRequestHandler):
+    """Serves a Statuspage-style status.json; set `indicator` to change it."""
+    indicator = "none"
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        descriptions = {"none": "All Systems Operational", "major": "Major System Outage"}
+        body = json.dumps({"status": {"indicator": self.indicator,
+                                      "description": descriptions.get(self.indicator, self.indicator)}})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_endpoint():
+    server = HTTPServer(("127.0.0.1", 0), StubStatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/v2/status.json"
+
+
+class CountingModel(GenericFakeChatModel):
+    calls: int = 0
+
+    def _generate(self, *args, **kwargs):
+        self.calls += 1
+        return super()._generate(*args, **kwargs)
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+
+
+class FailingModel(GenericFakeChatModel):
+    status_code: int = 401
+
+    def _generate(self, *args, **kwargs):
+        raise APIStatusError(self.status_code)
+
+
+def make_model(monitor, inner=None):
+    inner = inner or CountingModel(messages=iter([AIMessage(content="hello")] * 10))
+    return ResilientChatModel(inner=inner, retry_policy=RetryPolicy(max_attempts=1),
+                              breaker=CircuitBreaker("stub"), health=monitor)
+
+
+def test_status_is_cached_and_gates_requests():
+    """The UI reads a cached status; a major outage on the status page blocks new calls."""
+    server, url = start_stub_endpoint()
+    try:
+        StubStatusHandler.indicator = "none"
+        monitor = GroqHealthMonitor(status_url=url, poll_interval=0.1)
+        monitor.start()
+        time.sleep(0.3)
+        before = StubStatusHandler.requests
+        statuses = [monitor.status() for _ in range(100)]
+        print(f"Status: {statuses[0]['description']}, stub requests during 100 reads: "
+              f"{StubStatusHandler.requests - before}")
+        assert statuses[0]["is_operational"]
+        assert StubStatusHandler.requests - before <= 2
+
+        model = make_model(monitor)
+        assert model.invoke("hi").content == "hello"
+
+        StubStatusHandler.indicator = "major"
+        time.sleep(0.3)
+        started = time.perf_counter()
+        try:
+            model.invoke("hi")
+            raise AssertionError("expected ServiceDegradedError")
+        except ServiceDegradedError as e:
+            print(f"Rejected in {time.perf_counter() - started:.4f}s: {e}")
+        assert model.inner.calls == 1
+
+        StubStatusHandler.indicator = "none"
+        time.sleep(0.3)
+        assert model.invoke("hi").content == "hello"
+    finally:
+        server.shutdown()
+
+
+def test_error_rate_gates_requests():
+    """Most recent calls failing makes new calls fail fast, even with a healthy status page."""
+    server, url = start_stub_endpoint()
+    try:
+        StubStatusHandler.indicator = "none"
+        monitor = GroqHealthMonitor(status_url=url, poll_interval=0.1, min_samples=4, error_rate_threshold=0.5)
+        monitor.poll()
+        for _ in range(4):
+            monitor.record_result(False)
+        print(f"Snapshot: {monitor.snapshot()}")
+        try:
+            make_model(monitor).invoke("hi")
+            raise AssertionError("expected ServiceDegradedError")
+        except ServiceDegradedError as e:
+            print(f"Rejected: {e}")
+    finally:
+        server.shutdown()
+
+
+def test_client_errors_do_not_gate_requests():
+    """401s from one bad key and 400s from bad requests leave the gate open for everyone else."""
+    server, url = start_stub_endpoint()
+    try:
+        StubStatusHandler.indicator = "none"
+        monitor = GroqHealthMonitor(status_url=url, poll_interval=0.1, min_samples=4, error_rate_threshold=0.5)
+        monitor.poll()
+        for status_code in (401, 401, 401, 403, 400, 400):
+            try:
+                make_model(monitor, FailingModel(messages=iter([]), status_code=status_code)).invoke("hi")
+                raise AssertionError("expected APIStatusError")
+            except APIStatusError:
+                pass
+        print(f"Snapshot after client errors: {monitor.snapshot()}")
+        assert monitor.degraded() is None
+        assert make_model(monitor).invoke("hi").content == "hello"
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_status_is_cached_and_gates_requests()
+    test_error_rate_gates_requests()
+    test_client_errors_do_not_gate_requests()
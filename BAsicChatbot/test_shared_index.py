@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the memory-mapped Himalaya index offline, with bag-of-words embeddings
+instead of OpenAI. An exported Chroma collection should rank the same chunks,
+web results should go into the per-process overlay and expire from it, and a
+forked worker should search the shared matrix and write through its own SQLite
+connections.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.langgraphagenticai.tools.shared_index import SharedEmbeddingIndex
+from src.langgraphagenticai.utils.usage_ledger import UsageLedger
+
+VOCABULARY = ["calibration", "machine", "laser", "pressure", "gauge", "contact", "email", "pricing", "weather"]
+
+CHUNKS = [
+    Document(page_content="Laser calibration machine for pressure gauge labs", metadata={"source": "machines"}),
+    Document(page_content="Contact email for sales and support", metadata={"source": "contact"}),
+    Document(page_content="Pricing of calibration services", metadata={"source": "pricing"}),
+]
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Counts vocabulary words; enough to make cosine similarity meaningful."""
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        words = text.lower().split()
+        return [float(words.count(word)) + 0.01 for word in VOCABULARY]
+
+
+class ledger_off:
+    """Keeps the embedding usage of these tests out of the real usage ledger."""
+    def __enter__(self):
+        self.saved = os.environ.get("USAGE_LEDGER")
+        os.environ["USAGE_LEDGER"] = "false"
+
+    def __exit__(self, *exc):
+        if self.saved is None:
+            os.environ.pop("USAGE_LEDGER", None)
+        else:
+            os.environ["USAGE_LEDGER"] = self.saved
+
+
+def export_index(directory) -> SharedEmbeddingIndex:
+    from langchain_community.vectorstores import Chroma
+    vectorstore = Chroma.from_documents(documents=CHUNKS, embedding=BagOfWordsEmbeddings(),
+                                        collection_name=f"shared-index-{uuid.uuid4().hex[:8]}")
+    return SharedEmbeddingIndex.export_chroma(vectorstore, directory=directory, embeddings_factory=BagOfWordsEmbeddings)
+
+
+def test_export_and_search():
+    """The exported index is memory-mapped and ranks the best matching chunk first."""
+    with ledger_off(), tempfile.TemporaryDirectory() as directory:
+        index = export_index(directory)
+        results = index.as_retriever(search_kwargs={"k": 2}).invoke("laser calibration machine")
+        print(f"Matrix: {index.matrix.shape} {type(index.matrix).__name__}; top hit: {results[0].metadata}")
+        assert index.matrix.shape == (3, len(VOCABULARY))
+        assert results[0].metadata["source"] == "machines" and len(results) == 2
+        assert index.similarity_search("contact email", k=1)[0].metadata["source"] == "contact"
+        index.close()
+        assert not os.listdir(directory)
+
+
+def test_overlay_and_expiry():
+    """Web results join the search through the overlay and drop out once expired."""
+    with ledger_off(), tempfile.TemporaryDirectory() as directory:
+        index = export_index(directory)
+        web = Document(page_content="weather weather weather", metadata={"type": "web_cache", "expires_at": time.time() + 0.1})
+        index.add_documents([web], ids=["web-1"])
+        assert index.similarity_search("weather", k=1)[0].page_content == web.page_content
+        time.sleep(0.15)
+        index.purge_expired()
+        assert index.similarity_search("weather", k=1)[0].page_content != web.page_content
+        index.close()
+
+
+def test_forked_worker_uses_own_connections():
+    """A forked child searches the shared matrix and writes through its own ledger connection."""
+    if not hasattr(os, "fork"):
+        return
+    with ledger_off(), tempfile.TemporaryDirectory() as directory:
+        index = export_index(directory)
+        ledger = UsageLedger(path=os.path.join(directory, "usage.sqlite"))
+        parent_connection = ledger._conn
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                top = index.similarity_search("pricing", k=1)[0].metadata["source"]
+                ledger.record("embedding", model="bag-of-words", embedding_tokens=3, context={"thread_id": "child"})
+                ledger.flush()
+                own = ledger._conn is not parent_connection
+                os.write(write_end, f"{top} {own}".encode())
+                code = 0
+            finally:
+                os._exit(code)
+        os.close(write_end)
+        _, status = os.waitpid(pid, 0)
+        reply = os.read(read_end, 100).decode()
+        os.close(read_end)
+        print(f"Child replied: {reply!r}")
+        assert status == 0 and reply == "pricing True"
+        assert ledger.thread_usage("child")["embedding_tokens"] == 3
+        index.close()
+
+
+if __name__ == "__main__":
+    test_export_and_search()
+    test_overlay_and_expiry()
+    test_forked_worker_uses_own_connections()
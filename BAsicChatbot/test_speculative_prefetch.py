@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test speculative retrieval prefetch offline, with a counting stand-in for the
+Himalaya search tool. A tool call with the prefetched query should take the
+prefetched result; a call with a different query should run the tool itself.
+The prefetch counters should be exported with the metrics.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from src.langgraphagenticai.nodes.parallel_tool_node import ParallelToolNode
+from src.langgraphagenticai.nodes.speculative_prefetch import PrefetchStats, SpeculativePrefetcher
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.usage_ledger import UsageLedger
+
+QUESTION = "What machines does Himalaya Enterprises have?"
+searched = []
+searched_lock = threading.Lock()
+
+
+@tool("himalaya_enterprises_search")
+def counting_search(query: str) -> str:
+    """Stand-in for the Himalaya knowledge-base search."""
+    with searched_lock:
+        searched.append(query)
+    return f"results for {query}"
+
+
+def run_turn(call_query: str):
+    stats = PrefetchStats()
+    prefetcher = SpeculativePrefetcher([counting_search], stats=stats)
+    ledger = UsageLedger(path=os.path.join(tempfile.mkdtemp(), "usage.sqlite"))
+    node = ParallelToolNode([counting_search], prefetcher=prefetcher, usage_ledger=ledger)
+    human = HumanMessage(content=QUESTION, id="turn-1")
+    prefetcher.start(human.id, human.content)
+    call = {"name": "himalaya_enterprises_search", "args": {"query": call_query}, "id": "call-1"}
+    update = node({"messages": [human, AIMessage(content="", tool_calls=[call])]})
+    prefetcher.discard_turn(human.id)
+    return update["messages"][0].content, stats.snapshot()
+
+
+def test_matching_query_takes_prefetch():
+    """The model asking for the user's own question (modulo case and punctuation) uses the prefetch."""
+    content, stats = run_turn("  what machines does himalaya enterprises HAVE ")
+    print(f"Matching call: {content!r}; stats: {stats}")
+    assert content == f"results for {QUESTION}"
+    assert stats["used"] == {"himalaya_enterprises_search": 1} and not stats["wasted"]
+
+
+def test_other_query_runs_tool():
+    """A rephrased query runs the tool with that query; the prefetch is wasted, not misused."""
+    content, stats = run_turn("Himalaya Enterprises calibration instruments")
+    print(f"Other call: {content!r}; stats: {stats}")
+    assert content == "results for Himalaya Enterprises calibration instruments"
+    assert "Himalaya Enterprises calibration instruments" in searched
+    assert stats["mismatched"] == {"himalaya_enterprises_search": 1}
+    assert stats["wasted"] == {"himalaya_enterprises_search": 1} and not stats["used"]
+
+
+def test_stats_exported():
+    """The process-wide prefetch counters reach /metrics."""
+    assert "prefetch" in metrics.snapshot()["components"]
+    assert "chatbot_prefetch_use_rate " in metrics.to_prometheus()
+
+
+if __name__ == "__main__":
+    test_matching_query_takes_prefetch()
+    test_other_query_runs_tool()
+    test_stats_exported()
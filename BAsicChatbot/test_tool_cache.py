@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the memoizing tool-call cache with the offline Tavily stub.
+Repeated searches should be served from the cache without calling the tool
+again, and entries should expire after the tool's TTL.
+"""
+
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from src.langgraphagenticai.tools.tavily_stub import StubTavilySearchResults
+from src.langgraphagenticai.tools.tool_cache import CachedTool, ToolCallCache
+
+
+def test_repeated_search_is_cached():
+    """A repeated query (modulo whitespace) is answered from the cache."""
+    stub = StubTavilySearchResults(latency_seconds=0.2)
+    cache = ToolCallCache()
+    search = CachedTool(stub, cache=cache)
+
+    queries = ["latest CNC machine news", "latest  CNC machine news ", "latest CNC machine news"]
+    for query in queries:
+        started = time.perf_counter()
+        result = search.invoke({"query": query})
+        print(f"Query: {query!r} -> {len(result)} results in {time.perf_counter() - started:.3f}s")
+
+    print(f"Stub calls: {stub.calls}")
+    print(f"Cache stats: {cache.stats()}")
+    assert stub.calls == 1
+    assert cache.stats()[stub.name]["hits"] == 2
+
+
+def test_tool_call_keeps_artifact():
+    """Invoked as a tool call, a cached hit still returns the content and artifact."""
+    stub = StubTavilySearchResults()
+    search = CachedTool(stub, cache=ToolCallCache())
+    call = {"name": stub.name, "args": {"query": "himalaya enterprises"}, "id": "call_1", "type": "tool_call"}
+    first = search.invoke(call)
+    second = search.invoke({**call, "id": "call_2"})
+    print(f"First: {first.content[:60]}... artifact keys: {sorted(first.artifact)}")
+    print(f"Second tool_call_id: {second.tool_call_id}, same content: {first.content == second.content}")
+    assert stub.calls == 1
+    assert second.tool_call_id == "call_2" and second.artifact == first.artifact
+
+
+def test_entries_expire():
+    """Entries older than the tool's TTL are fetched again."""
+    stub = StubTavilySearchResults()
+    search = CachedTool(stub, cache=ToolCallCache(limits={stub.name: (0.1, 10)}))
+    search.invoke({"query": "weather in Pune"})
+    time.sleep(0.15)
+    search.invoke({"query": "weather in Pune"})
+    print(f"Stub calls after expiry: {stub.calls}")
+    assert stub.calls == 2
+
+
+if __name__ == "__main__":
+    test_repeated_search_is_cached()
+    test_tool_call_keeps_artifact()
+    test_entries_expire()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test tool-output compaction offline. Within one turn, a tool result the model
+has already been called with should be replaced by a stub before the next
+round, while the latest round's results stay in full; the payload should stay
+retrievable from the side store.
+"""
+
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+from src.langgraphagenticai.nodes.chatbot_with_Tool_node import ChatbotWithToolNode
+from src.langgraphagenticai.state.tool_compaction import ToolOutputCompactor, ToolOutputStore
+from src.langgraphagenticai.tools.tavily_stub import StubTavilySearchResults
+
+FIRST_RESULT = "first search result " * 50
+SECOND_RESULT = "second search result " * 50
+
+
+class RecordingModel(StubChatModel):
+    """Stub model that keeps the messages of every call."""
+    calls: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(list(messages))
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def tool_round(call_id: str, name: str, result: str):
+    request = AIMessage(content="", id=f"ai-{call_id}",
+                        tool_calls=[{"name": name, "args": {"query": call_id}, "id": call_id}])
+    return [request, ToolMessage(content=result, id=f"tool-{call_id}", name=name, tool_call_id=call_id)]
+
+
+def two_round_turn():
+    return ([HumanMessage(content="compare both", id="human-1")]
+            + tool_round("call-1", "tavily_search_results_json", FIRST_RESULT)
+            + tool_round("call-2", "tavily_search_results_json", SECOND_RESULT))
+
+
+def test_earlier_rounds_compacted_within_turn():
+    """Before the second round's model call, only the first round's result is stubbed."""
+    store = ToolOutputStore()
+    compactor = ToolOutputCompactor(store=store)
+    messages = two_round_turn()
+    replacements = compactor.compact(messages)
+    print(f"Compacted: {[message.id for message in replacements]}")
+    assert [message.id for message in replacements] == ["tool-call-1"]
+    ref = replacements[0].additional_kwargs["compacted_ref"]
+    assert store.get(ref) == FIRST_RESULT
+    applied = compactor.apply(messages, replacements)
+    assert applied[-1].content == SECOND_RESULT and len(applied[2].content) < len(FIRST_RESULT)
+    assert compactor.compact(applied) == []
+
+
+def test_latest_round_compacted_after_answer():
+    """Once the model has answered, the last round is stubbed on the next call."""
+    compactor = ToolOutputCompactor(store=ToolOutputStore())
+    messages = two_round_turn() + [AIMessage(content="Both are similar.", id="ai-answer"),
+                                   HumanMessage(content="thanks", id="human-2")]
+    assert [message.id for message in compactor.compact(messages)] == ["tool-call-1", "tool-call-2"]
+
+
+def test_node_sends_compacted_history():
+    """The chatbot node calls the model with stubs and writes them back to the state."""
+    model = RecordingModel(calls=[])
+    node = ChatbotWithToolNode(model, compactor=ToolOutputCompactor(store=ToolOutputStore()))
+    chatbot = node.create_chatbot([StubTavilySearchResults()])
+    update = chatbot.invoke({"messages": two_round_turn()})
+    sent = model.calls[-1]
+    assert sent[2].content != FIRST_RESULT and sent[-1].content == SECOND_RESULT
+    assert update["messages"][0].id == "tool-call-1" and isinstance(update["messages"][-1], AIMessage)
+
+
+if __name__ == "__main__":
+    test_earlier_rounds_compacted_within_turn()
+    test_latest_round_compacted_after_answer()
+    test_node_sends_compacted_history()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test the tracing policy offline.
+With tracing off the wrapper should cost next to nothing; with tracing on,
+unsampled calls should create no run (nor their children), a component rate
+should drop that component's subtree, a graph turn streamed through the sync
+bridge should keep its sampling decision for every event, a backed-up export
+queue should drop runs instead of queueing them, and large payloads should be
+cut down.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessageChunk
+from langsmith import get_current_run_tree, schemas, tracing_context
+
+from src.langgraphagenticai.graph.graph_runner import GraphRunner
+from src.langgraphagenticai.utils import tracing
+from src.langgraphagenticai.utils.metrics import metrics
+from src.langgraphagenticai.utils.tracing import traced, truncate_payload
+
+
+def current_run():
+    run = get_current_run_tree()
+    return run.name if run is not None else None
+
+
+@traced(name="test_child", component="tools")
+def child():
+    return current_run()
+
+
+@traced(name="test_root", component="app")
+def root():
+    return current_run(), child()
+
+
+def plain():
+    return None
+
+
+wrapped = traced(name="test_plain")(plain)
+
+
+class tracing_on:
+    """Tracing switched on, exporting through a client that drops every run (nothing leaves the process)."""
+    def __init__(self, sample_rate=1.0, component_rates=None):
+        self.policy = tracing.TracingPolicy(sample_rate=sample_rate, component_rates=component_rates)
+        self.client = tracing._bounded_client_class()(max_pending=0, api_key="test", api_url="http://127.0.0.1:9",
+                                                      info=schemas.LangSmithInfo())
+
+    def __enter__(self):
+        self.saved = tracing.policy, os.environ.get("LANGCHAIN_TRACING_V2")
+        tracing.policy = self.policy
+        os.environ["LANGCHAIN_TRACING_V2"] = "true"
+        self.policy.refresh()
+        self.context = tracing_context(client=self.client, enabled=True)
+        self.context.__enter__()
+        return self.client
+
+    def __exit__(self, *exc):
+        self.context.__exit__(*exc)
+        tracing.policy = self.saved[0]
+        if self.saved[1] is None:
+            os.environ.pop("LANGCHAIN_TRACING_V2", None)
+        else:
+            os.environ["LANGCHAIN_TRACING_V2"] = self.saved[1]
+        tracing.policy.refresh()
+
+
+def test_disabled_wrapper_overhead():
+    """With tracing off, a traced call costs a few microseconds at most."""
+    os.environ.pop("LANGCHAIN_TRACING_V2", None)
+    tracing.policy.refresh()
+    calls = 100000
+    started = time.perf_counter()
+    for _ in range(calls):
+        plain()
+    raw = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(calls):
+        wrapped()
+    overhead = (time.perf_counter() - started - raw) / calls
+    print(f"Overhead per call with tracing off: {overhead * 1e6:.2f}us")
+    assert overhead < 5e-6
+    assert root() == (None, None)
+
+
+def test_sampling_follows_the_root():
+    """Unsampled roots trace nothing beneath them; sampled roots trace their children."""
+    with tracing_on(sample_rate=0.0):
+        unsampled_before = metrics.counter("traces", component="app", sampled="false")
+        assert root() == (None, None)
+        assert metrics.counter("traces", component="app", sampled="false") == unsampled_before + 1
+    with tracing_on(sample_rate=1.0) as client:
+        assert root() == ("test_root", "test_child")
+        print(f"Runs dropped by the full export queue: {client.dropped}")
+        assert client.dropped >= 2
+
+
+def test_component_rate_drops_subtree():
+    """A component sampled at 0 is left out of an otherwise sampled trace (no run of its own)."""
+    with tracing_on(sample_rate=1.0, component_rates={"tools": 0.0}):
+        assert root() == ("test_root", "test_root")
+
+
+class RecordingGraph:
+    """Streams a few tokens and records the sampling decision seen at each one."""
+    def __init__(self):
+        self.decisions = []
+        self.closed = False
+
+    async def astream(self, graph_input, config, stream_mode=None):
+        try:
+            for index in range(3):
+                self.decisions.append(tracing._sampled.get())
+                await asyncio.sleep(0)
+                yield "messages", (AIMessageChunk(content=f"token{index} ", id="answer"), {})
+        finally:
+            self.closed = True
+
+
+def test_streamed_turn_keeps_sampling_decision():
+    """Every event of a turn streamed through the background loop runs under the turn's decision."""
+    with tracing_on(sample_rate=0.0):
+        graph = RecordingGraph()
+        events = list(GraphRunner(graph).stream_turn("hello", "trace-thread"))
+        print(f"Decisions per event: {graph.decisions}")
+        assert graph.decisions == [False, False, False]
+        assert events[-1]["type"] == "done" and events[-1]["content"] == "token0 token1 token2 "
+
+        early = GraphRunner(RecordingGraph())
+        stream = early.stream_turn("hello", "trace-thread-early")
+        assert next(stream)["type"] == "token"
+        stream.close()
+        assert early.graph.closed
+
+
+def test_payload_truncation():
+    """Long strings, documents and lists are cut before export."""
+    payload = {
+        "context": "x" * 5000,
+        "documents": [Document(page_content="y" * 5000)] * 30,
+    }
+    cut = truncate_payload(payload, max_chars=100)
+    print(f"Context: {cut['context'][-30:]!r}; documents kept: {len(cut['documents']) - 1}")
+    assert cut["context"].startswith("x" * 100) and cut["context"].endswith("[4900 chars truncated]")
+    assert len(cut["documents"]) == 21 and cut["documents"][-1] == "... [10 items truncated]"
+    assert len(cut["documents"][0].page_content) < 200
+    assert len(payload["context"]) == 5000
+
+
+if __name__ == "__main__":
+    test_disabled_wrapper_overhead()
+    test_sampling_follows_the_root()
+    test_component_rate_drops_subtree()
+    test_streamed_turn_keeps_sampling_decision()
+    test_payload_truncation()
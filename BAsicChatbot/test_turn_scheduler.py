@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the turn scheduler offline. Short turns should start before tool-heavy
+ones unless those have aged, a thread should have one turn in flight at a time,
+a turn that cannot start before its deadline (or finds the queue full) should
+be rejected, and a waiter whose caller goes away should leave the queue and be
+counted as cancelled, not rejected.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from src.langgraphagenticai.graph.turn_scheduler import AdmissionRejected, TurnScheduler
+
+
+async def hold(scheduler, user, release: asyncio.Event, usecase="Basic Chatbot"):
+    async with scheduler.aadmit(user, usecase):
+        await release.wait()
+
+
+async def turn(scheduler, user, usecase, started: list, timeout=None):
+    async with scheduler.aadmit(user, usecase, timeout=timeout):
+        started.append(user)
+
+
+async def _priority_order(aging_seconds: float, wait_before_release: float):
+    scheduler = TurnScheduler(max_concurrent=1, aging_seconds=aging_seconds)
+    release, started = asyncio.Event(), []
+    holder = asyncio.create_task(hold(scheduler, "holder", release))
+    await asyncio.sleep(0)
+    tools = asyncio.create_task(turn(scheduler, "tools-user", "Chatbot With Web", started))
+    await asyncio.sleep(0)
+    short = asyncio.create_task(turn(scheduler, "short-user", "Basic Chatbot", started))
+    await asyncio.sleep(wait_before_release)
+    release.set()
+    await asyncio.gather(holder, tools, short)
+    return started
+
+
+async def _one_turn_per_thread():
+    scheduler = TurnScheduler(max_concurrent=4)
+    release, started = asyncio.Event(), []
+    holder = asyncio.create_task(hold(scheduler, "same-thread", release))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(turn(scheduler, "same-thread", "Basic Chatbot", started))
+    other = asyncio.create_task(turn(scheduler, "other-thread", "Basic Chatbot", started))
+    await asyncio.sleep(0.05)
+    before_release = list(started)
+    release.set()
+    await asyncio.gather(holder, second, other)
+    return before_release, started
+
+
+async def _rejections():
+    scheduler = TurnScheduler(max_concurrent=1, max_queue_depth=1)
+    release, started = asyncio.Event(), []
+    holder = asyncio.create_task(hold(scheduler, "holder", release))
+    await asyncio.sleep(0)
+    errors = []
+    try:
+        await turn(scheduler, "late", "Basic Chatbot", started, timeout=0.05)
+    except AdmissionRejected as e:
+        errors.append(e)
+    queued = asyncio.create_task(turn(scheduler, "queued", "Basic Chatbot", started))
+    await asyncio.sleep(0)
+    try:
+        await turn(scheduler, "overflow", "Basic Chatbot", started)
+    except AdmissionRejected as e:
+        errors.append(e)
+    release.set()
+    await asyncio.gather(holder, queued)
+    return errors, started, scheduler.snapshot()
+
+
+async def _cancelled_waiter():
+    scheduler = TurnScheduler(max_concurrent=1)
+    release, started = asyncio.Event(), []
+    holder = asyncio.create_task(hold(scheduler, "holder", release))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(turn(scheduler, "gone", "Basic Chatbot", started))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    release.set()
+    await holder
+    await turn(scheduler, "next", "Basic Chatbot", started)
+    return started, scheduler.snapshot()
+
+
+def test_short_turns_first_unless_aged():
+    """A queued short turn overtakes a tool-heavy one, but not once that one has aged."""
+    assert asyncio.run(_priority_order(aging_seconds=5.0, wait_before_release=0.01)) == ["short-user", "tools-user"]
+    assert asyncio.run(_priority_order(aging_seconds=0.02, wait_before_release=0.05)) == ["tools-user", "short-user"]
+
+
+def test_one_turn_in_flight_per_thread():
+    """A thread's second turn waits for its first; another thread starts right away."""
+    before_release, started = asyncio.run(_one_turn_per_thread())
+    print(f"Started before release: {before_release}; after: {started}")
+    assert before_release == ["other-thread"]
+    assert started == ["other-thread", "same-thread"]
+
+
+def test_deadline_and_full_queue_rejections():
+    """A turn past its deadline and a turn finding the queue full are both rejected."""
+    errors, started, snapshot = asyncio.run(_rejections())
+    print(f"Rejections: {[str(e) for e in errors]}; snapshot: {snapshot['rejected']}")
+    assert len(errors) == 2 and all(e.retry_after > 0 for e in errors)
+    assert snapshot["rejected"] == {"deadline": 1, "queue_full": 1}
+    assert started == ["queued"] and snapshot["in_flight"] == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    """A cancelled waiter is counted as cancelled and frees its place."""
+    started, snapshot = asyncio.run(_cancelled_waiter())
+    print(f"Snapshot after cancel: {snapshot}")
+    assert snapshot["cancelled"] == 1 and snapshot["rejected"] == {}
+    assert started == ["next"]
+    assert snapshot["in_flight"] == 0 and snapshot["queue_depth"] == 0
+
+
+if __name__ == "__main__":
+    test_short_turns_first_unless_aged()
+    test_one_turn_in_flight_per_thread()
+    test_deadline_and_full_queue_rejections()
+    test_cancelled_waiter_leaves_queue()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the usage ledger offline with the stub LLM and the offline Tavily stub.
+Model calls should be recorded with their reported tokens against the
+conversation, use case and node they ran in, tool calls with the estimated
+tokens of their output, the daily rollups should outlive purged calls, and
+calls still buffered when the process exits should reach the database.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+import httpx
+from langchain_core.messages import AIMessage
+
+from src.langgraphagenticai.LLMS.resilient_llm import CircuitBreaker, ResilientChatModel, RetryPolicy
+from src.langgraphagenticai.LLMS.stub_llm import StubChatModel
+from src.langgraphagenticai.nodes.parallel_tool_node import ParallelToolNode
+from src.langgraphagenticai.server import GraphRegistry, create_app
+from src.langgraphagenticai.tools.tavily_stub import StubTavilySearchResults
+from src.langgraphagenticai.utils import usage_ledger as usage_ledger_module
+from src.langgraphagenticai.utils.usage_ledger import UsageLedger
+
+
+def temp_ledger(**kwargs) -> UsageLedger:
+    return UsageLedger(path=os.path.join(tempfile.mkdtemp(), "usage.sqlite"), **kwargs)
+
+
+class using_ledger:
+    """Points get_usage_ledger(), and so the server's /usage, at a temporary ledger."""
+    def __init__(self, ledger: UsageLedger):
+        self.ledger = ledger
+
+    def __enter__(self):
+        self.saved = usage_ledger_module._usage_ledger
+        usage_ledger_module._usage_ledger = self.ledger
+        return self.ledger
+
+    def __exit__(self, *exc):
+        usage_ledger_module._usage_ledger = self.saved
+
+
+def metered_stub(ledger: UsageLedger):
+    return ResilientChatModel(inner=StubChatModel(), retry_policy=RetryPolicy(), breaker=CircuitBreaker("stub"),
+                              usage_ledger=ledger)
+
+
+async def _server_turns(thread_id, ledger):
+    registry = GraphRegistry(model_factory=lambda: metered_stub(ledger), usecases=["Basic Chatbot"])
+    transport = httpx.ASGITransport(app=create_app(registry))
+    async with httpx.AsyncClient(transport=transport, base_url="http://chat.test", timeout=30) as client:
+        for i in range(3):
+            await client.post("/chat", json={"message": f"question {i}", "thread_id": thread_id})
+        usage = (await client.get("/usage", params={"group_by": "node", "thread_id": thread_id})).json()
+        bad = await client.get("/usage", params={"group_by": "colour"})
+    return usage, bad
+
+
+def test_llm_calls_attributed_to_thread():
+    """Every model call of a conversation lands in the ledger under its thread, use case and node."""
+    thread_id = f"usage-{uuid.uuid4()}"
+    with using_ledger(temp_ledger()) as ledger:
+        usage, bad = asyncio.run(_server_turns(thread_id, ledger))
+    print(f"Thread usage: {usage['thread']}")
+    print(f"By node: {usage['rows']}")
+    assert usage["thread"]["calls"] == 3
+    assert usage["thread"]["prompt_tokens"] > 0 and usage["thread"]["completion_tokens"] > 0
+    assert [row["node"] for row in usage["rows"]] == ["chatbot"]
+    calls = ledger.calls(thread_id)
+    assert {(call["kind"], call["model"], call["usecase"]) for call in calls} == {("llm", "stub", "Basic Chatbot")}
+    assert bad.status_code == 400
+
+
+def test_tool_calls_recorded():
+    """Tool results are recorded with the estimated tokens they add to the next prompt."""
+    ledger = temp_ledger()
+    stub = StubTavilySearchResults()
+    node = ParallelToolNode([stub], usage_ledger=ledger)
+    call = {"name": stub.name, "args": {"query": "himalaya enterprises"}, "id": "call_1"}
+    node({"messages": [AIMessage(content="", tool_calls=[call])]})
+    rows = ledger.totals("tool")
+    print(f"By tool: {rows}")
+    assert rows[0]["tool"] == stub.name and rows[0]["calls"] == 1 and rows[0]["tool_tokens"] > 0
+
+
+def test_rollups_outlive_purged_calls():
+    """Purging expired calls keeps the daily totals per model."""
+    ledger = temp_ledger(retention_days=0)
+    for _ in range(4):
+        ledger.record("llm", model="llama-3.1-8b-instant", prompt_tokens=100, completion_tokens=20,
+                      latency=0.2, context={"thread_id": "t1", "usecase": "Basic Chatbot"})
+    ledger.record("llm", model="llama-3.1-8b-instant", cached=True, context={"thread_id": "t1"})
+    assert ledger.thread_usage("t1")["calls"] == 5
+    ledger.purge_expired()
+    model = ledger.totals("model")[0]
+    print(f"Model totals after purge: {model}")
+    assert ledger.thread_usage("t1")["calls"] == 0
+    assert model["calls"] == 5 and model["prompt_tokens"] == 400 and model["cached_calls"] == 1
+
+
+def test_buffered_calls_flushed_at_exit():
+    """A process that exits before the flush interval still writes its buffered calls."""
+    path = os.path.join(tempfile.mkdtemp(), "usage.sqlite")
+    script = (
+        "from src.langgraphagenticai.utils.usage_ledger import UsageLedger\n"
+        f"ledger = UsageLedger(path={path!r}, flush_interval=60)\n"
+        "ledger.record('llm', model='stub', prompt_tokens=7, context={'thread_id': 'exiting'})\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    usage = UsageLedger(path=path).thread_usage("exiting")
+    print(f"Usage written at exit: {usage}")
+    assert usage["calls"] == 1 and usage["prompt_tokens"] == 7
+
+
+if __name__ == "__main__":
+    test_llm_calls_attributed_to_thread()
+    test_tool_calls_recorded()
+    test_rollups_outlive_purged_calls()
+    test_buffered_calls_flushed_at_exit()